@@ -0,0 +1,1952 @@
+// ==================== GLOBAL VARIABLES ====================
+let currentUser = null;
+let currentRole = 'candidate';
+let universities = [];
+let majors = [];
+let aspirations = [];
+let documents = [];
+let payments = [];
+let pendingAspirations = [];
+let pendingNextCursor = null;
+let selectedUniversity = null;
+let selectedMajor = null;
+let selectedPaymentMethod = null;
+let selectedAspirationForPayment = null;
+let selectedAspirationForApproval = null;
+let editingFields = new Set();
+const apiBaseUrl = 'http://localhost:8000/api';
+
+// ==================== UTILITY FUNCTIONS ====================
+function showLoading() {
+    document.getElementById('loading').style.display = 'block';
+}
+
+function hideLoading() {
+    document.getElementById('loading').style.display = 'none';
+}
+
+function showModal(modalId) {
+    document.getElementById(modalId).style.display = 'block';
+}
+
+function closeModal(modalId) {
+    document.getElementById(modalId).style.display = 'none';
+}
+
+function showAlert(message, type = 'info') {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type}`;
+    alertDiv.innerHTML = `
+        <i class="fas fa-${type === 'success' ? 'check-circle' : type === 'error' ? 'exclamation-circle' : type === 'warning' ? 'exclamation-triangle' : 'info-circle'}"></i>
+        ${message}
+    `;
+
+    const container = document.querySelector('.main-content');
+    container.insertBefore(alertDiv, container.firstChild);
+
+    setTimeout(() => {
+        alertDiv.remove();
+    }, 5000);
+}
+
+async function apiCall(endpoint, options = {}) {
+    const token = localStorage.getItem('token');
+    const headers = {
+        'Content-Type': 'application/json',
+        ...options.headers
+    };
+
+    if (token) {
+        headers['Authorization'] = token;
+    }
+
+    try {
+        const response = await fetch(`${apiBaseUrl}${endpoint}`, {
+            headers,
+            ...options
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API call failed:', error);
+        showAlert('Kết nối server thất bại. Vui lòng thử lại.', 'error');
+        throw error;
+    }
+}
+
+// Chart.js chỉ được tải khi dashboard cán bộ/quản trị thực sự vẽ biểu đồ
+let chartJsPromise = null;
+
+function loadChartJs() {
+    if (window.Chart) {
+        return Promise.resolve(window.Chart);
+    }
+    if (!chartJsPromise) {
+        chartJsPromise = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = document.body.dataset.chartSrc;
+            script.async = true;
+            script.onload = () => resolve(window.Chart);
+            script.onerror = () => {
+                chartJsPromise = null;
+                reject(new Error('Không tải được Chart.js'));
+            };
+            document.head.appendChild(script);
+        });
+    }
+    return chartJsPromise;
+}
+
+// ==================== AUTHENTICATION ====================
+document.getElementById('loginForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    showLoading();
+
+    const formData = {
+        username: document.getElementById('username').value,
+        password: document.getElementById('password').value
+    };
+
+    try {
+        const result = await apiCall('/auth/login', {
+            method: 'POST',
+            body: JSON.stringify(formData)
+        });
+
+        if (result.success) {
+            currentUser = result.user;
+            currentRole = result.user.role;
+            localStorage.setItem('token', result.token);
+            showSystem();
+            showAlert('Đăng nhập thành công!', 'success');
+        } else {
+            showAlert(result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Đăng nhập thất bại. Vui lòng thử lại.', 'error');
+    } finally {
+        hideLoading();
+    }
+});
+
+document.getElementById('registerForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    showLoading();
+
+    const formData = {
+        username: document.getElementById('regUsername').value,
+        password: document.getElementById('regPassword').value,
+        email: document.getElementById('regEmail').value,
+        full_name: document.getElementById('regFullname').value,
+        citizen_id: document.getElementById('regCitizenId').value
+    };
+
+    try {
+        const result = await apiCall('/auth/register', {
+            method: 'POST',
+            body: JSON.stringify(formData)
+        });
+
+        if (result.success) {
+            closeModal('registerModal');
+            showAlert('Đăng ký thành công! Vui lòng đăng nhập.', 'success');
+            document.getElementById('registerForm').reset();
+        } else {
+            showAlert(result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Đăng ký thất bại. Vui lòng thử lại.', 'error');
+    } finally {
+        hideLoading();
+    }
+});
+
+function showRegisterModal() {
+    showModal('registerModal');
+}
+
+function logout() {
+    const token = localStorage.getItem('token');
+    if (token) {
+        // Thu hồi token phía server; lỗi mạng không chặn đăng xuất
+        fetch(`${apiBaseUrl}/auth/logout`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Authorization': token },
+            body: '{}'
+        }).catch(() => {});
+    }
+    unsubscribeEvents();
+    currentUser = null;
+    localStorage.removeItem('token');
+    document.getElementById('systemContainer').style.display = 'none';
+    document.getElementById('loginPage').style.display = 'block';
+    document.getElementById('loginForm').reset();
+}
+
+// ==================== LIVE UPDATES ====================
+// Dùng fetch thay cho EventSource để gửi được header Authorization
+let eventStreamController = null;
+let lastEventId = null;
+let liveRefreshTimer = null;
+
+async function subscribeEvents() {
+    const token = localStorage.getItem('token');
+    if (!token || eventStreamController) return;
+
+    const controller = new AbortController();
+    eventStreamController = controller;
+    let retryDelay = 3000;
+
+    try {
+        const headers = { 'Authorization': token };
+        if (lastEventId !== null) {
+            headers['Last-Event-ID'] = lastEventId;
+        }
+        const response = await fetch(`${apiBaseUrl}/events`, { headers, signal: controller.signal });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let eventType = 'message';
+                let data = '';
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('id: ')) lastEventId = line.slice(4);
+                    else if (line.startsWith('event: ')) eventType = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                    else if (line.startsWith('retry: ')) retryDelay = parseInt(line.slice(7)) || retryDelay;
+                });
+                if (eventType === 'aspiration') {
+                    handleAspirationEvent(JSON.parse(data));
+                } else if (eventType === 'reset') {
+                    scheduleLiveRefresh();
+                }
+            }
+        }
+    } catch (error) {
+        if (controller.signal.aborted) return;
+    }
+
+    // Mất kết nối: kết nối lại và nhận tiếp từ lastEventId
+    if (eventStreamController === controller) {
+        eventStreamController = null;
+        setTimeout(subscribeEvents, retryDelay);
+    }
+}
+
+function unsubscribeEvents() {
+    if (eventStreamController) {
+        eventStreamController.abort();
+        eventStreamController = null;
+    }
+    lastEventId = null;
+}
+
+function handleAspirationEvent(event) {
+    if (currentRole === 'candidate') {
+        const message = event.status === 'pending' ?
+            `Nguyện vọng: ${getPaymentStatusText(event.payment_status)}` :
+            `Nguyện vọng: ${getStatusText(event.status)}`;
+        showAlert(message, event.status === 'rejected' ? 'error' : 'success');
+    }
+    scheduleLiveRefresh();
+}
+
+function scheduleLiveRefresh() {
+    // Gom các sự kiện liên tiếp (vd. duyệt hàng loạt) thành một lần tải lại
+    clearTimeout(liveRefreshTimer);
+    liveRefreshTimer = setTimeout(() => {
+        const section = document.querySelector('.content-section.active');
+        if (!section) return;
+        if (section.id === 'manager-stats') {
+            loadManagerStats(statsFilters);
+        } else if (['dashboard', 'aspiration', 'payment', 'results'].includes(section.id)) {
+            loadSectionContent(section.id);
+        }
+    }, 1000);
+}
+
+// ==================== SYSTEM FUNCTIONS ====================
+function showSystem() {
+    document.getElementById('loginPage').style.display = 'none';
+    document.getElementById('systemContainer').style.display = 'block';
+
+    document.getElementById('userFullname').textContent = currentUser.full_name;
+    document.getElementById('userRoleDisplay').textContent = 
+        currentUser.role === 'admin' ? 'Quản trị viên' : 
+        currentUser.role === 'manager' ? 'Cán bộ tuyển sinh' : 'Thí sinh';
+
+    loadSidebarMenu();
+    showSection('dashboard');
+    subscribeEvents();
+}
+
+function loadSidebarMenu() {
+    const sidebarMenu = document.getElementById('sidebarMenu');
+    let menuItems = '';
+
+    if (currentRole === 'candidate') {
+        menuItems = `
+            <li class="active" onclick="showSection('dashboard')">
+                <i class="fas fa-tachometer-alt"></i> Tổng quan
+            </li>
+            <li onclick="showSection('profile')">
+                <i class="fas fa-user"></i> Hồ sơ cá nhân
+            </li>
+            <li onclick="showSection('aspiration')">
+                <i class="fas fa-list-ol"></i> Đăng ký nguyện vọng
+            </li>
+            <li onclick="showSection('payment')">
+                <i class="fas fa-credit-card"></i> Thanh toán
+            </li>
+            <li onclick="showSection('documents')">
+                <i class="fas fa-file-alt"></i> Tài liệu
+            </li>
+            <li onclick="showSection('print')">
+                <i class="fas fa-print"></i> In ấn
+            </li>
+            <li onclick="showSection('results')">
+                <i class="fas fa-chart-bar"></i> Kết quả
+            </li>
+            <li onclick="logout()">
+                <i class="fas fa-sign-out-alt"></i> Đăng xuất
+            </li>
+        `;
+    } else if (currentRole === 'manager') {
+        menuItems = `
+            <li class="active" onclick="showSection('dashboard')">
+                <i class="fas fa-tachometer-alt"></i> Tổng quan
+            </li>
+            <li onclick="showSection('manager-aspiration')">
+                <i class="fas fa-list-ol"></i> Duyệt nguyện vọng
+            </li>
+            <li onclick="showSection('manager-stats')">
+                <i class="fas fa-chart-pie"></i> Thống kê
+            </li>
+            <li onclick="logout()">
+                <i class="fas fa-sign-out-alt"></i> Đăng xuất
+            </li>
+        `;
+    } else if (currentRole === 'admin') {
+        menuItems = `
+            <li class="active" onclick="showSection('dashboard')">
+                <i class="fas fa-tachometer-alt"></i> Tổng quan
+            </li>
+            <li onclick="showSection('manager-aspiration')">
+                <i class="fas fa-list-ol"></i> Quản lý nguyện vọng
+            </li>
+            <li onclick="showSection('manager-stats')">
+                <i class="fas fa-chart-pie"></i> Thống kê
+            </li>
+            <li onclick="logout()">
+                <i class="fas fa-sign-out-alt"></i> Đăng xuất
+            </li>
+        `;
+    }
+
+    sidebarMenu.innerHTML = menuItems;
+}
+
+function showSection(sectionId) {
+    // Hide all sections
+    document.querySelectorAll('.content-section').forEach(section => {
+        section.classList.remove('active');
+    });
+
+    // Update active menu item
+    document.querySelectorAll('.sidebar-menu li').forEach(item => {
+        item.classList.remove('active');
+    });
+
+    // Show selected section
+    document.getElementById(sectionId).classList.add('active');
+
+    // Update section title
+    const titles = {
+        'dashboard': 'Tổng quan hệ thống',
+        'profile': 'Hồ sơ cá nhân',
+        'aspiration': 'Đăng ký nguyện vọng',
+        'payment': 'Thanh toán',
+        'documents': 'Tài liệu',
+        'print': 'In ấn',
+        'manager-aspiration': 'Duyệt nguyện vọng',
+        'manager-stats': 'Thống kê tuyển sinh',
+        'results': 'Kết quả tuyển sinh'
+    };
+
+    document.getElementById('section-title').innerHTML = `
+        <i class="fas fa-${getSectionIcon(sectionId)}"></i> ${titles[sectionId]}
+    `;
+
+    // Mark active menu item
+    const menuItems = document.querySelectorAll('.sidebar-menu li');
+    for (let i = 0; i < menuItems.length; i++) {
+        if (menuItems[i].getAttribute('onclick') === `showSection('${sectionId}')`) {
+            menuItems[i].classList.add('active');
+            break;
+        }
+    }
+
+    // Load section content
+    loadSectionContent(sectionId);
+}
+
+function getSectionIcon(sectionId) {
+    const icons = {
+        'dashboard': 'tachometer-alt',
+        'profile': 'user',
+        'aspiration': 'list-ol',
+        'payment': 'credit-card',
+        'documents': 'file-alt',
+        'print': 'print',
+        'manager-aspiration': 'check-circle',
+        'manager-stats': 'chart-pie',
+        'results': 'chart-bar'
+    };
+    return icons[sectionId] || 'circle';
+}
+
+async function loadSectionContent(sectionId) {
+    showLoading();
+
+    try {
+        switch (sectionId) {
+            case 'dashboard':
+                await loadDashboard();
+                break;
+            case 'profile':
+                await loadProfile();
+                break;
+            case 'aspiration':
+                await loadAspiration();
+                break;
+            case 'payment':
+                await loadPayment();
+                break;
+            case 'documents':
+                await loadDocuments();
+                break;
+            case 'print':
+                await loadPrint();
+                break;
+            case 'manager-aspiration':
+                await loadManagerAspiration();
+                break;
+            case 'manager-stats':
+                await loadManagerStats({});
+                break;
+            case 'results':
+                await loadResults();
+                break;
+        }
+    } catch (error) {
+        console.error('Error loading section:', error);
+        showAlert('Lỗi khi tải dữ liệu', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+// ==================== SECTION LOADERS ====================
+async function loadDashboard() {
+    const section = document.getElementById('dashboard');
+
+    if (currentRole === 'candidate') {
+        try {
+            const result = await apiCall('/candidate/stats');
+            const stats = result.data;
+
+            section.innerHTML = `
+                <div class="stats-grid">
+                    <div class="stat-card primary">
+                        <div class="stat-icon">
+                            <i class="fas fa-list-ol"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Tổng số nguyện vọng</h3>
+                            <p>${stats.totalAspirations || 0}</p>
+                        </div>
+                    </div>
+                    <div class="stat-card success">
+                        <div class="stat-icon">
+                            <i class="fas fa-check-circle"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Đã thanh toán</h3>
+                            <p>${stats.paidAspirations || 0}</p>
+                        </div>
+                    </div>
+                    <div class="stat-card warning">
+                        <div class="stat-icon">
+                            <i class="fas fa-clock"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Chờ duyệt</h3>
+                            <p>${stats.pendingAspirations || 0}</p>
+                        </div>
+                    </div>
+                    <div class="stat-card danger">
+                        <div class="stat-icon">
+                            <i class="fas fa-times-circle"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Bị từ chối</h3>
+                            <p>${stats.rejectedAspirations || 0}</p>
+                        </div>
+                    </div>
+                </div>
+
+                <div class="content-panel">
+                    <h3><i class="fas fa-bell"></i> Thông báo quan trọng</h3>
+                    <div class="alert alert-info">
+                        <i class="fas fa-info-circle"></i>
+                        Thời hạn đăng ký nguyện vọng: 30/06/2025
+                    </div>
+                    <div class="alert alert-warning">
+                        <i class="fas fa-exclamation-triangle"></i>
+                        Vui lòng hoàn tất thanh toán trước 15/07/2025
+                    </div>
+                </div>
+
+                <div class="content-panel">
+                    <h3><i class="fas fa-list-ol"></i> Nguyện vọng gần đây</h3>
+                    <div id="recentAspirations">
+                        Đang tải...
+                    </div>
+                </div>
+            `;
+
+            // Load recent aspirations
+            await loadRecentAspirations();
+        } catch (error) {
+            section.innerHTML = `
+                <div class="alert alert-error">
+                    <i class="fas fa-exclamation-circle"></i>
+                    Lỗi khi tải dữ liệu dashboard
+                </div>
+            `;
+        }
+    } else if (currentRole === 'manager' || currentRole === 'admin') {
+        try {
+            const endpoint = currentRole === 'manager' ? '/manager/stats' : '/admin/stats';
+            const result = await apiCall(endpoint);
+            const stats = result.data;
+
+            section.innerHTML = `
+                <div class="stats-grid">
+                    <div class="stat-card primary">
+                        <div class="stat-icon">
+                            <i class="fas fa-list-ol"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Tổng nguyện vọng</h3>
+                            <p>${stats.totalAspirations || stats.aspirations || 0}</p>
+                        </div>
+                    </div>
+                    <div class="stat-card danger">
+                        <div class="stat-icon">
+                            <i class="fas fa-clock"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Chờ duyệt</h3>
+                            <p>${stats.pendingAspirations || 0}</p>
+                        </div>
+                    </div>
+                    <div class="stat-card success">
+                        <div class="stat-icon">
+                            <i class="fas fa-check-circle"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Đã duyệt</h3>
+                            <p>${stats.approvedAspirations || 0}</p>
+                        </div>
+                    </div>
+                    <div class="stat-card warning">
+                        <div class="stat-icon">
+                            <i class="fas fa-credit-card"></i>
+                        </div>
+                        <div class="stat-info">
+                            <h3>Đã thanh toán</h3>
+                            <p>${stats.totalPayments || 0}</p>
+                        </div>
+                    </div>
+                </div>
+
+                <div class="content-panel">
+                    <h3><i class="fas fa-clock"></i> Nguyện vọng chờ duyệt (5 mới nhất)</h3>
+                    <div id="pendingAspirationsList">
+                        Đang tải...
+                    </div>
+                </div>
+            `;
+
+            // Load pending aspirations for manager
+            await loadPendingAspirationsForManager();
+        } catch (error) {
+            section.innerHTML = `
+                <div class="alert alert-error">
+                    <i class="fas fa-exclamation-circle"></i>
+                    Lỗi khi tải dữ liệu dashboard
+                </div>
+            `;
+        }
+    }
+}
+
+async function loadRecentAspirations() {
+    try {
+        const result = await apiCall('/candidate/aspirations');
+        const aspirations = result.data;
+
+        const container = document.getElementById('recentAspirations');
+
+        if (aspirations.length > 0) {
+            container.innerHTML = `
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>STT</th>
+                                <th>Trường</th>
+                                <th>Ngành</th>
+                                <th>Trạng thái</th>
+                                <th>Thanh toán</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            ${aspirations.slice(0, 5).map(asp => `
+                                <tr>
+                                    <td>${asp.priority}</td>
+                                    <td>${asp.university_name}</td>
+                                    <td>${asp.major_name}</td>
+                                    <td>
+                                        <span class="status-badge ${getStatusClass(asp.status)}">
+                                            ${getStatusText(asp.status)}
+                                        </span>
+                                    </td>
+                                    <td>
+                                        <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
+                                            ${getPaymentStatusText(asp.payment_status)}
+                                        </span>
+                                    </td>
+                                </tr>
+                            `).join('')}
+                        </tbody>
+                    </table>
+                </div>
+            `;
+        } else {
+            container.innerHTML = '<p class="text-muted">Chưa có nguyện vọng nào</p>';
+        }
+    } catch (error) {
+        document.getElementById('recentAspirations').innerHTML = 
+            '<p class="text-muted">Lỗi khi tải danh sách nguyện vọng</p>';
+    }
+}
+
+async function loadPendingAspirationsForManager() {
+    try {
+        const result = await apiCall('/manager/pending-aspirations?limit=5');
+        const pendingAspirations = result.data;
+
+        const container = document.getElementById('pendingAspirationsList');
+
+        if (pendingAspirations.length > 0) {
+            container.innerHTML = `
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>Thí sinh</th>
+                                <th>CCCD</th>
+                                <th>Trường</th>
+                                <th>Ngành</th>
+                                <th>Ưu tiên</th>
+                                <th>Thanh toán</th>
+                                <th>Thao tác</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            ${pendingAspirations.map(asp => `
+                                <tr>
+                                    <td>${asp.candidate_name}</td>
+                                    <td>${asp.citizen_id}</td>
+                                    <td>${asp.university_name}</td>
+                                    <td>${asp.major_name}</td>
+                                    <td>${asp.priority}</td>
+                                    <td>
+                                        <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
+                                            ${getPaymentStatusText(asp.payment_status)}
+                                        </span>
+                                    </td>
+                                    <td>
+                                        <button class="btn btn-success btn-sm" onclick="showApprovalModal(${asp.id}, 'approve')">
+                                            <i class="fas fa-check"></i>
+                                        </button>
+                                        <button class="btn btn-danger btn-sm" onclick="showApprovalModal(${asp.id}, 'reject')">
+                                            <i class="fas fa-times"></i>
+                                        </button>
+                                    </td>
+                                </tr>
+                            `).join('')}
+                        </tbody>
+                    </table>
+                </div>
+            `;
+        } else {
+            container.innerHTML = '<p class="text-muted">Không có nguyện vọng nào chờ duyệt</p>';
+        }
+    } catch (error) {
+        document.getElementById('pendingAspirationsList').innerHTML = 
+            '<p class="text-muted">Lỗi khi tải danh sách nguyện vọng chờ duyệt</p>';
+    }
+}
+
+async function loadProfile() {
+    try {
+        const result = await apiCall('/candidate/profile');
+        const profile = result.data;
+
+        const section = document.getElementById('profile');
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <div class="section-header">
+                    <h3><i class="fas fa-user"></i> Thông tin cá nhân</h3>
+                    <button class="btn btn-primary" onclick="enableProfileEditing()">
+                        <i class="fas fa-edit"></i> Chỉnh sửa
+                    </button>
+                </div>
+                <form id="profileForm">
+                    <div class="form-group">
+                        <label>Họ và tên</label>
+                        <input type="text" id="profileFullname" value="${profile.full_name}" readonly>
+                    </div>
+                    <div class="form-group">
+                        <label>Email</label>
+                        <input type="email" id="profileEmail" value="${profile.email}" readonly>
+                    </div>
+                    <div class="form-group">
+                        <label>Số CCCD</label>
+                        <input type="text" id="profileCitizenId" value="${profile.citizen_id}" readonly>
+                    </div>
+                    <div class="form-group">
+                        <label>Ngày sinh</label>
+                        <input type="date" id="profileDob" value="${profile.date_of_birth || ''}" readonly>
+                    </div>
+                    <div class="form-group">
+                        <label>Giới tính</label>
+                        <select id="profileGender" disabled>
+                            <option value="">Chọn giới tính</option>
+                            <option value="male" ${profile.gender === 'male' ? 'selected' : ''}>Nam</option>
+                            <option value="female" ${profile.gender === 'female' ? 'selected' : ''}>Nữ</option>
+                        </select>
+                    </div>
+                    <div class="form-group">
+                        <label>Địa chỉ</label>
+                        <textarea id="profileAddress" rows="3" readonly>${profile.address || ''}</textarea>
+                    </div>
+                    <div class="form-group">
+                        <label>Số điện thoại</label>
+                        <input type="tel" id="profilePhone" value="${profile.phone || ''}" readonly>
+                    </div>
+                    <div class="form-group">
+                        <label>Trường THPT</label>
+                        <input type="text" id="profileHighSchool" value="${profile.high_school || ''}" readonly>
+                    </div>
+                    <div class="form-group">
+                        <label>Năm tốt nghiệp</label>
+                        <input type="number" id="profileGraduationYear" value="${profile.graduation_year || ''}" readonly>
+                    </div>
+                    <div class="form-actions" id="profileActions" style="display: none;">
+                        <button type="button" class="btn btn-secondary" onclick="cancelProfileEditing()">Hủy</button>
+                        <button type="submit" class="btn btn-primary">Cập nhật thông tin</button>
+                    </div>
+                </form>
+            </div>
+        `;
+
+        document.getElementById('profileForm').addEventListener('submit', async function(e) {
+            e.preventDefault();
+            await saveProfile();
+        });
+    } catch (error) {
+        const section = document.getElementById('profile');
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải thông tin hồ sơ
+            </div>
+        `;
+    }
+}
+
+async function loadAspiration() {
+    try {
+        // Load universities and aspirations
+        const [uniResult, aspResult] = await Promise.all([
+            apiCall('/universities'),
+            apiCall('/candidate/aspirations')
+        ]);
+
+        universities = uniResult.data;
+        aspirations = aspResult.data;
+
+        const section = document.getElementById('aspiration');
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <h3><i class="fas fa-list-ol"></i> Danh sách nguyện vọng hiện tại</h3>
+                <div id="currentAspirations">
+                    ${aspirations.length > 0 ? `
+                        <div class="table-container">
+                            <table>
+                                <thead>
+                                    <tr>
+                                        <th>STT</th>
+                                        <th>Trường</th>
+                                        <th>Ngành</th>
+                                        <th>Trạng thái</th>
+                                        <th>Thanh toán</th>
+                                        <th>Thao tác</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    ${aspirations.map(asp => `
+                                        <tr>
+                                            <td>${asp.priority}</td>
+                                            <td>${asp.university_name}</td>
+                                            <td>${asp.major_name}</td>
+                                            <td>
+                                                <span class="status-badge ${getStatusClass(asp.status)}">
+                                                    ${getStatusText(asp.status)}
+                                                </span>
+                                            </td>
+                                            <td>
+                                                <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
+                                                    ${getPaymentStatusText(asp.payment_status)}
+                                                </span>
+                                            </td>
+                                            <td>
+                                                <button class="btn btn-danger btn-sm" onclick="removeAspiration(${asp.id})">
+                                                    <i class="fas fa-trash"></i>
+                                                </button>
+                                            </td>
+                                        </tr>
+                                    `).join('')}
+                                </tbody>
+                            </table>
+                        </div>
+                    ` : '<p class="text-muted">Chưa có nguyện vọng nào</p>'}
+                </div>
+            </div>
+
+            <div class="content-panel">
+                <h3><i class="fas fa-plus-circle"></i> Thêm nguyện vọng mới</h3>
+                <div class="form-group">
+                    <label>Chọn trường đại học</label>
+                    <select id="universitySelect" onchange="loadUniversityMajors(this.value)">
+                        <option value="">-- Chọn trường --</option>
+                        ${universities.map(uni => `
+                            <option value="${uni.id}">${uni.name}</option>
+                        `).join('')}
+                    </select>
+                </div>
+
+                <div class="form-group">
+                    <label>Chọn ngành học</label>
+                    <select id="majorSelect" disabled>
+                        <option value="">-- Chọn ngành --</option>
+                    </select>
+                </div>
+
+                <div class="form-group">
+                    <label>Thứ tự ưu tiên</label>
+                    <select id="prioritySelect">
+                        ${Array.from({length: 10}, (_, i) => `
+                            <option value="${i + 1}">${i + 1}</option>
+                        `).join('')}
+                    </select>
+                </div>
+
+                <button class="btn btn-primary" onclick="addNewAspiration()">
+                    <i class="fas fa-plus"></i> Thêm nguyện vọng
+                </button>
+            </div>
+        `;
+    } catch (error) {
+        const section = document.getElementById('aspiration');
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải thông tin nguyện vọng
+            </div>
+        `;
+    }
+}
+
+async function loadPayment() {
+    try {
+        const [configResult, historyResult, aspResult] = await Promise.all([
+            apiCall('/payment/config'),
+            apiCall('/payment/history'),
+            apiCall('/candidate/aspirations')
+        ]);
+
+        const paymentConfig = configResult.data;
+        payments = historyResult.data;
+        aspirations = aspResult.data.filter(asp => asp.payment_status === 'pending');
+
+        const section = document.getElementById('payment');
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <h3><i class="fas fa-credit-card"></i> Thanh toán nguyện vọng</h3>
+                <div class="alert alert-info">
+                    <i class="fas fa-info-circle"></i>
+                    Phí đăng ký mỗi nguyện vọng: ${formatCurrency(paymentConfig.aspiration_fee)}
+                </div>
+
+                <div id="paymentAspirations">
+                    ${aspirations.length > 0 ? `
+                        <div class="table-container">
+                            <table>
+                                <thead>
+                                    <tr>
+                                        <th>STT</th>
+                                        <th>Trường</th>
+                                        <th>Ngành</th>
+                                        <th>Phí</th>
+                                        <th>Thao tác</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    ${aspirations.map(asp => `
+                                        <tr>
+                                            <td>${asp.priority}</td>
+                                            <td>${asp.university_name}</td>
+                                            <td>${asp.major_name}</td>
+                                            <td>${formatCurrency(paymentConfig.aspiration_fee)}</td>
+                                            <td>
+                                                <button class="btn btn-primary btn-sm" onclick="showPaymentModal(${asp.id})">
+                                                    <i class="fas fa-credit-card"></i> Thanh toán
+                                                </button>
+                                            </td>
+                                        </tr>
+                                    `).join('')}
+                                </tbody>
+                            </table>
+                        </div>
+                    ` : '<p class="text-muted">Không có nguyện vọng nào cần thanh toán</p>'}
+                </div>
+            </div>
+
+            <div class="content-panel">
+                <h3><i class="fas fa-history"></i> Lịch sử thanh toán</h3>
+                <div id="paymentHistory">
+                    ${payments.length > 0 ? `
+                        <div class="table-container">
+                            <table>
+                                <thead>
+                                    <tr>
+                                        <th>Mã GD</th>
+                                        <th>Ngày</th>
+                                        <th>Số tiền</th>
+                                        <th>Phương thức</th>
+                                        <th>Trạng thái</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    ${payments.map(payment => `
+                                        <tr>
+                                            <td>${payment.transaction_id || 'N/A'}</td>
+                                            <td>${formatDate(payment.created_at)}</td>
+                                            <td>${formatCurrency(payment.amount)}</td>
+                                            <td>${getPaymentMethodText(payment.payment_method)}</td>
+                                            <td>
+                                                <span class="status-badge ${payment.status === 'completed' ? 'status-approved' : 'status-pending'}">
+                                                    ${payment.status === 'completed' ? 'Hoàn thành' : 'Chờ xử lý'}
+                                                </span>
+                                            </td>
+                                        </tr>
+                                    `).join('')}
+                                </tbody>
+                            </table>
+                        </div>
+                    ` : '<p class="text-muted">Chưa có giao dịch nào</p>'}
+                </div>
+            </div>
+        `;
+    } catch (error) {
+        const section = document.getElementById('payment');
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải thông tin thanh toán
+            </div>
+        `;
+    }
+}
+
+async function loadDocuments() {
+    try {
+        const result = await apiCall('/documents');
+        documents = result.data;
+
+        const section = document.getElementById('documents');
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <h3><i class="fas fa-file-alt"></i> Tài liệu tuyển sinh</h3>
+                <div class="document-list">
+                    ${documents.map(doc => `
+                        <div class="document-item">
+                            <div class="document-icon">
+                                <i class="fas fa-${getDocumentIcon(doc.category)}"></i>
+                            </div>
+                            <div class="document-info">
+                                <h4>${doc.title}</h4>
+                                <p>${doc.description}</p>
+                                <small class="text-muted">Ngày đăng: ${formatDate(doc.created_at)}</small>
+                            </div>
+                            <button class="btn btn-primary">
+                                <i class="fas fa-download"></i> Tải về
+                            </button>
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+        `;
+    } catch (error) {
+        const section = document.getElementById('documents');
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải tài liệu
+            </div>
+        `;
+    }
+}
+
+async function loadPrint() {
+    try {
+        const section = document.getElementById('print');
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <h3><i class="fas fa-print"></i> In và xuất dữ liệu</h3>
+                <div class="alert alert-info">
+                    <i class="fas fa-info-circle"></i>
+                    Xuất danh sách nguyện vọng của bạn ra file PDF hoặc CSV
+                </div>
+
+                <div class="print-actions">
+                    <button class="btn btn-primary" onclick="generatePrintData()">
+                        <i class="fas fa-file-pdf"></i> Xem trước bản in
+                    </button>
+                    <button class="btn btn-success" onclick="exportToCSV()">
+                        <i class="fas fa-file-csv"></i> Xuất file CSV
+                    </button>
+                </div>
+
+                <div id="printPreview" class="mt-4">
+                    <!-- Print preview will be loaded here -->
+                </div>
+            </div>
+        `;
+    } catch (error) {
+        const section = document.getElementById('print');
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải tính năng in ấn
+            </div>
+        `;
+    }
+}
+
+function renderManagerAspirationRow(asp) {
+    return `
+        <tr>
+            <td>${asp.candidate_name}</td>
+            <td>${asp.citizen_id}</td>
+            <td>${asp.university_name}</td>
+            <td>${asp.major_name}</td>
+            <td>${asp.priority}</td>
+            <td>
+                <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
+                    ${getPaymentStatusText(asp.payment_status)}
+                </span>
+            </td>
+            <td>${formatDate(asp.registered_at)}</td>
+            <td>
+                <button class="btn btn-success btn-sm" onclick="showApprovalModal(${asp.id}, 'approve')">
+                    <i class="fas fa-check"></i> Duyệt
+                </button>
+                <button class="btn btn-danger btn-sm" onclick="showApprovalModal(${asp.id}, 'reject')">
+                    <i class="fas fa-times"></i> Từ chối
+                </button>
+            </td>
+        </tr>
+    `;
+}
+
+async function loadManagerAspiration() {
+    try {
+        const result = await apiCall('/manager/pending-aspirations');
+        pendingAspirations = result.data;
+        pendingNextCursor = result.next_cursor;
+
+        const section = document.getElementById('manager-aspiration');
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <h3><i class="fas fa-tasks"></i> Quản lý nguyện vọng</h3>
+                <div class="alert alert-info">
+                    <i class="fas fa-info-circle"></i>
+                    Danh sách nguyện vọng đang chờ duyệt
+                </div>
+
+                <div id="managerAspirationsList">
+                    ${pendingAspirations.length > 0 ? `
+                        <div class="table-container">
+                            <table>
+                                <thead>
+                                    <tr>
+                                        <th>Thí sinh</th>
+                                        <th>CCCD</th>
+                                        <th>Trường</th>
+                                        <th>Ngành</th>
+                                        <th>Ưu tiên</th>
+                                        <th>Thanh toán</th>
+                                        <th>Ngày đăng ký</th>
+                                        <th>Thao tác</th>
+                                    </tr>
+                                </thead>
+                                <tbody id="managerAspirationsBody">
+                                    ${pendingAspirations.map(renderManagerAspirationRow).join('')}
+                                </tbody>
+                            </table>
+                        </div>
+                        <button id="loadMorePendingButton" class="btn btn-secondary" onclick="loadMorePendingAspirations()"
+                                style="display: ${pendingNextCursor ? 'inline-block' : 'none'}">
+                            <i class="fas fa-angle-down"></i> Tải thêm
+                        </button>
+                    ` : '<p class="text-muted">Không có nguyện vọng nào chờ duyệt</p>'}
+                </div>
+            </div>
+        `;
+    } catch (error) {
+        const section = document.getElementById('manager-aspiration');
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải danh sách nguyện vọng
+            </div>
+        `;
+    }
+}
+
+async function loadMorePendingAspirations() {
+    if (!pendingNextCursor) return;
+
+    const button = document.getElementById('loadMorePendingButton');
+    button.disabled = true;
+    try {
+        const result = await apiCall(`/manager/pending-aspirations?cursor=${encodeURIComponent(pendingNextCursor)}`);
+        pendingAspirations.push(...result.data);
+        pendingNextCursor = result.next_cursor;
+        document.getElementById('managerAspirationsBody')
+            .insertAdjacentHTML('beforeend', result.data.map(renderManagerAspirationRow).join(''));
+    } catch (error) {
+        showAlert('Lỗi khi tải thêm nguyện vọng', 'error');
+    }
+    button.disabled = false;
+    button.style.display = pendingNextCursor ? 'inline-block' : 'none';
+}
+
+let statsFilters = {};
+let statsChart = null;
+
+async function loadManagerStats(filters = statsFilters) {
+    statsFilters = filters;
+    const section = document.getElementById('manager-stats');
+
+    try {
+        const result = await apiCall(`/manager/stats/breakdown?${new URLSearchParams(filters)}`);
+        const breakdown = result.data;
+        const groupNames = {
+            'university': 'Trường',
+            'subject_group': 'Khối thi',
+            'major': 'Ngành'
+        };
+        // Trường và khối thi xem chi tiết được theo ngành
+        const drillKey = breakdown.group_by === 'university' ? 'university_id' :
+            breakdown.group_by === 'subject_group' ? 'subject_group' : null;
+        const formatRate = rate => rate === null ? '-' : `${(rate * 100).toFixed(1)}%`;
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <h3><i class="fas fa-chart-pie"></i> Thống kê theo ${groupNames[breakdown.group_by].toLowerCase()}</h3>
+                <div class="form-group">
+                    ${filters.university_id || filters.subject_group ? `
+                        <button class="btn btn-secondary btn-sm" onclick="loadManagerStats({})">
+                            <i class="fas fa-arrow-left"></i> Tất cả
+                        </button>
+                    ` : `
+                        <select onchange="loadManagerStats({group_by: this.value})">
+                            ${['university', 'subject_group', 'major'].map(group => `
+                                <option value="${group}" ${group === breakdown.group_by ? 'selected' : ''}>
+                                    Theo ${groupNames[group].toLowerCase()}
+                                </option>
+                            `).join('')}
+                        </select>
+                    `}
+                </div>
+                <canvas id="statsChart" height="120"></canvas>
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>${groupNames[breakdown.group_by]}</th>
+                                <th>Chỉ tiêu</th>
+                                <th>Nguyện vọng</th>
+                                <th>Chờ duyệt</th>
+                                <th>Đã duyệt</th>
+                                <th>Đã thanh toán</th>
+                                <th>Lấp đầy</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            ${breakdown.rows.map(row => `
+                                <tr>
+                                    <td>
+                                        ${drillKey ? `
+                                            <a href="#" onclick='loadManagerStats(${JSON.stringify({[drillKey]: row.key})}); return false;'>
+                                                ${row.label || '-'}
+                                            </a>
+                                        ` : row.label}
+                                    </td>
+                                    <td>${row.quota}</td>
+                                    <td>${row.applications}</td>
+                                    <td>${row.pending}</td>
+                                    <td>${row.approved}</td>
+                                    <td>${row.paid}</td>
+                                    <td>${formatRate(row.fill_rate)}</td>
+                                </tr>
+                            `).join('')}
+                            <tr>
+                                <th>Tổng</th>
+                                <th>${breakdown.totals.quota}</th>
+                                <th>${breakdown.totals.applications}</th>
+                                <th>${breakdown.totals.pending}</th>
+                                <th>${breakdown.totals.approved}</th>
+                                <th>${breakdown.totals.paid}</th>
+                                <th>${formatRate(breakdown.totals.fill_rate)}</th>
+                            </tr>
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        `;
+        await drawStatsChart(breakdown.rows);
+    } catch (error) {
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải thống kê
+            </div>
+        `;
+    }
+}
+
+async function drawStatsChart(rows) {
+    const canvas = document.getElementById('statsChart');
+    let Chart;
+    try {
+        Chart = await loadChartJs();
+    } catch (error) {
+        // Không có biểu đồ thì vẫn còn bảng số liệu
+        canvas.remove();
+        return;
+    }
+
+    if (statsChart) {
+        statsChart.destroy();
+    }
+    const styles = getComputedStyle(document.documentElement);
+    statsChart = new Chart(canvas, {
+        type: 'bar',
+        data: {
+            labels: rows.map(row => row.label || '-'),
+            datasets: [
+                {label: 'Chỉ tiêu', data: rows.map(row => row.quota), backgroundColor: styles.getPropertyValue('--gray').trim()},
+                {label: 'Nguyện vọng', data: rows.map(row => row.applications), backgroundColor: styles.getPropertyValue('--primary').trim()},
+                {label: 'Đã duyệt', data: rows.map(row => row.approved), backgroundColor: styles.getPropertyValue('--success').trim()},
+                {label: 'Đã thanh toán', data: rows.map(row => row.paid), backgroundColor: styles.getPropertyValue('--warning').trim()}
+            ]
+        },
+        options: {
+            responsive: true,
+            scales: {y: {beginAtZero: true}}
+        }
+    });
+}
+
+async function loadResults() {
+    try {
+        const result = await apiCall('/candidate/results');
+        const results = result.data;
+
+        const section = document.getElementById('results');
+
+        section.innerHTML = `
+            <div class="content-panel">
+                <h3><i class="fas fa-chart-bar"></i> Kết quả tuyển sinh</h3>
+                <div class="alert alert-info">
+                    <i class="fas fa-info-circle"></i>
+                    Kết quả xét tuyển sẽ được công bố sau khi kết thúc thời gian đăng ký
+                </div>
+
+                <div id="resultsList">
+                    ${results.length > 0 ? `
+                        <div class="table-container">
+                            <table>
+                                <thead>
+                                    <tr>
+                                        <th>STT</th>
+                                        <th>Trường</th>
+                                        <th>Ngành</th>
+                                        <th>Trạng thái</th>
+                                        <th>Ghi chú</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    ${results.map(result => `
+                                        <tr>
+                                            <td>${result.priority}</td>
+                                            <td>${result.university_name}</td>
+                                            <td>${result.major_name}</td>
+                                            <td>
+                                                <span class="status-badge ${getStatusClass(result.status)}">
+                                                    ${getStatusText(result.status)}
+                                                </span>
+                                            </td>
+                                            <td>${result.status === 'approved' ? 'Đủ điều kiện' : 'Đang chờ'}</td>
+                                        </tr>
+                                    `).join('')}
+                                </tbody>
+                            </table>
+                        </div>
+                    ` : '<p class="text-muted">Chưa có kết quả nào</p>'}
+                </div>
+            </div>
+        `;
+    } catch (error) {
+        const section = document.getElementById('results');
+        section.innerHTML = `
+            <div class="alert alert-error">
+                <i class="fas fa-exclamation-circle"></i>
+                Lỗi khi tải kết quả
+            </div>
+        `;
+    }
+}
+
+// ==================== HELPER FUNCTIONS ====================
+function getStatusClass(status) {
+    const classes = {
+        'pending': 'status-pending',
+        'approved': 'status-approved',
+        'rejected': 'status-rejected',
+        'completed': 'status-approved'
+    };
+    return classes[status] || 'status-pending';
+}
+
+function getStatusText(status) {
+    const texts = {
+        'pending': 'Chờ duyệt',
+        'approved': 'Đã duyệt',
+        'rejected': 'Đã từ chối',
+        'completed': 'Hoàn thành'
+    };
+    return texts[status] || status;
+}
+
+function getPaymentStatusClass(status) {
+    const classes = {
+        'pending': 'payment-pending',
+        'paid': 'payment-paid'
+    };
+    return classes[status] || 'payment-pending';
+}
+
+function getPaymentStatusText(status) {
+    const texts = {
+        'pending': 'Chưa thanh toán',
+        'paid': 'Đã thanh toán'
+    };
+    return texts[status] || status;
+}
+
+function getPaymentMethodText(method) {
+    const texts = {
+        'bank_transfer': 'Chuyển khoản',
+        'momo': 'Ví MoMo',
+        'zalopay': 'Ví ZaloPay',
+        'credit_card': 'Thẻ tín dụng'
+    };
+    return texts[method] || method;
+}
+
+function getDocumentIcon(category) {
+    const icons = {
+        'guide': 'book',
+        'regulation': 'gavel',
+        'template': 'file-alt',
+        'announcement': 'bullhorn'
+    };
+    return icons[category] || 'file';
+}
+
+function formatCurrency(amount) {
+    return new Intl.NumberFormat('vi-VN', {
+        style: 'currency',
+        currency: 'VND'
+    }).format(amount);
+}
+
+function formatDate(dateString) {
+    if (!dateString) return '-';
+    const date = new Date(dateString);
+    return date.toLocaleDateString('vi-VN');
+}
+
+// ==================== PROFILE FUNCTIONS ====================
+function enableProfileEditing() {
+    const fields = [
+        'profileFullname', 'profileEmail', 'profileDob', 'profileGender',
+        'profileAddress', 'profilePhone', 'profileHighSchool', 'profileGraduationYear'
+    ];
+
+    fields.forEach(fieldId => {
+        const field = document.getElementById(fieldId);
+        if (field) {
+            field.readOnly = false;
+            field.disabled = false;
+        }
+    });
+
+    document.getElementById('profileActions').style.display = 'flex';
+}
+
+function cancelProfileEditing() {
+    loadProfile();
+}
+
+async function saveProfile() {
+    showLoading();
+
+    try {
+        const formData = {
+            full_name: document.getElementById('profileFullname').value,
+            email: document.getElementById('profileEmail').value,
+            date_of_birth: document.getElementById('profileDob').value,
+            gender: document.getElementById('profileGender').value,
+            address: document.getElementById('profileAddress').value,
+            phone: document.getElementById('profilePhone').value,
+            high_school: document.getElementById('profileHighSchool').value,
+            graduation_year: document.getElementById('profileGraduationYear').value
+        };
+
+        const result = await apiCall('/candidate/profile/update', {
+            method: 'POST',
+            body: JSON.stringify(formData)
+        });
+
+        if (result.success) {
+            showAlert('Cập nhật thông tin thành công!', 'success');
+            currentUser.full_name = formData.full_name;
+            document.getElementById('userFullname').textContent = formData.full_name;
+
+            await loadProfile();
+        } else {
+            showAlert('Cập nhật thông tin thất bại', 'error');
+        }
+    } catch (error) {
+        showAlert('Cập nhật thông tin thất bại', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+// ==================== ASPIRATION FUNCTIONS ====================
+async function loadUniversityMajors(universityId) {
+    if (!universityId) return;
+
+    try {
+        const result = await apiCall(`/universities/${universityId}/majors`);
+        majors = result.data;
+
+        const majorSelect = document.getElementById('majorSelect');
+        majorSelect.innerHTML = '<option value="">-- Chọn ngành --</option>' +
+            majors.map(major => `
+                <option value="${major.id}">${major.name} (${major.code})</option>
+            `).join('');
+        majorSelect.disabled = false;
+    } catch (error) {
+        showAlert('Lỗi khi tải danh sách ngành học', 'error');
+    }
+}
+
+async function addNewAspiration() {
+    const universityId = document.getElementById('universitySelect').value;
+    const majorId = document.getElementById('majorSelect').value;
+    const priority = document.getElementById('prioritySelect').value;
+
+    if (!universityId || !majorId || !priority) {
+        showAlert('Vui lòng chọn đầy đủ thông tin', 'error');
+        return;
+    }
+
+    showLoading();
+
+    try {
+        const result = await apiCall('/candidate/aspirations/add', {
+            method: 'POST',
+            body: JSON.stringify({
+                university_id: universityId,
+                major_id: majorId,
+                priority: priority
+            })
+        });
+
+        if (result.success) {
+            showAlert('Thêm nguyện vọng thành công!', 'success');
+            await loadAspiration();
+        } else {
+            showAlert(result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Thêm nguyện vọng thất bại', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+async function removeAspiration(aspirationId) {
+    if (!confirm('Bạn có chắc chắn muốn xóa nguyện vọng này?')) return;
+
+    showLoading();
+
+    try {
+        const result = await apiCall('/candidate/aspirations/remove', {
+            method: 'POST',
+            body: JSON.stringify({ aspiration_id: aspirationId })
+        });
+
+        if (result.success) {
+            showAlert('Xóa nguyện vọng thành công!', 'success');
+            await loadAspiration();
+        } else {
+            showAlert(result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Xóa nguyện vọng thất bại', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+// ==================== PAYMENT FUNCTIONS ====================
+async function showPaymentModal(aspirationId) {
+    selectedAspirationForPayment = aspirationId;
+
+    try {
+        const configResult = await apiCall('/payment/config');
+        const paymentConfig = configResult.data;
+
+        document.getElementById('paymentContent').innerHTML = `
+            <div class="alert alert-info">
+                <i class="fas fa-info-circle"></i>
+                Phí đăng ký: ${formatCurrency(paymentConfig.aspiration_fee)}
+            </div>
+
+            <div class="form-group">
+                <label>Chọn phương thức thanh toán</label>
+                <div class="payment-methods">
+                    ${paymentConfig.payment_methods.map(method => `
+                        <div class="payment-method" onclick="selectPaymentMethod('${method.value}')">
+                            <div class="payment-icon">
+                                <i class="fas fa-${method.value === 'bank_transfer' ? 'university' : method.value === 'momo' ? 'mobile-alt' : method.value === 'zalopay' ? 'qrcode' : 'credit-card'}"></i>
+                            </div>
+                            <div>${method.label}</div>
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+
+            ${selectedPaymentMethod === 'bank_transfer' ? `
+                <div class="bank-info">
+                    <h4>Thông tin chuyển khoản:</h4>
+                    <p><strong>Ngân hàng:</strong> ${paymentConfig.bank_info.bank_name}</p>
+                    <p><strong>Số tài khoản:</strong> ${paymentConfig.bank_info.account_number}</p>
+                    <p><strong>Chủ tài khoản:</strong> ${paymentConfig.bank_info.account_holder}</p>
+                    <p><strong>Chi nhánh:</strong> ${paymentConfig.bank_info.branch}</p>
+                    <p><strong>Nội dung:</strong> Thanh toán nguyện vọng ${aspirationId}</p>
+                </div>
+            ` : ''}
+
+            <div class="form-actions">
+                <button type="button" class="btn btn-secondary" onclick="closeModal('paymentModal')">Hủy</button>
+                <button type="button" class="btn btn-primary" onclick="processPayment()" ${!selectedPaymentMethod ? 'disabled' : ''}>
+                    <i class="fas fa-credit-card"></i> Xác nhận thanh toán
+                </button>
+            </div>
+        `;
+
+        showModal('paymentModal');
+    } catch (error) {
+        showAlert('Lỗi khi tải thông tin thanh toán', 'error');
+    }
+}
+
+function selectPaymentMethod(method) {
+    selectedPaymentMethod = method;
+
+    // Update UI
+    document.querySelectorAll('.payment-method').forEach(el => {
+        el.classList.remove('selected');
+    });
+    event.target.closest('.payment-method').classList.add('selected');
+
+    // Enable confirm button
+    document.querySelector('#paymentModal .btn-primary').disabled = false;
+
+    // Refresh bank info if needed
+    if (method === 'bank_transfer') {
+        showPaymentModal(selectedAspirationForPayment);
+    }
+}
+
+async function processPayment() {
+    if (!selectedPaymentMethod || !selectedAspirationForPayment) {
+        showAlert('Vui lòng chọn phương thức thanh toán', 'error');
+        return;
+    }
+
+    showLoading();
+
+    try {
+        const result = await apiCall('/payment/create', {
+            method: 'POST',
+            body: JSON.stringify({
+                aspiration_id: selectedAspirationForPayment,
+                payment_method: selectedPaymentMethod
+            })
+        });
+
+        if (result.success) {
+            showAlert('Tạo giao dịch thành công!', 'success');
+            closeModal('paymentModal');
+
+            if (selectedPaymentMethod === 'bank_transfer') {
+                showAlert('Vui lòng chuyển khoản theo thông tin đã cung cấp', 'info');
+            } else {
+                // Simulate payment verification for demo
+                setTimeout(async () => {
+                    await apiCall('/payment/verify', {
+                        method: 'POST',
+                        body: JSON.stringify({
+                            transaction_id: result.data.transaction_id
+                        })
+                    });
+                    showAlert('Thanh toán thành công!', 'success');
+                    await loadPayment();
+                }, 2000);
+            }
+
+            await loadPayment();
+        } else {
+            showAlert(result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Tạo giao dịch thất bại', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+// ==================== MANAGER FUNCTIONS ====================
+async function showApprovalModal(aspirationId, action) {
+    selectedAspirationForApproval = aspirationId;
+    const aspiration = pendingAspirations.find(asp => asp.id === aspirationId);
+
+    document.getElementById('approvalModalTitle').innerHTML = `
+        <i class="fas fa-${action === 'approve' ? 'check-circle' : 'times-circle'}"></i>
+        ${action === 'approve' ? 'Duyệt' : 'Từ chối'} Nguyện vọng
+    `;
+
+    document.getElementById('approvalContent').innerHTML = `
+        <div class="alert alert-${action === 'approve' ? 'info' : 'warning'}">
+            <i class="fas fa-${action === 'approve' ? 'info-circle' : 'exclamation-triangle'}"></i>
+            Bạn đang ${action === 'approve' ? 'duyệt' : 'từ chối'} nguyện vọng của thí sinh <strong>${aspiration.candidate_name}</strong>
+        </div>
+
+        <div class="form-group">
+            <label>Thí sinh: ${aspiration.candidate_name}</label>
+        </div>
+
+        <div class="form-group">
+            <label>CCCD: ${aspiration.citizen_id}</label>
+        </div>
+
+        <div class="form-group">
+            <label>Trường: ${aspiration.university_name}</label>
+        </div>
+
+        <div class="form-group">
+            <label>Ngành: ${aspiration.major_name}</label>
+        </div>
+
+        <div class="form-group">
+            <label>Ưu tiên: ${aspiration.priority}</label>
+        </div>
+
+        <div class="form-group">
+            <label>Ghi chú:</label>
+            <textarea id="approvalNotes" rows="3" placeholder="${action === 'approve' ? 'Ghi chú cho thí sinh (nếu có)' : 'Lý do từ chối'}"></textarea>
+        </div>
+
+        <div class="form-actions">
+            <button type="button" class="btn btn-secondary" onclick="closeModal('approvalModal')">Hủy</button>
+            <button type="button" class="btn btn-${action === 'approve' ? 'success' : 'danger'}" onclick="${action === 'approve' ? 'approveAspiration' : 'rejectAspiration'}()">
+                <i class="fas fa-${action === 'approve' ? 'check' : 'times'}"></i>
+                ${action === 'approve' ? 'Duyệt' : 'Từ chối'}
+            </button>
+        </div>
+    `;
+
+    showModal('approvalModal');
+}
+
+async function approveAspiration() {
+    const notes = document.getElementById('approvalNotes').value;
+
+    showLoading();
+
+    try {
+        const result = await apiCall('/manager/aspiration/approve', {
+            method: 'POST',
+            body: JSON.stringify({
+                aspiration_id: selectedAspirationForApproval,
+                notes: notes
+            })
+        });
+
+        if (result.success) {
+            showAlert('Duyệt nguyện vọng thành công!', 'success');
+            closeModal('approvalModal');
+            await loadManagerAspiration();
+            await loadDashboard();
+        } else {
+            showAlert(result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Duyệt nguyện vọng thất bại', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+async function rejectAspiration() {
+    const reason = document.getElementById('approvalNotes').value;
+
+    if (!reason) {
+        showAlert('Vui lòng nhập lý do từ chối', 'error');
+        return;
+    }
+
+    showLoading();
+
+    try {
+        const result = await apiCall('/manager/aspiration/reject', {
+            method: 'POST',
+            body: JSON.stringify({
+                aspiration_id: selectedAspirationForApproval,
+                reason: reason
+            })
+        });
+
+        if (result.success) {
+            showAlert('Từ chối nguyện vọng thành công!', 'success');
+            closeModal('approvalModal');
+            await loadManagerAspiration();
+            await loadDashboard();
+        } else {
+            showAlert(result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Từ chối nguyện vọng thất bại', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+// ==================== PRINT FUNCTIONS ====================
+async function generatePrintData() {
+    try {
+        const result = await apiCall('/print/aspirations');
+
+        if (result.success) {
+            const data = result.data;
+
+            document.getElementById('printContent').innerHTML = `
+                <div class="print-container">
+                    <div class="print-header">
+                        <h1>ĐẠI HỌC QUỐC GIA HÀ NỘI</h1>
+                        <h2>DANH SÁCH NGUYỆN VỌNG ĐĂNG KÝ XÉT TUYỂN</h2>
+                        <p>Kỳ thi tuyển sinh đại học năm 2025</p>
+                    </div>
+
+                    <div class="candidate-info">
+                        <h3>THÔNG TIN THÍ SINH</h3>
+                        <table class="print-table">
+                            <tr>
+                                <td><strong>Họ và tên:</strong></td>
+                                <td>${data.candidate.full_name}</td>
+                                <td><strong>Số CCCD:</strong></td>
+                                <td>${data.candidate.citizen_id}</td>
+                            </tr>
+                            <tr>
+                                <td><strong>Ngày sinh:</strong></td>
+                                <td>${data.candidate.date_of_birth}</td>
+                                <td><strong>Giới tính:</strong></td>
+                                <td>${data.candidate.gender === 'male' ? 'Nam' : 'Nữ'}</td>
+                            </tr>
+                            <tr>
+                                <td><strong>Địa chỉ:</strong></td>
+                                <td colspan="3">${data.candidate.address}</td>
+                            </tr>
+                            <tr>
+                                <td><strong>Trường THPT:</strong></td>
+                                <td>${data.candidate.high_school}</td>
+                                <td><strong>Năm tốt nghiệp:</strong></td>
+                                <td>${data.candidate.graduation_year}</td>
+                            </tr>
+                        </table>
+                    </div>
+
+                    <div class="aspirations-list">
+                        <h3>DANH SÁCH NGUYỆN VỌNG</h3>
+                        <table class="print-table">
+                            <thead>
+                                <tr>
+                                    <th>STT</th>
+                                    <th>Mã trường</th>
+                                    <th>Tên trường</th>
+                                    <th>Mã ngành</th>
+                                    <th>Tên ngành</th>
+                                    <th>Khối thi</th>
+                                    <th>Trạng thái</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                                ${data.aspirations.map(asp => `
+                                    <tr>
+                                        <td>${asp.priority}</td>
+                                        <td>${asp.university_code}</td>
+                                        <td>${asp.university_name}</td>
+                                        <td>${asp.major_code}</td>
+                                        <td>${asp.major_name}</td>
+                                        <td>${asp.subject_group}</td>
+                                        <td>${getStatusText(asp.status)}</td>
+                                    </tr>
+                                `).join('')}
+                            </tbody>
+                        </table>
+                    </div>
+
+                    <div class="print-footer">
+                        <p>Ngày in: ${data.print_date}</p>
+                        <div class="signature-section">
+                            <div class="signature-box">
+                                <p>Thí sinh</p>
+                                <div class="signature-line"></div>
+                                <p><em>(Ký và ghi rõ họ tên)</em></p>
+                            </div>
+                            <div class="signature-box">
+                                <p>Cán bộ tiếp nhận</p>
+                                <div class="signature-line"></div>
+                                <p><em>(Ký, ghi rõ họ tên và đóng dấu)</em></p>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            showModal('printModal');
+        } else {
+            showAlert('Lỗi khi tạo dữ liệu in', 'error');
+        }
+    } catch (error) {
+        showAlert('Lỗi khi tạo dữ liệu in', 'error');
+    }
+}
+
+async function exportToCSV() {
+    try {
+        const result = await apiCall('/print/aspirations/csv');
+
+        if (result.success) {
+            // Create and download CSV file
+            const blob = new Blob([result.data], { type: 'text/csv;charset=utf-8;' });
+            const link = document.createElement('a');
+            const url = URL.createObjectURL(blob);
+
+            link.setAttribute('href', url);
+            link.setAttribute('download', 'danh_sach_nguyen_vong.csv');
+            link.style.visibility = 'hidden';
+
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+
+            showAlert('Xuất file CSV thành công!', 'success');
+        } else {
+            showAlert('Lỗi khi xuất file CSV', 'error');
+        }
+    } catch (error) {
+        showAlert('Lỗi khi xuất file CSV', 'error');
+    }
+}
+
+// ==================== INITIALIZATION ====================
+document.addEventListener('DOMContentLoaded', function() {
+    const token = localStorage.getItem('token');
+    if (token) {
+        // In a real application, you would verify the token with the server
+        // For now, we'll just show the login page
+        document.getElementById('loginPage').style.display = 'block';
+    } else {
+        document.getElementById('loginPage').style.display = 'block';
+    }
+});
+
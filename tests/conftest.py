@@ -0,0 +1,109 @@
+"""Fixture dùng chung: server thật chạy trên database tạm"""
+import http.client
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import university_admission as ua
+
+
+@pytest.fixture(scope='session', autouse=True)
+def database(tmp_path_factory):
+    """Database và file khóa token tạm, không đụng tới file trong repo"""
+    data_dir = tmp_path_factory.mktemp('data')
+    ua.config.set('db_path', str(data_dir / 'admission.db'))
+    ua.token_keyring.path = str(data_dir / 'token_keys.json')
+    ua.init_database()
+    yield
+    ua.password_hasher.shutdown()
+    ua.db_pool.close_all()
+
+
+@pytest.fixture(scope='session')
+def server(database):
+    # Các test đăng nhập nhiều lần từ cùng một IP
+    ua.login_ip_limiter.rate = ua.login_account_limiter.rate = float('inf')
+    ua.login_ip_limiter.burst = ua.login_account_limiter.burst = float('inf')
+    httpd = ua.ThreadPoolHTTPServer(('127.0.0.1', 0), ua.AdmissionRequestHandler,
+                                    max_workers=4, queue_size=16)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class ApiClient:
+    """Gọi API qua HTTP, trả về (status, headers, body JSON)"""
+
+    def __init__(self, address):
+        self.address = address
+
+    def request(self, method, path, body=None, token=None, headers=None):
+        headers = dict(headers or {})
+        if token:
+            headers['Authorization'] = token
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        conn = http.client.HTTPConnection(*self.address, timeout=30)
+        try:
+            conn.request(method, path, body, headers)
+            response = conn.getresponse()
+            raw = response.read()
+        finally:
+            conn.close()
+        data = json.loads(raw) if raw and 'json' in (response.getheader('Content-Type') or '') else raw
+        return response.status, response.headers, data
+
+    def get(self, path, token=None, **kwargs):
+        return self.request('GET', path, token=token, **kwargs)
+
+    def post(self, path, body, token=None, **kwargs):
+        return self.request('POST', path, body, token=token, **kwargs)
+
+    def login(self, username, password):
+        status, _, data = self.post('/api/auth/login', {'username': username, 'password': password})
+        assert status == 200 and data['success'], data
+        return data['token']
+
+
+@pytest.fixture
+def api(server):
+    return ApiClient(server)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Đồng hồ giả cho time.time()"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(ua.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def seed_aspirations():
+    """Tạo thí sinh mới với các nguyện vọng chờ duyệt; trả về danh sách id nguyện vọng"""
+    def seed(registered_at=('2025-06-01 08:00:00',), payment_status='pending', major_id=1):
+        with ua.db_pool.connection() as conn:
+            university_id = conn.execute('SELECT university_id FROM majors WHERE id = ?', (major_id,)).fetchone()[0]
+            number = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+            user_id = conn.execute('''
+                INSERT INTO users (username, password, email, full_name, role)
+                VALUES (?, 'x', ?, ?, 'candidate')
+            ''', (f'seed{number}', f'seed{number}@example.com', f'Thí sinh {number}')).lastrowid
+            candidate_id = conn.execute('INSERT INTO candidates (user_id, citizen_id) VALUES (?, ?)',
+                                        (user_id, f'seed{number}')).lastrowid
+            ids = [conn.execute('''
+                INSERT INTO aspirations (candidate_id, exam_id, university_id, major_id, priority_order,
+                                         payment_status, registered_at)
+                VALUES (?, 1, ?, ?, ?, ?, ?)
+            ''', (candidate_id, university_id, major_id, priority, payment_status, timestamp)).lastrowid
+                   for priority, timestamp in enumerate(registered_at, 1)]
+            conn.commit()
+        return ids
+    return seed
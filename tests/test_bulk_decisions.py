@@ -0,0 +1,76 @@
+"""Kiểm tra duyệt/từ chối hàng loạt: gửi lại an toàn, kết quả từng nguyện vọng, chế độ lọc"""
+import pytest
+
+import university_admission as ua
+
+
+def results_by_id(data):
+    return {item['id']: item['result'] for item in data['results']}
+
+
+def test_bulk_approve_is_idempotent(api, seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-07-01 08:00:00'] * 3)
+    token = api.login('manager', 'manager123')
+    body = {'aspiration_ids': ids + [ids[0], 10 ** 9]}
+
+    status, _, first = api.post('/api/manager/aspirations/bulk-approve', body, token)
+    assert status == 200
+    assert results_by_id(first) == {**dict.fromkeys(ids, 'updated'), 10 ** 9: 'not_found'}
+
+    _, _, second = api.post('/api/manager/aspirations/bulk-approve', body, token)
+    assert second['summary'] == {'unchanged': 3, 'not_found': 1}
+
+    _, _, rejected = api.post('/api/manager/aspirations/bulk-reject', {'aspiration_ids': ids}, token)
+    assert rejected['summary'] == {'conflict': 3}
+
+
+def test_retry_after_failed_chunk(monkeypatch, seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-07-02 08:00:00'] * 4)
+    monkeypatch.setitem(ua.config.config, 'bulk_decision_chunk_size', 2)
+    apply_chunk = ua.apply_decision_chunk
+    calls = []
+
+    def failing_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise ua.sqlite3.OperationalError('disk I/O error')
+        return apply_chunk(*args)
+
+    monkeypatch.setattr(ua, 'apply_decision_chunk', failing_chunk)
+    with pytest.raises(ua.sqlite3.OperationalError):
+        ua.decide_aspirations('approved', 2, aspiration_ids=ids)
+    monkeypatch.setattr(ua, 'apply_decision_chunk', apply_chunk)
+
+    # Lô đầu đã commit, lô lỗi được làm lại
+    results = ua.decide_aspirations('approved', 2, aspiration_ids=ids)
+    assert [item['result'] for item in results] == ['unchanged', 'unchanged', 'updated', 'updated']
+
+
+def test_bulk_reject_by_filter_in_batches(api, monkeypatch, seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-07-03 08:00:00'] * 5)
+    monkeypatch.setitem(ua.config.config, 'bulk_decision_max_ids', 2)
+    token = api.login('manager', 'manager123')
+    body = {'filter': {'registered_from': '2025-07-03', 'registered_to': '2025-07-03'}, 'reason': 'Hết chỉ tiêu'}
+
+    rejected = []
+    while True:
+        status, _, data = api.post('/api/manager/aspirations/bulk-reject', body, token)
+        assert status == 200
+        rejected += [item['id'] for item in data['results'] if item['result'] == 'updated']
+        if not data['has_more']:
+            break
+
+    assert sorted(rejected) == ids
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'aspiration_ids': [1], 'filter': {'major_id': 1}},
+    {'aspiration_ids': ['1']},
+    {'filter': {}},
+    {'filter': {'unknown': 1}},
+])
+def test_bulk_decision_rejects_invalid_body(api, body):
+    token = api.login('manager', 'manager123')
+    status, _, data = api.post('/api/manager/aspirations/bulk-approve', body, token)
+    assert status == 400 and not data['success']
@@ -0,0 +1,100 @@
+"""Kiểm tra kênh SSE: gửi lại sự kiện bị lỡ theo Last-Event-ID và đẩy sự kiện mới"""
+import json
+import socket
+import threading
+
+import pytest
+
+import university_admission as ua
+
+
+@pytest.fixture(scope='module')
+def events(server):
+    if ua.event_hub.loop is None:
+        ua.event_hub.start()
+    return server
+
+
+def candidate_token(aspiration_id):
+    with ua.db_pool.connection() as conn:
+        user_id, username = conn.execute('''
+            SELECT u.id, u.username FROM aspirations a
+            JOIN candidates c ON a.candidate_id = c.id
+            JOIN users u ON c.user_id = u.id
+            WHERE a.id = ?
+        ''', (aspiration_id,)).fetchone()
+    return ua.create_token(user_id, username, 'candidate')
+
+
+def latest_event_id():
+    with ua.db_pool.connection() as conn:
+        return ua.status_event_bounds(conn)[1]
+
+
+def read_events(address, token, last_event_id, count):
+    """Mở kênh SSE, đọc tới khi nhận đủ count sự kiện; trả về [(id, loại, data)]"""
+    headers = f'Authorization: {token}\r\n'
+    if last_event_id is not None:
+        headers += f'Last-Event-ID: {last_event_id}\r\n'
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(f'GET /api/events HTTP/1.1\r\nHost: test\r\n{headers}\r\n'.encode())
+        buffer = b''
+        while True:
+            head, _, stream = buffer.partition(b'\r\n\r\n')
+            frames = [frame for frame in stream.split(b'\n\n')[:-1] if frame.startswith(b'id: ')]
+            if len(frames) >= count:
+                break
+            chunk = sock.recv(65536)
+            assert chunk, buffer
+            buffer += chunk
+    assert head.startswith(b'HTTP/1.1 200')
+    result = []
+    for frame in frames[:count]:
+        fields = dict(line.split(': ', 1) for line in frame.decode().split('\n'))
+        result.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return result
+
+
+def test_resume_from_last_event_id(events, seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-10-01 08:00:00'] * 2)
+    other = seed_aspirations(registered_at=['2025-10-01 08:00:00'])
+    token = candidate_token(ids[0])
+    start = latest_event_id()
+    ua.decide_aspirations('approved', 2, aspiration_ids=ids[:1])
+    ua.decide_aspirations('approved', 2, aspiration_ids=other)
+    ua.decide_aspirations('rejected', 2, aspiration_ids=ids[1:])
+
+    missed = read_events(events, token, start, 2)
+
+    # Chỉ sự kiện của thí sinh này, đúng thứ tự
+    assert [(data['aspiration_id'], data['status']) for _, _, data in missed] == [
+        (ids[0], 'approved'), (ids[1], 'rejected')]
+    assert missed[0][0] < missed[1][0]
+
+    resumed = read_events(events, token, missed[0][0], 1)
+    assert resumed == missed[1:]
+
+
+def test_new_events_pushed_after_backlog(events, seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-10-02 08:00:00'] * 2)
+    manager = ua.create_token(2, 'manager', 'manager')
+    start = latest_event_id()
+    ua.decide_aspirations('approved', 2, aspiration_ids=ids[:1])
+
+    # Sự kiện thứ hai phát sau khi kết nối đã mở, qua luồng đọc status_events
+    threading.Timer(0.3, ua.decide_aspirations, ('rejected', 2), {'aspiration_ids': ids[1:]}).start()
+    received = read_events(events, manager, start, 2)
+
+    assert [data['aspiration_id'] for _, _, data in received] == ids
+
+
+def test_reset_when_backlog_too_large(events, monkeypatch, seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-10-03 08:00:00'] * 3)
+    token = candidate_token(ids[0])
+    start = latest_event_id()
+    ua.decide_aspirations('approved', 2, aspiration_ids=ids)
+    monkeypatch.setitem(ua.config.config, 'sse_backlog_limit', 2)
+
+    (event_id, kind, _), = read_events(events, token, start, 1)
+
+    assert kind == 'reset' and event_id == latest_event_id()
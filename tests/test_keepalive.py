@@ -0,0 +1,85 @@
+"""Kiểm tra keep-alive: body chưa đọc không được hiểu thành request kế tiếp"""
+import http.client
+import socket
+import time
+
+import pytest
+
+import university_admission as ua
+
+SMUGGLED = b'GET /api/universities HTTP/1.1\r\nHost: test\r\n\r\n'
+
+
+def exchange(address, raw_request):
+    """Gửi request thô rồi đọc đến khi server đóng kết nối"""
+    with socket.create_connection(address, timeout=10) as sock:
+        sock.sendall(raw_request)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+
+def request_with_body(method, path, body, extra_headers=b''):
+    return (f'{method} {path} HTTP/1.1\r\nHost: test\r\n'
+            f'Content-Length: {len(body)}\r\n'.encode() + extra_headers + b'\r\n' + body)
+
+
+def test_unauthorized_post_closes_connection(server):
+    response = exchange(server, request_with_body('POST', '/api/candidate/profile/update', SMUGGLED))
+    assert response.startswith(b'HTTP/1.1 401')
+    assert b'Connection: close' in response
+    assert response.count(b'HTTP/1.1 ') == 1
+
+
+def test_invalid_query_with_body_closes_connection(server):
+    response = exchange(server, request_with_body(
+        'GET', '/api/manager/pending-aspirations?limit=abc', SMUGGLED))
+    assert response.startswith(b'HTTP/1.1 400')
+    assert b'Connection: close' in response
+    assert response.count(b'HTTP/1.1 ') == 1
+
+
+def test_read_body_keeps_connection(server):
+    body = b'{"username": "nobody", "password": "x"}'
+    login = request_with_body('POST', '/api/auth/login', body,
+                              b'Content-Type: application/json\r\n')
+    closing = b'GET /api/universities HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n'
+    response = exchange(server, login + closing)
+    assert response.count(b'HTTP/1.1 ') == 2
+
+
+def test_idle_connections_do_not_block_workers(server):
+    # Nhiều kết nối keep-alive rảnh hơn số worker (4) không được làm request mới phải chờ
+    idle = []
+    for _ in range(12):
+        conn = http.client.HTTPConnection(*server, timeout=10)
+        conn.request('GET', '/api/universities')
+        conn.getresponse().read()
+        idle.append(conn)
+
+    started = time.monotonic()
+    fresh = http.client.HTTPConnection(*server, timeout=10)
+    fresh.request('GET', '/api/universities')
+    assert fresh.getresponse().status == 200
+    assert time.monotonic() - started < 1
+    fresh.close()
+
+    # Kết nối rảnh vẫn dùng lại được
+    for conn in idle:
+        conn.request('GET', '/api/universities')
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200
+        conn.close()
+
+
+@pytest.mark.parametrize('content_length', [b'-1', b'%d' % (ua.config.get('max_request_body') + 1)])
+def test_oversized_body_rejected_without_reading(server, content_length):
+    login = (b'POST /api/auth/login HTTP/1.1\r\nHost: test\r\n'
+             b'Content-Type: application/json\r\nContent-Length: ' + content_length + b'\r\n\r\n{}')
+    response = exchange(server, login)
+    assert response.startswith(b'HTTP/1.1 413')
+    assert b'Connection: close' in response
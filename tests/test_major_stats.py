@@ -0,0 +1,51 @@
+"""Kiểm tra bảng tổng hợp major_stats và API thống kê theo trường/ngành"""
+import university_admission as ua
+
+
+def aggregate(conn):
+    return {row[0]: row[1:] for row in conn.execute(ua.major_stats_aggregate_query())}
+
+
+def test_major_stats_follow_aspiration_changes(seed_aspirations):
+    with ua.db_pool.connection() as conn:
+        other_major = conn.execute('SELECT MAX(id) FROM majors').fetchone()[0]
+    ids = seed_aspirations(registered_at=['2025-09-01 08:00:00'] * 4)
+    ua.decide_aspirations('approved', 2, aspiration_ids=ids[:2])
+    with ua.db_pool.connection() as conn:
+        conn.execute("UPDATE aspirations SET payment_status = 'paid' WHERE id = ?", (ids[0],))
+        conn.execute('UPDATE aspirations SET major_id = ? WHERE id = ?', (other_major, ids[1]))
+        conn.execute('DELETE FROM aspirations WHERE id = ?', (ids[2],))
+        conn.commit()
+
+        stored = ua.read_major_stats(conn)
+        expected = aggregate(conn)
+
+    assert {major_id: values for major_id, values in stored.items() if any(values)} == expected
+    assert ua.reconcile_stats_counters() == {}
+
+
+def test_breakdown_by_major(api, seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-09-02 08:00:00'] * 2)
+    ua.decide_aspirations('approved', 2, aspiration_ids=ids[:1])
+    token = api.login('manager', 'manager123')
+    with ua.db_pool.connection() as conn:
+        university_id, quota = conn.execute('SELECT university_id, quota FROM majors WHERE id = 1').fetchone()
+        applications, approved = conn.execute('''
+            SELECT COUNT(*), SUM(status = 'approved') FROM aspirations WHERE major_id = 1
+        ''').fetchone()
+
+    status, _, data = api.get(f'/api/manager/stats/breakdown?university_id={university_id}', token)
+
+    assert status == 200
+    breakdown = data['data']
+    assert breakdown['group_by'] == 'major'
+    row = next(row for row in breakdown['rows'] if row['key'] == 1)
+    assert (row['applications'], row['approved'], row['quota']) == (applications, approved, quota)
+    assert row['fill_rate'] == round(approved / quota, 4)
+    assert breakdown['totals']['applications'] == sum(row['applications'] for row in breakdown['rows'])
+
+
+def test_breakdown_rejects_unknown_group(api):
+    token = api.login('manager', 'manager123')
+    status, _, _ = api.get('/api/manager/stats/breakdown?group_by=city', token)
+    assert status == 400
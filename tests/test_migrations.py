@@ -0,0 +1,30 @@
+"""Kiểm tra nâng cấp database cũ qua các migration"""
+import sqlite3
+
+import university_admission as ua
+
+
+def test_upgrade_database_without_sessions_table(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'old.db')
+    # Database tạo trước khi có bảng sessions: đã chạy migration 1-3
+    for version, _, migrate, _ in ua.MIGRATIONS[:3]:
+        migrate(conn)
+        conn.execute(f'PRAGMA user_version = {version}')
+        conn.commit()
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sessions'").fetchone()
+
+    assert ua.migrate_database(conn)
+
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(sessions)')}
+    assert {'token', 'user_id', 'expires_at'} <= columns
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == ua.SCHEMA_VERSION
+
+
+def test_migrations_can_rerun(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'new.db')
+    ua.migrate_database(conn)
+    # Database đã nâng cấp với số thứ tự migration cũ chạy lại một phần danh sách
+    conn.execute('PRAGMA user_version = 3')
+
+    assert ua.migrate_database(conn)
+    assert conn.execute('SELECT COUNT(*) FROM catalog_version').fetchone()[0] == 1
@@ -0,0 +1,17 @@
+"""Kiểm tra pool băm mật khẩu tự phục hồi khi worker chết"""
+import os
+import signal
+
+import university_admission as ua
+
+
+def test_login_recovers_after_hash_worker_killed(api):
+    api.login('candidate', 'candidate123')
+    executor = ua.password_hasher.executor
+    for pid in list(executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    token = api.login('candidate', 'candidate123')
+
+    assert token
+    assert ua.password_hasher.executor is not executor
@@ -0,0 +1,63 @@
+"""Kiểm tra phân trang theo cursor của danh sách nguyện vọng chờ duyệt"""
+import university_admission as ua
+
+
+def walk_pages(api, token, query):
+    rows, cursor, pages = [], None, 0
+    while True:
+        path = f'/api/manager/pending-aspirations?{query}' + (f'&cursor={cursor}' if cursor else '')
+        status, _, data = api.get(path, token)
+        assert status == 200, data
+        rows += [(row['registered_at'], row['id']) for row in data['data']]
+        pages += 1
+        cursor = data['next_cursor']
+        if not cursor:
+            return rows, pages
+
+
+def test_cursor_pages_cover_every_row_once(api, seed_aspirations):
+    # Nhiều dòng cùng registered_at: id phân định thứ tự giữa các trang
+    for _ in range(5):
+        seed_aspirations(registered_at=['2025-06-01 08:00:00'] * 3 + ['2025-06-02 09:00:00'] * 2)
+    with ua.db_pool.connection() as conn:
+        expected = conn.execute('''
+            SELECT registered_at, id FROM aspirations WHERE status = 'pending'
+            ORDER BY registered_at DESC, id DESC
+        ''').fetchall()
+    token = api.login('manager', 'manager123')
+
+    rows, pages = walk_pages(api, token, 'limit=4')
+
+    assert rows == expected
+    assert pages == (len(expected) + 3) // 4
+
+
+def test_cursor_pages_with_filters(api, seed_aspirations):
+    seed_aspirations(registered_at=['2025-05-01 08:00:00', '2025-05-02 08:00:00', '2025-05-03 08:00:00'],
+                     payment_status='paid')
+    token = api.login('manager', 'manager123')
+
+    rows, _ = walk_pages(api, token, 'limit=1&payment_status=paid&registered_from=2025-05-02&registered_to=2025-05-03')
+
+    with ua.db_pool.connection() as conn:
+        expected = conn.execute('''
+            SELECT registered_at, id FROM aspirations
+            WHERE status = 'pending' AND payment_status = 'paid'
+              AND registered_at BETWEEN '2025-05-02' AND '2025-05-03 23:59:59'
+            ORDER BY registered_at DESC, id DESC
+        ''').fetchall()
+    assert rows == expected and len(rows) >= 2
+
+
+def test_invalid_cursor_returns_400(api):
+    token = api.login('manager', 'manager123')
+    forged = ua.b64encode(b'["2025-06-01", "1"]')
+
+    for cursor in ('zzz', forged, ua.b64encode(b'not json')):
+        status, _, data = api.get(f'/api/manager/pending-aspirations?cursor={cursor}', token)
+        assert status == 400 and data['error'] == 'Invalid query parameter: cursor'
+
+
+def test_cursor_roundtrip():
+    cursor = ua.encode_page_cursor('2025-06-01 08:00:00', 42)
+    assert ua.decode_page_cursor(cursor) == ('2025-06-01 08:00:00', 42)
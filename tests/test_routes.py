@@ -0,0 +1,43 @@
+"""Kiểm tra bảng route: tra path tĩnh/tham số, 404 và 405"""
+import university_admission as ua
+
+
+def test_match_static_and_parameter_routes():
+    route, params, allowed = ua.router.match('GET', '/api/universities')
+    assert route.handler_name == 'get_universities' and params == {} and allowed == ('GET',)
+
+    route, params, _ = ua.router.match('GET', '/api/universities/7/majors')
+    assert route.handler_name == 'get_majors' and params == {'university_id': 7}
+
+
+def test_match_unknown_path_and_bad_parameter():
+    assert ua.router.match('GET', '/api/nope') == (None, {}, ())
+    route, _, allowed = ua.router.match('GET', '/api/universities/abc/majors')
+    assert route is None and allowed == ()
+
+
+def test_match_wrong_method_reports_allowed():
+    route, _, allowed = ua.router.match('GET', '/api/auth/login')
+    assert route is None and allowed == ('POST',)
+
+
+def test_unknown_api_path_returns_404(api):
+    status, _, _ = api.get('/api/nope')
+    assert status == 404
+    status, _, _ = api.get('/api/universities/abc/majors')
+    assert status == 404
+
+
+def test_wrong_method_returns_405_with_allow(api):
+    status, headers, _ = api.post('/api/universities', {})
+    assert status == 405
+    assert headers['Allow'] == 'GET, OPTIONS'
+
+    status, headers, _ = api.get('/api/auth/login')
+    assert status == 405
+    assert headers['Allow'] == 'POST, OPTIONS'
+
+
+def test_parameter_route_dispatches(api):
+    status, _, data = api.get('/api/universities/1/majors')
+    assert status == 200 and data['success']
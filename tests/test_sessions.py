@@ -0,0 +1,94 @@
+"""Kiểm tra kho phiên đăng nhập: hết hạn, gia hạn, thu hồi"""
+import university_admission as ua
+
+
+def test_token_store_expires_after_ttl(clock):
+    store = ua.TokenStore(ttl=60, sliding=False)
+    token = store.issue(1, 'admin', 'admin').token
+
+    clock[0] += 59
+    assert store.get(token).user_id == 1
+    clock[0] += 1
+    assert store.get(token) is None
+    assert len(store) == 0
+
+
+def test_token_store_sliding_expiry(clock):
+    store = ua.TokenStore(ttl=60, sliding=True)
+    token = store.issue(1, 'admin', 'admin').token
+
+    for _ in range(3):
+        clock[0] += 50
+        assert store.get(token) is not None
+    clock[0] += 60
+    assert store.get(token) is None
+
+
+def test_token_store_purges_expired_and_evicts_when_full(clock):
+    store = ua.TokenStore(max_size=2, ttl=60, sliding=False)
+    first = store.issue(1, 'a', 'candidate').token
+    clock[0] += 10
+    second = store.issue(2, 'b', 'candidate').token
+    third = store.issue(3, 'c', 'candidate').token
+
+    # Đầy: phiên sắp hết hạn nhất bị bỏ
+    assert store.get(first) is None
+    assert store.get(second) is not None and store.get(third) is not None
+
+    clock[0] += 60
+    assert store.purge_expired() == 2
+    assert len(store) == 0
+
+
+def test_token_store_revoke(clock):
+    store = ua.TokenStore(ttl=60)
+    token = store.issue(1, 'admin', 'admin').token
+
+    assert store.revoke(token)
+    assert store.get(token) is None
+    assert not store.revoke(token)
+
+
+def test_logout_revokes_opaque_token(api):
+    token = api.login('manager', 'manager123')
+    assert api.get('/api/manager/stats', token)[0] == 200
+
+    assert api.post('/api/auth/logout', {}, token)[0] == 200
+    assert api.get('/api/manager/stats', token)[0] == 401
+
+
+def test_sqlite_backend_shared_between_processes(clock):
+    # Hai backend mô phỏng hai worker process dùng chung bảng sessions
+    worker_a = ua.SQLiteSessionBackend(ttl=60, cache_ttl=5)
+    worker_b = ua.SQLiteSessionBackend(ttl=60, cache_ttl=5)
+    token = worker_a.issue(2, 'manager', 'manager').token
+
+    assert worker_b.get(token).username == 'manager'
+    assert worker_b.revoke(token)
+    assert worker_b.get(token) is None
+
+    # worker_a còn phiên trong cache tới khi mục cache hết hạn
+    assert worker_a.get(token) is not None
+    clock[0] += 5
+    assert worker_a.get(token) is None
+
+
+def test_sqlite_backend_expiry_and_purge(clock):
+    backend = ua.SQLiteSessionBackend(ttl=60, sliding=False)
+    token = backend.issue(1, 'admin', 'admin').token
+
+    clock[0] += 60
+    assert backend.get(token) is None
+    assert backend.purge_expired() >= 1
+    assert ua.SQLiteSessionBackend().get(token) is None
+
+
+def test_sqlite_backend_sliding_expiry_written_back(clock):
+    backend = ua.SQLiteSessionBackend(ttl=100, sliding=True)
+    token = backend.issue(1, 'admin', 'admin').token
+
+    clock[0] += 50
+    assert backend.get(token) is not None
+    # Hạn mới đã được ghi xuống bảng nên process khác cũng thấy
+    clock[0] += 90
+    assert ua.SQLiteSessionBackend(ttl=100, sliding=False).get(token) is not None
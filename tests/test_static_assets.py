@@ -0,0 +1,32 @@
+"""Kiểm tra thư viện bên thứ ba được phục vụ từ static/ thay vì CDN"""
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import university_admission as ua
+
+
+def rendered_shell():
+    _, index_page = ua.load_frontend_assets()
+    return index_page.variants['identity'][0].decode('utf-8')
+
+
+def test_vendor_assets_are_committed():
+    for name in ua.VENDOR_ASSETS:
+        assert os.path.isfile(os.path.join(ua.config.get('static_dir'), name)), name
+
+
+def test_shell_uses_local_chart_js():
+    match = re.search(r'data-chart-src="(/static/chart\.umd\.[0-9a-f]{12}\.js)"', rendered_shell())
+    assert match
+    static_assets, _ = ua.load_frontend_assets()
+    assert match.group(1)[len('/static/'):] in static_assets.by_url
+
+
+def test_shell_has_no_cdn_urls():
+    shell = rendered_shell()
+    for cdn_url in ua.VENDOR_ASSETS.values():
+        assert cdn_url not in shell
+    assert re.search(r'href="/static/fontawesome\.min\.[0-9a-f]{12}\.css"', shell)
@@ -0,0 +1,48 @@
+"""Kiểm tra bộ đếm thống kê do trigger cập nhật"""
+import university_admission as ua
+
+
+def actual_counts(conn):
+    return {name: conn.execute(ua.stats_counter_query(name)).fetchone()[0] for name in ua.STATS_COUNTERS}
+
+
+def test_counters_follow_inserts_updates_and_deletes(seed_aspirations):
+    ids = seed_aspirations(registered_at=['2025-08-01 08:00:00'] * 3)
+    ua.decide_aspirations('approved', 2, aspiration_ids=ids[:1])
+    ua.decide_aspirations('rejected', 2, aspiration_ids=ids[1:2])
+    with ua.db_pool.connection() as conn:
+        conn.execute("UPDATE users SET status = 'inactive' WHERE username = 'candidate'")
+        conn.execute('DELETE FROM aspirations WHERE id = ?', (ids[2],))
+        conn.commit()
+        counters = ua.read_stats_counters(conn)
+        expected = actual_counts(conn)
+        conn.execute("UPDATE users SET status = 'active' WHERE username = 'candidate'")
+        conn.commit()
+
+    assert counters == expected
+
+
+def test_reconcile_repairs_drift():
+    with ua.db_pool.connection() as conn:
+        conn.execute("UPDATE stats_counters SET value = value + 7 WHERE name = 'aspirations_pending'")
+        conn.commit()
+
+    drift = ua.reconcile_stats_counters()
+
+    assert list(drift) == ['aspirations_pending']
+    stored, actual = drift['aspirations_pending']
+    assert stored == actual + 7
+    assert ua.reconcile_stats_counters() == {}
+
+
+def test_manager_stats_served_from_counters(api, seed_aspirations):
+    seed_aspirations(registered_at=['2025-08-02 08:00:00'] * 2)
+    token = api.login('manager', 'manager123')
+
+    status, _, data = api.get('/api/manager/stats', token)
+
+    with ua.db_pool.connection() as conn:
+        expected = actual_counts(conn)
+    assert status == 200
+    assert data['data']['totalAspirations'] == expected['aspirations']
+    assert data['data']['pendingAspirations'] == expected['aspirations_pending']
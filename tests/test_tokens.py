@@ -0,0 +1,57 @@
+"""Kiểm tra token ký HMAC"""
+import university_admission as ua
+
+
+def test_signed_token_roundtrip():
+    token = ua.issue_signed_token(1, 'admin', 'admin')
+
+    claims = ua.decode_signed_token(token)
+
+    assert claims['uid'] == 1 and claims['role'] == 'admin'
+
+
+def test_non_ascii_signed_token_rejected():
+    payload, kid, signature = ua.issue_signed_token(1, 'admin', 'admin').split('.')
+
+    assert ua.decode_signed_token(f'{payload}é.{kid}.{signature}') is None
+    assert ua.verify_token(f'{payload}.{kid}.{signature}é') is None
+    ua.revoke_token(f'é.{kid}.{signature}')
+
+
+def test_signed_token_expires(clock):
+    token = ua.issue_signed_token(1, 'admin', 'admin')
+
+    clock[0] += ua.config.get('session_ttl') - 1
+    assert ua.decode_signed_token(token) is not None
+    clock[0] += 1
+    assert ua.decode_signed_token(token) is None
+
+
+def test_tampered_signed_token_rejected():
+    payload, kid, signature = ua.issue_signed_token(1, 'admin', 'admin').split('.')
+    other = ua.issue_signed_token(2, 'manager', 'manager').split('.')[0]
+
+    assert ua.decode_signed_token(f'{other}.{kid}.{signature}') is None
+    assert ua.decode_signed_token(f'{payload}.unknown.{signature}') is None
+
+
+def test_signed_token_valid_after_key_rotation():
+    token = ua.issue_signed_token(1, 'admin', 'admin')
+
+    ua.token_keyring.rotate()
+
+    assert ua.decode_signed_token(token) is not None
+    assert ua.issue_signed_token(1, 'admin', 'admin').split('.')[1] != token.split('.')[1]
+
+
+def test_logout_revokes_signed_token(api, monkeypatch):
+    monkeypatch.setitem(ua.config.config, 'token_format', 'signed')
+    token = api.login('manager', 'manager123')
+    assert token.count('.') == 2
+    assert api.get('/api/manager/stats', token)[0] == 200
+
+    assert api.post('/api/auth/logout', {}, token)[0] == 200
+    assert api.get('/api/manager/stats', token)[0] == 401
+    # Process khác đọc danh sách thu hồi từ bảng revoked_tokens
+    jti = ua.decode_signed_token(token)['jti']
+    assert ua.RevocationList().is_revoked(jti)
@@ -4,16 +4,43 @@ HỆ THỐNG QUẢN LÝ TUYỂN SINH ĐẠI HỌC - HOÀN THIỆN
 """
 
 import http.server
-import socketserver
 import json
 import sqlite3
 import hashlib
+import hmac
+import base64
 import os
 from datetime import datetime, timedelta
 import secrets
 import urllib.parse
+import urllib.request
+import re
 import csv
 import io
+import contextlib
+import queue
+import selectors
+import threading
+import argparse
+import ast
+import sys
+import signal
+import socket
+import time
+import traceback
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import gzip
+import zlib
+import mimetypes
+import heapq
+import collections
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # ==================== CẤU HÌNH HỆ THỐNG ====================
 
@@ -28,16 +55,287 @@ class SystemConfig:
                 'email': 'tuyensinh@university.edu.vn',
                 'address': 'Số 1 Đại Cồ Việt, Hà Nội',
                 'website': 'https://tuyensinh.university.edu.vn'
-            }
+            },
+            # Cấu hình server và cơ sở dữ liệu
+            'port': 8000,
+            'db_path': 'university_admission.db',
+            'db_busy_timeout': 30,
+            'db_pool_size': 32,
+            'db_pool_health_check_interval': 30,
+            # Hồ sơ hiệu năng SQLite: WAL cho phép đọc song song với ghi
+            'db_journal_mode': 'WAL',
+            'db_pragmas': {
+                'synchronous': 'NORMAL',
+                'mmap_size': 268435456,
+                'cache_size': -65536,
+                'temp_store': 'MEMORY',
+                'busy_timeout': 30000,
+                # Checkpoint chủ yếu do luồng nền đảm nhiệm, không chặn request ghi
+                'wal_autocheckpoint': 10000
+            },
+            'wal_checkpoint_interval': 60,
+            'wal_checkpoint_mode': 'PASSIVE',
+            # PRAGMA optimize định kỳ để thống kê planner theo kịp dữ liệu thật
+            'db_optimize_interval': 3600,
+            'db_analysis_limit': 1000,
+            'migration_batch_size': 5000,
+            'candidate_cache_size': 100000,
+            'session_ttl': 86400,
+            'session_max_count': 1000000,
+            # Gia hạn phiên mỗi lần sử dụng thay vì hết hạn cố định sau khi đăng nhập
+            'session_sliding': False,
+            # 'opaque': token ngẫu nhiên tra trong kho phiên; 'signed': token tự chứa, ký HMAC
+            'token_format': 'opaque',
+            'token_key_file': 'token_keys.json',
+            'token_key_rotation_interval': 7 * 86400,
+            # Chu kỳ (giây) mỗi process đọc lại danh sách token đã thu hồi
+            'token_revocation_refresh': 2,
+            'server_threads': 16,
+            'server_queue_size': 256,
+            'request_timeout': 30,
+            'server_workers': 1,
+            'worker_shutdown_timeout': 30,
+            'keepalive_timeout': 5,
+            'keepalive_max_requests': 1000,
+            'max_request_body': 1048576,
+            # 'memory': phiên trong process; 'sqlite': bảng sessions dùng chung giữa các process
+            'session_backend': 'memory',
+            'session_cache_size': 100000,
+            'session_cache_ttl': 5,
+            'session_sweep_interval': 60,
+            # scrypt: n=2^14, r=8 tốn ~16 MB và vài chục ms CPU mỗi lần băm
+            'password_scrypt_n': 16384,
+            'password_scrypt_r': 8,
+            'password_scrypt_p': 1,
+            # None = số CPU
+            'password_hash_workers': None,
+            'password_hash_max_pending': 64,
+            'password_hash_wait': 5,
+            # (số lượt/giây, số lượt liền tối đa)
+            'login_rate_per_ip': (2, 30),
+            'login_rate_per_account': (0.2, 5),
+            'catalog_cache_ttl': 300,
+            'catalog_version_check_interval': 1,
+            'html_cache_control': 'no-cache',
+            # CSS/JS/thư viện: URL chứa hash nội dung nên được cache vĩnh viễn
+            'static_dir': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'),
+            'static_cache_control': 'public, max-age=31536000, immutable',
+            # Nén JSON: bỏ qua body nhỏ, mức 1 ưu tiên độ trễ hơn tỉ lệ nén
+            'json_compress_min_size': 1024,
+            'json_compress_level': 1,
+            # Body lớn hơn ngưỡng này được nén và gửi dần theo chunk
+            'json_compress_stream_threshold': 262144,
+            'json_compress_chunk_size': 65536,
+            # Phân trang danh sách nguyện vọng chờ duyệt
+            'pending_page_size': 50,
+            'pending_page_max': 500,
+            # Duyệt/từ chối hàng loạt: số nguyện vọng mỗi transaction và tối đa mỗi request
+            'bulk_decision_chunk_size': 500,
+            'bulk_decision_max_ids': 50000,
+            'stats_reconcile_interval': 3600,
+            # Kênh SSE (/api/events)
+            'sse_heartbeat_interval': 15,
+            'sse_poll_interval': 0.5,
+            'sse_retry': 3000,
+            'sse_backlog_limit': 1000,
+            'sse_replay_buffer': 10000,
+            'sse_max_subscribers': 50000,
+            'sse_max_buffer': 262144,
+            'status_event_retention': 86400
         }
     
     def get(self, key, default=None):
         return self.config.get(key, default)
+    
+    def set(self, key, value):
+        self.config[key] = value
 
 config = SystemConfig()
 
-def init_database():
-    conn = sqlite3.connect('university_admission.db')
+def apply_pragmas(conn):
+    """Áp dụng hồ sơ PRAGMA hiệu năng cho một kết nối"""
+    for name, value in config.get('db_pragmas').items():
+        conn.execute(f'PRAGMA {name} = {value}')
+
+def get_db_connection():
+    """Mở kết nối SQLite mới đã áp dụng hồ sơ PRAGMA"""
+    # Kết nối được pool chuyển qua lại giữa các luồng worker
+    conn = sqlite3.connect(config.get('db_path'), check_same_thread=False)
+    apply_pragmas(conn)
+    return conn
+
+class ConnectionPool:
+    """Pool kết nối SQLite dùng lại giữa các request trong cùng process"""
+    
+    def __init__(self, connect, max_size=None, health_check_interval=None):
+        self._connect = connect
+        self.max_size = max_size or config.get('db_pool_size')
+        self.health_check_interval = health_check_interval or config.get('db_pool_health_check_interval')
+        self._reset()
+    
+    def _reset(self):
+        self._pid = os.getpid()
+        # LIFO: kết nối vừa trả về (cache còn nóng) được dùng lại trước
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+    
+    def acquire(self):
+        if self._pid != os.getpid():
+            # Process con sau fork không được dùng kết nối của process cha
+            self._reset()
+        
+        if not self._slots.acquire(timeout=config.get('db_busy_timeout')):
+            raise sqlite3.OperationalError('Connection pool exhausted')
+        
+        try:
+            while True:
+                try:
+                    conn, released_at = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if time.monotonic() - released_at < self.health_check_interval or self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def release(self, conn, broken=False):
+        try:
+            if not broken and conn.in_transaction:
+                # Không để transaction dang dở rơi sang request sau
+                conn.rollback()
+        except sqlite3.Error:
+            broken = True
+        
+        if broken:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+    
+    @contextlib.contextmanager
+    def connection(self):
+        """Mượn một kết nối: with db_pool.connection() as conn: ..."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def close_all(self):
+        """Đóng mọi kết nối rảnh (gọi trước khi fork worker)"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+    
+    def _is_healthy(self, conn):
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+db_pool = ConnectionPool(get_db_connection)
+
+def start_wal_checkpointer(interval=None):
+    """Chạy checkpoint WAL định kỳ trong luồng nền để file WAL không phình to"""
+    interval = interval or config.get('wal_checkpoint_interval')
+    if interval <= 0 or config.get('db_journal_mode').upper() != 'WAL':
+        return None
+    
+    stop = threading.Event()
+    
+    def run():
+        while not stop.wait(interval):
+            try:
+                with db_pool.connection() as conn:
+                    conn.execute(f"PRAGMA wal_checkpoint({config.get('wal_checkpoint_mode')})").fetchone()
+            except sqlite3.Error as e:
+                print(f"⚠️  WAL checkpoint thất bại: {e}")
+    
+    threading.Thread(target=run, name='wal-checkpointer', daemon=True).start()
+    return stop
+
+def start_db_optimizer(interval=None):
+    """Chạy PRAGMA optimize định kỳ trong luồng nền để cập nhật sqlite_stat1"""
+    interval = interval or config.get('db_optimize_interval')
+    if interval <= 0:
+        return None
+    
+    stop = threading.Event()
+    
+    def run():
+        # Lượt đầu chạy sau một chu kỳ: ngay sau khi khởi tạo, bảng chỉ có dữ liệu mẫu
+        while not stop.wait(interval):
+            try:
+                with db_pool.connection() as conn:
+                    conn.execute(f"PRAGMA analysis_limit = {config.get('db_analysis_limit')}")
+                    # 0x10002: xét mọi bảng, không chỉ bảng kết nối này đã truy vấn (SQLite >= 3.46)
+                    conn.execute('PRAGMA optimize = 0x10002')
+            except sqlite3.Error as e:
+                print(f"⚠️  PRAGMA optimize thất bại: {e}")
+    
+    threading.Thread(target=run, name='db-optimizer', daemon=True).start()
+    return stop
+
+# Bộ index của schema: thêm/bớt index bằng cách sửa danh sách này rồi thêm
+# một migration gọi sync_indexes() để tạo index mới và xóa index idx_* thừa
+DB_INDEXES = [
+    ('idx_candidates_user_id', 'candidates(user_id)'),
+    ('idx_aspirations_candidate_priority', 'aspirations(candidate_id, priority_order)'),
+    ('idx_aspirations_candidate_status', 'aspirations(candidate_id, status, payment_status)'),
+    ('idx_aspirations_status_registered', 'aspirations(status, registered_at)'),
+    ('idx_aspirations_status_university_registered', 'aspirations(status, university_id, registered_at)'),
+    ('idx_aspirations_status_major_registered', 'aspirations(status, major_id, registered_at)'),
+    ('idx_payments_aspiration_status', 'payments(aspiration_id, status)'),
+    ('idx_payments_candidate_created', 'payments(candidate_id, created_at)'),
+    ('idx_payments_status', 'payments(status)'),
+    ('idx_majors_university_status_name', 'majors(university_id, status, name)'),
+    ('idx_universities_status_name', 'universities(status, name)'),
+    ('idx_exams_status_created', 'exams(status, created_at)'),
+    ('idx_documents_status_created', 'documents(status, created_at)'),
+    ('idx_documents_category_status_created', 'documents(category, status, created_at)'),
+    ('idx_users_role_status', 'users(role, status)'),
+    ('idx_revoked_tokens_expires', 'revoked_tokens(expires_at)'),
+    ('idx_sessions_expires', 'sessions(expires_at)'),
+    ('idx_status_events_user', 'status_events(user_id)'),
+    ('idx_status_events_created', 'status_events(created_at)'),
+]
+
+def sync_indexes(conn):
+    """Đồng bộ index trong database với DB_INDEXES"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx!_%' ESCAPE '!'")
+    existing = {row[0] for row in cursor.fetchall()}
+    wanted = dict(DB_INDEXES)
+    
+    def columns_exist(definition):
+        # Bảng/cột do migration sau tạo: index được tạo khi migration đó gọi lại sync_indexes
+        table, columns = definition.rstrip(')').split('(')
+        table_columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        return all(column.strip() in table_columns for column in columns.split(','))
+    
+    for name in existing - wanted.keys():
+        cursor.execute(f'DROP INDEX IF EXISTS {name}')
+    for name, definition in DB_INDEXES:
+        if name not in existing and columns_exist(definition):
+            # Mỗi index được tạo và commit riêng nên các request ghi chỉ phải chờ
+            # từng index một, không phải chờ cả bộ index
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}')
+            conn.commit()
+
+def migrate_initial_schema(conn):
+    """Migration 1: tạo các bảng và dữ liệu mặc định"""
     cursor = conn.cursor()
     
     # Bảng kỳ thi
@@ -182,9 +480,6 @@ def init_database():
     
     # Insert default data
     insert_default_data(cursor)
-    
-    conn.commit()
-    conn.close()
 
 def insert_default_data(cursor):
     """Insert dữ liệu mặc định ĐÃ SỬA LỖI"""
@@ -302,3318 +597,2506 @@ def insert_default_data(cursor):
             VALUES (?, ?, ?, ?)
         ''', (title, description, category, user_ids['admin']))
 
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def verify_password(password, hashed):
-    return hash_password(password) == hashed
-
-# Simple token system
-active_tokens = {}
-
-def create_token(user_id, username, role):
-    token = secrets.token_hex(32)
-    active_tokens[token] = {
-        'user_id': user_id,
-        'username': username,
-        'role': role,
-        'created_at': datetime.now()
-    }
-    return token
-
-def verify_token(token):
-    if token in active_tokens:
-        token_data = active_tokens[token]
-        if datetime.now() - token_data['created_at'] < timedelta(hours=24):
-            return token_data
-    return None
-
-# ==================== PAYMENT SYSTEM ====================
+# ==================== SCHEMA MIGRATIONS ====================
+
+def add_column(conn, table, column_definition):
+    """Thêm cột nếu chưa có (SQLite chỉ sửa metadata, không ghi lại bảng)"""
+    column_name = column_definition.split()[0]
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if column_name not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column_definition}')
+        conn.commit()
+
+def backfill_in_batches(conn, table, assignments, where='1', params=(), batch_size=None):
+    """Cập nhật bảng lớn theo từng lô rowid, commit sau mỗi lô để không giữ khóa ghi lâu"""
+    batch_size = batch_size or config.get('migration_batch_size')
+    last_rowid = 0
+    while True:
+        upper = conn.execute(f'''
+            SELECT MAX(rowid) FROM (
+                SELECT rowid FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?
+            )
+        ''', (last_rowid, batch_size)).fetchone()[0]
+        if upper is None:
+            break
+        conn.execute(f'''
+            UPDATE {table} SET {assignments}
+            WHERE rowid > ? AND rowid <= ? AND ({where})
+        ''', (*params, last_rowid, upper))
+        conn.commit()
+        last_rowid = upper
+
+def migrate_indexes(conn):
+    """Migration 2: index cho các truy vấn thường dùng"""
+    sync_indexes(conn)
+
+def migrate_revoked_tokens(conn):
+    """Migration 3: danh sách token ký HMAC đã bị thu hồi (đăng xuất)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            jti TEXT UNIQUE NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''')
+    conn.commit()
+    sync_indexes(conn)
+
+def migrate_sessions(conn):
+    """Migration 4: bảng phiên đăng nhập dùng chung giữa các worker process"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            token TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            username TEXT NOT NULL,
+            role TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        )
+    ''')
+    conn.commit()
 
-def create_payment(candidate_id, exam_id, aspiration_id, amount, payment_method):
-    """Tạo thanh toán mới"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
+def migrate_session_expiry(conn):
+    """Migration 5: hạn phiên trong bảng sessions để dọn phiên hết hạn theo index"""
+    add_column(conn, 'sessions', 'expires_at REAL')
+    backfill_in_batches(conn, 'sessions',
+                        "expires_at = CAST(strftime('%s', created_at) AS REAL) + ?",
+                        where='expires_at IS NULL', params=(config.get('session_ttl'),))
+    sync_indexes(conn)
+
+CATALOG_TABLES = ('universities', 'majors', 'exams')
+
+def migrate_catalog_version(conn):
+    """Migration 6: bộ đếm phiên bản danh mục, tăng bằng trigger khi ghi vào bảng danh mục"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)')
+    for table in CATALOG_TABLES:
+        for operation in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation.lower()}_catalog_version
+                AFTER {operation} ON {table}
+                BEGIN
+                    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+                END
+            ''')
+
+def migrate_pending_indexes(conn):
+    """Migration 7: index cho danh sách chờ duyệt lọc theo trường/ngành"""
+    sync_indexes(conn)
+
+def migrate_candidate_stats_index(conn):
+    """Migration 11: index covering cho thống kê nguyện vọng của thí sinh"""
+    sync_indexes(conn)
+
+# Bộ đếm cho dashboard: tên -> (bảng, điều kiện trên dòng {row})
+STATS_COUNTERS = {
+    'aspirations': ('aspirations', '1'),
+    'aspirations_pending': ('aspirations', "{row}.status = 'pending'"),
+    'aspirations_approved': ('aspirations', "{row}.status = 'approved'"),
+    'aspirations_rejected': ('aspirations', "{row}.status = 'rejected'"),
+    'payments_completed': ('payments', "{row}.status = 'completed'"),
+    'candidates_active': ('users', "{row}.role = 'candidate' AND {row}.status = 'active'"),
+    'universities_active': ('universities', "{row}.status = 'active'"),
+}
+
+def stats_flag(predicate, row):
+    return f'CASE WHEN {predicate.format(row=row)} THEN 1 ELSE 0 END'
+
+def read_stats_counters(conn):
+    return dict(conn.execute('SELECT name, value FROM stats_counters').fetchall())
+
+def stats_counter_query(name):
+    table, predicate = STATS_COUNTERS[name]
+    return f'SELECT COUNT(*) FROM {table} WHERE {predicate.format(row=table)}'
+
+def refresh_stats_counters(conn):
+    """Đếm lại từ bảng gốc, sửa bộ đếm bị lệch; trả về {tên: (giá trị cũ, giá trị đúng)}"""
+    stored = read_stats_counters(conn)
+    drift = {}
+    for name in STATS_COUNTERS:
+        actual = conn.execute(stats_counter_query(name)).fetchone()[0]
+        if stored.get(name) != actual:
+            drift[name] = (stored.get(name), actual)
+    conn.executemany('''
+        INSERT INTO stats_counters (name, value) VALUES (?, ?)
+        ON CONFLICT (name) DO UPDATE SET value = excluded.value
+    ''', [(name, actual) for name, (_, actual) in drift.items()])
+    return drift
+
+def migrate_stats_counters(conn):
+    """Migration 8: bộ đếm thống kê, cập nhật bằng trigger trên các bảng được đếm"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
     
-    # Kiểm tra xem nguyện vọng đã được thanh toán chưa
-    cursor.execute('SELECT id FROM payments WHERE aspiration_id = ? AND status = "completed"', (aspiration_id,))
-    if cursor.fetchone():
-        conn.close()
-        return None, "Nguyện vọng này đã được thanh toán"
+    for table in dict.fromkeys(table for table, _ in STATS_COUNTERS.values()):
+        counters = [(name, predicate) for name, (counter_table, predicate) in STATS_COUNTERS.items()
+                    if counter_table == table]
+        columns = sorted({column for _, predicate in counters
+                          for column in re.findall(r'\{row\}\.(\w+)', predicate)})
+        deltas = {
+            'insert': [(name, stats_flag(predicate, 'NEW')) for name, predicate in counters],
+            'delete': [(name, f'0 - {stats_flag(predicate, "OLD")}') for name, predicate in counters],
+            # Chỉ bộ đếm có điều kiện mới đổi khi UPDATE
+            'update': [(name, f'{stats_flag(predicate, "NEW")} - {stats_flag(predicate, "OLD")}')
+                       for name, predicate in counters if '{row}' in predicate],
+        }
+        events = {'insert': 'INSERT', 'delete': 'DELETE', 'update': f'UPDATE OF {", ".join(columns)}'}
+        
+        for operation, operation_deltas in deltas.items():
+            if not operation_deltas:
+                continue
+            cases = ' '.join(f"WHEN '{name}' THEN {delta}" for name, delta in operation_deltas)
+            names = ', '.join(f"'{name}'" for name, _ in operation_deltas)
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation}_stats_counters
+                AFTER {events[operation]} ON {table}
+                BEGIN
+                    UPDATE stats_counters SET value = value + CASE name {cases} END
+                    WHERE name IN ({names});
+                END
+            ''')
     
-    transaction_id = f"TXN{datetime.now().strftime('%Y%m%d%H%M%S')}{secrets.token_hex(4)}"
+    # Chạy trong cùng transaction với việc tạo trigger nên không lệch với dữ liệu đang ghi
+    refresh_stats_counters(conn)
+
+# Số liệu theo ngành: tên cột -> điều kiện trên dòng {row} của aspirations
+MAJOR_STATS_COLUMNS = {
+    'applications': '1',
+    'pending': "{row}.status = 'pending'",
+    'approved': "{row}.status = 'approved'",
+    'rejected': "{row}.status = 'rejected'",
+    'paid': "{row}.payment_status = 'paid'",
+}
+
+def read_major_stats(conn):
+    columns = ', '.join(MAJOR_STATS_COLUMNS)
+    return {row[0]: row[1:] for row in conn.execute(f'SELECT major_id, {columns} FROM major_stats')}
+
+def major_stats_aggregate_query():
+    sums = ', '.join(f'SUM({stats_flag(predicate, "aspirations")})' for predicate in MAJOR_STATS_COLUMNS.values())
+    return f'SELECT major_id, {sums} FROM aspirations WHERE major_id IS NOT NULL GROUP BY major_id'
+
+def refresh_major_stats(conn):
+    """Tổng hợp lại major_stats từ aspirations, sửa các ngành bị lệch; trả về {major_id: (cũ, đúng)}"""
+    columns = list(MAJOR_STATS_COLUMNS)
+    zero = (0,) * len(columns)
+    actual = {row[0]: row[1:] for row in conn.execute(major_stats_aggregate_query())}
+    stored = read_major_stats(conn)
     
-    cursor.execute('''
-        INSERT INTO payments (candidate_id, exam_id, aspiration_id, amount, payment_method, transaction_id)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (candidate_id, exam_id, aspiration_id, amount, payment_method, transaction_id))
+    drift = {}
+    for major_id in actual.keys() | stored.keys():
+        if stored.get(major_id, zero) != actual.get(major_id, zero):
+            drift[major_id] = (stored.get(major_id), actual.get(major_id, zero))
+    conn.executemany(f'''
+        INSERT INTO major_stats (major_id, {", ".join(columns)}) VALUES (?{", ?" * len(columns)})
+        ON CONFLICT (major_id) DO UPDATE SET {", ".join(f"{column} = excluded.{column}" for column in columns)}
+    ''', [(major_id, *values) for major_id, (_, values) in drift.items()])
+    return drift
+
+def migrate_major_stats(conn):
+    """Migration 9: bảng tổng hợp nguyện vọng theo ngành, cập nhật bằng trigger trên aspirations"""
+    columns = list(MAJOR_STATS_COLUMNS)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS major_stats (
+            major_id INTEGER PRIMARY KEY,
+            {", ".join(f"{column} INTEGER NOT NULL DEFAULT 0" for column in columns)}
+        )
+    ''')
     
-    payment_id = cursor.lastrowid
+    def add(row):
+        flags = ', '.join(stats_flag(predicate, row) for predicate in MAJOR_STATS_COLUMNS.values())
+        # WHERE trước ON CONFLICT là bắt buộc với INSERT ... SELECT
+        return f'''
+            INSERT INTO major_stats (major_id, {", ".join(columns)})
+            SELECT {row}.major_id, {flags} WHERE {row}.major_id IS NOT NULL
+            ON CONFLICT (major_id) DO UPDATE SET {", ".join(f"{column} = {column} + excluded.{column}" for column in columns)};
+        '''
     
-    conn.commit()
-    conn.close()
+    def subtract(row):
+        updates = ', '.join(f'{column} = {column} - {stats_flag(predicate, row)}'
+                            for column, predicate in MAJOR_STATS_COLUMNS.items())
+        return f'UPDATE major_stats SET {updates} WHERE major_id = {row}.major_id;'
     
-    return payment_id, transaction_id
+    triggers = {
+        'insert': ('INSERT', add('NEW')),
+        'delete': ('DELETE', subtract('OLD')),
+        'update': ('UPDATE OF major_id, status, payment_status', subtract('OLD') + add('NEW')),
+    }
+    for operation, (event, body) in triggers.items():
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_aspirations_{operation}_major_stats
+            AFTER {event} ON aspirations
+            BEGIN
+                {body}
+            END
+        ''')
+    
+    refresh_major_stats(conn)
 
-def verify_payment(transaction_id):
-    """Xác nhận thanh toán"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
+def migrate_status_events(conn):
+    """Migration 10: nhật ký thay đổi trạng thái nguyện vọng cho kênh SSE, ghi bằng trigger"""
+    # AUTOINCREMENT: id đã dùng làm Last-Event-ID không bị cấp lại sau khi dọn sự kiện cũ
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS status_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            aspiration_id INTEGER NOT NULL,
+            status TEXT,
+            payment_status TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_aspirations_update_status_events
+        AFTER UPDATE OF status, payment_status ON aspirations
+        WHEN OLD.status IS NOT NEW.status OR OLD.payment_status IS NOT NEW.payment_status
+        BEGIN
+            INSERT INTO status_events (user_id, aspiration_id, status, payment_status)
+            SELECT user_id, NEW.id, NEW.status, NEW.payment_status FROM candidates WHERE id = NEW.candidate_id;
+        END
+    ''')
+    conn.commit()
+    sync_indexes(conn)
+
+def reconcile_stats_counters():
+    """Đối chiếu bộ đếm và major_stats với bảng gốc (giữ khóa ghi trong lúc đếm)"""
+    with db_pool.connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        drift = refresh_stats_counters(conn)
+        for major_id, values in refresh_major_stats(conn).items():
+            drift[f'major_stats[{major_id}]'] = values
+        conn.commit()
+    return drift
+
+def start_stats_reconciler(interval=None):
+    """Định kỳ sửa bộ đếm thống kê bị lệch (vd. do ghi thẳng vào database lúc trigger bị tắt)"""
+    interval = interval or config.get('stats_reconcile_interval')
+    stop = threading.Event()
     
-    # Cập nhật trạng thái thanh toán
-    cursor.execute('''
-        UPDATE payments 
-        SET status = 'completed', payment_date = CURRENT_TIMESTAMP
-        WHERE transaction_id = ? AND status = 'pending'
-    ''', (transaction_id,))
+    def run():
+        while not stop.wait(interval):
+            try:
+                drift = reconcile_stats_counters()
+            except sqlite3.Error as e:
+                print(f"⚠️  Đối chiếu bộ đếm thống kê thất bại: {e}")
+                continue
+            if drift:
+                print(f"⚠️  Bộ đếm thống kê bị lệch, đã sửa: {drift}")
     
-    # Cập nhật trạng thái thanh toán của nguyện vọng
-    cursor.execute('''
-        UPDATE aspirations 
-        SET payment_status = 'paid'
-        WHERE id = (
-            SELECT aspiration_id FROM payments WHERE transaction_id = ?
-        )
-    ''', (transaction_id,))
+    threading.Thread(target=run, name='stats-reconciler', daemon=True).start()
+    return stop
+
+# (phiên bản, mô tả, hàm migration, online)
+# - online=False: chạy trọn trong một transaction cùng với việc tăng user_version
+# - online=True: hàm tự commit từng bước ngắn (tạo index, backfill theo lô) và
+#   phải chạy lại được an toàn nếu bị ngắt giữa chừng
+MIGRATIONS = [
+    (1, 'Tạo bảng và dữ liệu mặc định', migrate_initial_schema, False),
+    (2, 'Tạo index cho các truy vấn thường dùng', migrate_indexes, True),
+    (3, 'Tạo bảng revoked_tokens', migrate_revoked_tokens, True),
+    (4, 'Tạo bảng sessions', migrate_sessions, True),
+    (5, 'Thêm cột sessions.expires_at', migrate_session_expiry, True),
+    (6, 'Tạo catalog_version và trigger cho bảng danh mục', migrate_catalog_version, False),
+    (7, 'Tạo index lọc nguyện vọng chờ duyệt theo trường/ngành', migrate_pending_indexes, True),
+    (8, 'Tạo bộ đếm thống kê và trigger cập nhật', migrate_stats_counters, False),
+    (9, 'Tạo bảng tổng hợp nguyện vọng theo ngành', migrate_major_stats, False),
+    (10, 'Tạo bảng status_events cho kênh SSE', migrate_status_events, True),
+    (11, 'Tạo index thống kê nguyện vọng theo thí sinh', migrate_candidate_stats_index, True),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def migrate_database(conn):
+    """Chạy các migration chưa áp dụng theo PRAGMA user_version"""
+    current_version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if current_version >= SCHEMA_VERSION:
+        return False
     
-    conn.commit()
-    conn.close()
+    for version, description, migrate, online in MIGRATIONS:
+        if version <= current_version:
+            continue
+        
+        print(f"🔧 Migration {version}: {description}")
+        if online:
+            migrate(conn)
+        # BEGIN IMMEDIATE giữ khóa ghi, tránh hai process cùng chạy một migration
+        conn.execute('BEGIN IMMEDIATE')
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+            conn.rollback()
+            continue
+        if not online:
+            migrate(conn)
+        conn.execute(f'PRAGMA user_version = {version}')
+        conn.commit()
+    
+    # Không ANALYZE ở đây: database mới chỉ có vài dòng dữ liệu mẫu, thống kê sẽ sai lệch
+    # khi dữ liệu thật tăng lên; start_db_optimizer() cập nhật định kỳ
+    return True
 
-# ==================== DOCUMENT SYSTEM ====================
+def init_database():
+    """Đưa database lên phiên bản schema mới nhất (không làm gì nếu đã mới nhất)"""
+    with db_pool.connection() as conn:
+        # journal_mode được lưu trong file database, chỉ đổi khi cần
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        if journal_mode.upper() != config.get('db_journal_mode').upper():
+            conn.execute(f"PRAGMA journal_mode = {config.get('db_journal_mode')}")
+        
+        migrate_database(conn)
 
-def get_documents(category=None):
-    """Lấy danh sách tài liệu"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
-    
-    if category:
-        cursor.execute('SELECT * FROM documents WHERE category = ? AND status = "active" ORDER BY created_at DESC', (category,))
-    else:
-        cursor.execute('SELECT * FROM documents WHERE status = "active" ORDER BY created_at DESC')
+# ==================== PASSWORD HASHING ====================
+
+def password_hash_params():
+    return {
+        'n': config.get('password_scrypt_n'),
+        'r': config.get('password_scrypt_r'),
+        'p': config.get('password_scrypt_p'),
+    }
+
+def derive_password_key(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=2 * 128 * n * r * p, dklen=32)
+
+def hash_password(password):
+    """Băm mật khẩu bằng scrypt, dạng scrypt$n$r$p$salt$hash"""
+    params = password_hash_params()
+    salt = secrets.token_bytes(16)
+    key = derive_password_key(password, salt, **params)
+    return f"scrypt${params['n']}${params['r']}${params['p']}${salt.hex()}${key.hex()}"
+
+def verify_password(password, hashed):
+    """Trả về (đúng mật khẩu, cần băm lại theo tham số hiện tại)"""
+    if not hashed.startswith('scrypt$'):
+        # Hash SHA-256 cũ không salt: đúng thì luôn cần băm lại
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, hashed), True
     
-    documents = []
-    for row in cursor.fetchall():
-        documents.append({
-            'id': row[0],
-            'title': row[1],
-            'description': row[2],
-            'file_path': row[3],
-            'file_type': row[4],
-            'file_size': row[5],
-            'category': row[6],
-            'created_at': row[9]
-        })
+    _, n, r, p, salt, key = hashed.split('$')
+    params = {'n': int(n), 'r': int(r), 'p': int(p)}
+    derived = derive_password_key(password, bytes.fromhex(salt), **params)
+    return hmac.compare_digest(derived.hex(), key), params != password_hash_params()
+
+def exit_with_parent(parent_pid):
+    """Chạy trong process băm: tự thoát khi process server đã chết (kể cả bị kill)"""
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(0)
     
-    conn.close()
-    return documents
+    threading.Thread(target=watch, daemon=True).start()
 
-# ==================== MANAGER APPROVAL SYSTEM ====================
+class PasswordHasherBusy(Exception):
+    """Quá nhiều yêu cầu băm mật khẩu đang chờ"""
 
-def get_pending_aspirations():
-    """Lấy danh sách nguyện vọng chờ duyệt"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
+class PasswordHasher:
+    """Băm/kiểm tra mật khẩu trong process pool riêng.
     
-    cursor.execute('''
-        SELECT a.id, a.priority_order, a.registered_at,
-               u.name as university_name, m.name as major_name,
-               c.citizen_id, usr.full_name as candidate_name,
-               usr.email, c.phone, a.payment_status
-        FROM aspirations a
-        JOIN universities u ON a.university_id = u.id
-        JOIN majors m ON a.major_id = m.id
-        JOIN candidates c ON a.candidate_id = c.id
-        JOIN users usr ON c.user_id = usr.id
-        WHERE a.status = 'pending'
-        ORDER BY a.registered_at DESC
-    ''')
+    KDF tốn CPU nên không chạy trên luồng phục vụ request; semaphore giới hạn
+    số việc đang chờ để một đợt đăng nhập dồn dập không xếp hàng vô hạn.
+    """
     
-    pending_aspirations = []
-    for row in cursor.fetchall():
-        pending_aspirations.append({
-            'id': row[0],
-            'priority': row[1],
-            'registered_at': row[2],
-            'university_name': row[3],
-            'major_name': row[4],
-            'citizen_id': row[5],
-            'candidate_name': row[6],
-            'email': row[7],
-            'phone': row[8],
-            'payment_status': row[9]
-        })
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or config.get('password_hash_workers') or os.cpu_count() or 1
+        self.max_pending = max_pending or config.get('password_hash_max_pending')
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.executor = None
+        self.lock = threading.Lock()
     
-    conn.close()
-    return pending_aspirations
-
-def approve_aspiration(aspiration_id, manager_id, notes=''):
-    """Duyệt nguyện vọng"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
+    def get_executor(self):
+        # Tạo lười trong từng process (sau fork); spawn tránh fork một process đang có nhiều luồng
+        with self.lock:
+            if self.executor is None:
+                import multiprocessing
+                self.executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=exit_with_parent, initargs=(os.getpid(),))
+            return self.executor
     
-    cursor.execute('''
-        UPDATE aspirations 
-        SET status = 'approved', approved_by = ?, approved_at = CURRENT_TIMESTAMP, manager_notes = ?
-        WHERE id = ?
-    ''', (manager_id, notes, aspiration_id))
+    def run(self, function, *args):
+        if not self.slots.acquire(timeout=config.get('password_hash_wait')):
+            raise PasswordHasherBusy()
+        try:
+            # Một worker chết (OOM, bị kill) làm hỏng cả pool: bỏ pool đó, tạo pool mới và thử lại một lần
+            for _ in range(2):
+                executor = self.get_executor()
+                try:
+                    return executor.submit(function, *args).result()
+                except concurrent.futures.process.BrokenProcessPool:
+                    self.discard_executor(executor)
+            raise PasswordHasherBusy()
+        finally:
+            self.slots.release()
     
-    conn.commit()
-    conn.close()
+    def discard_executor(self, executor):
+        with self.lock:
+            # Luồng khác có thể đã thay pool hỏng bằng pool mới
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def hash(self, password):
+        return self.run(hash_password, password)
+    
+    def verify(self, password, hashed):
+        return self.run(verify_password, password, hashed)
+    
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
 
-def reject_aspiration(aspiration_id, reason=''):
-    """Từ chối nguyện vọng"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
+password_hasher = PasswordHasher()
+
+def dummy_password_hash():
+    """Hash giả để đăng nhập với username không tồn tại vẫn tốn thời gian như thật"""
+    params = password_hash_params()
+    return f"scrypt${params['n']}${params['r']}${params['p']}${'00' * 16}${'00' * 32}"
+
+class RateLimiter:
+    """Token bucket theo khóa (IP, tài khoản): rate lượt/giây, tối đa burst lượt liền"""
     
-    cursor.execute('''
-        UPDATE aspirations 
-        SET status = 'rejected', manager_notes = ?
-        WHERE id = ?
-    ''', (reason, aspiration_id))
+    def __init__(self, rate, burst, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # khóa -> [số lượt còn lại, thời điểm cập nhật]
+        self.buckets = collections.OrderedDict()
+        self.lock = threading.Lock()
     
-    conn.commit()
-    conn.close()
+    def allow(self, key):
+        """Trả về 0 nếu được phép, ngược lại số giây cần chờ"""
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = [self.burst, now]
+                while len(self.buckets) > self.max_keys:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / self.rate
 
-# ==================== PRINT SYSTEM ====================
+login_ip_limiter = RateLimiter(*config.get('login_rate_per_ip'))
+login_account_limiter = RateLimiter(*config.get('login_rate_per_account'))
 
-def generate_aspirations_pdf(candidate_id):
-    """Tạo PDF danh sách nguyện vọng"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
+# ==================== TOKEN STORE ====================
+
+class Session:
+    """Phiên đăng nhập; __slots__ giữ bộ nhớ mỗi phiên cố định và nhỏ"""
+    __slots__ = ('token', 'user_id', 'username', 'role', 'created_at', 'expires_at', 'candidate_id')
     
-    # Lấy thông tin thí sinh
-    cursor.execute('''
-        SELECT u.full_name, c.citizen_id, c.date_of_birth, c.gender,
-               c.address, c.phone, c.high_school, c.graduation_year
-        FROM users u
-        JOIN candidates c ON u.id = c.user_id
-        WHERE c.id = ?
-    ''', (candidate_id,))
+    def __init__(self, token, user_id, username, role, created_at, expires_at, candidate_id=False):
+        self.token = token
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.created_at = created_at
+        self.expires_at = expires_at
+        # False: chưa biết, tra khi cần; token ký HMAC mang sẵn giá trị
+        self.candidate_id = candidate_id
+
+class TokenStore:
+    """Kho token trong bộ nhớ có giới hạn số phiên và hết hạn theo TTL.
     
-    candidate_info = cursor.fetchone()
+    Heap (expires_at, token) cho phép dọn phiên hết hạn theo thứ tự mà không
+    quét toàn bộ dict. Khi gia hạn (sliding) mục cũ trong heap được bỏ qua
+    lúc pop nếu không còn khớp expires_at của phiên.
+    """
     
-    # Lấy danh sách nguyện vọng
-    cursor.execute('''
-        SELECT a.priority_order, u.name as university_name, m.name as major_name,
-               a.status, a.payment_status, a.registered_at,
-               m.subject_group, u.code as university_code, m.code as major_code
-        FROM aspirations a
-        JOIN universities u ON a.university_id = u.id
-        JOIN majors m ON a.major_id = m.id
-        WHERE a.candidate_id = ?
-        ORDER BY a.priority_order
-    ''', (candidate_id,))
+    def __init__(self, max_size=None, ttl=None, sliding=None):
+        self.max_size = max_size or config.get('session_max_count')
+        self.ttl = ttl or config.get('session_ttl')
+        self.sliding = config.get('session_sliding') if sliding is None else sliding
+        self.sessions = {}
+        self.expiry_heap = []
+        self.lock = threading.Lock()
     
-    aspirations = cursor.fetchall()
-    conn.close()
+    def __len__(self):
+        return len(self.sessions)
     
-    if not candidate_info:
-        return None
+    def issue(self, user_id, username, role):
+        now = time.time()
+        session = Session(secrets.token_hex(32), user_id, username, role, now, now + self.ttl)
+        with self.lock:
+            self._purge_expired(now)
+            while len(self.sessions) >= self.max_size:
+                # Đầy: bỏ phiên sắp hết hạn nhất
+                self._evict_next()
+            self.sessions[session.token] = session
+            heapq.heappush(self.expiry_heap, (session.expires_at, session.token))
+        return session
     
-    print_data = {
-        'candidate': {
-            'full_name': candidate_info[0],
-            'citizen_id': candidate_info[1],
-            'date_of_birth': candidate_info[2],
-            'gender': candidate_info[3],
-            'address': candidate_info[4],
-            'phone': candidate_info[5],
-            'high_school': candidate_info[6],
-            'graduation_year': candidate_info[7]
-        },
-        'aspirations': [
-            {
-                'priority': row[0],
-                'university_name': row[1],
-                'major_name': row[2],
-                'status': row[3],
-                'payment_status': row[4],
-                'registered_at': row[5],
-                'subject_group': row[6],
-                'university_code': row[7],
-                'major_code': row[8]
-            }
-            for row in aspirations
-        ],
-        'print_date': datetime.now().strftime('%d/%m/%Y %H:%M'),
-        'contact_info': config.get('contact_info')
-    }
+    def get(self, token):
+        now = time.time()
+        with self.lock:
+            session = self.sessions.get(token)
+            if session is None:
+                return None
+            if session.expires_at <= now:
+                del self.sessions[token]
+                return None
+            if self.sliding:
+                session.expires_at = now + self.ttl
+                heapq.heappush(self.expiry_heap, (session.expires_at, token))
+                self._compact_heap()
+            return session
     
-    return print_data
-
-def export_aspirations_csv(candidate_id):
-    """Xuất danh sách nguyện vọng ra CSV"""
-    conn = sqlite3.connect('university_admission.db')
-    cursor = conn.cursor()
+    def revoke(self, token):
+        with self.lock:
+            return self.sessions.pop(token, None) is not None
     
-    # Lấy thông tin thí sinh
-    cursor.execute('''
-        SELECT u.full_name, c.citizen_id, c.date_of_birth, c.gender,
-               c.address, c.phone, c.high_school, c.graduation_year
-        FROM users u
-        JOIN candidates c ON u.id = c.user_id
-        WHERE c.id = ?
-    ''', (candidate_id,))
+    def purge_expired(self):
+        with self.lock:
+            return self._purge_expired(time.time())
     
-    candidate_info = cursor.fetchone()
+    def _purge_expired(self, now):
+        removed = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, token = heapq.heappop(heap)
+            session = self.sessions.get(token)
+            if session is not None and session.expires_at == expires_at:
+                del self.sessions[token]
+                removed += 1
+        return removed
     
-    # Lấy danh sách nguyện vọng
-    cursor.execute('''
-        SELECT a.priority_order, u.code as university_code, u.name as university_name, 
-               m.code as major_code, m.name as major_name, m.subject_group,
-               a.status, a.payment_status, a.registered_at
-        FROM aspirations a
-        JOIN universities u ON a.university_id = u.id
-        JOIN majors m ON a.major_id = m.id
-        WHERE a.candidate_id = ?
-        ORDER BY a.priority_order
-    ''', (candidate_id,))
+    def _evict_next(self):
+        heap = self.expiry_heap
+        while heap:
+            expires_at, token = heapq.heappop(heap)
+            session = self.sessions.get(token)
+            if session is not None and session.expires_at == expires_at:
+                del self.sessions[token]
+                return
+        # Heap rỗng nhưng dict còn phiên: không xảy ra nếu mọi phiên đều được push
+        self.sessions.pop(next(iter(self.sessions)))
     
-    aspirations = cursor.fetchall()
-    conn.close()
+    def _compact_heap(self):
+        # Gia hạn liên tục để lại nhiều mục cũ; dựng lại heap khi vượt gấp đôi số phiên
+        if len(self.expiry_heap) > 2 * len(self.sessions) + 64:
+            self.expiry_heap = [(session.expires_at, token) for token, session in self.sessions.items()]
+            heapq.heapify(self.expiry_heap)
+
+class SQLiteSessionBackend:
+    """Phiên lưu trong bảng sessions (WAL) để mọi process dùng chung.
     
-    if not candidate_info:
-        return None
+    LRU cache trong process đứng trước bảng: phiên vừa dùng được trả từ bộ nhớ,
+    cache miss chỉ tốn một lần tra theo khóa chính. Mục trong cache chỉ sống
+    session_cache_ttl giây để việc đăng xuất ở process khác có hiệu lực nhanh.
+    """
     
-    # Tạo CSV trong memory
-    output = io.StringIO()
-    writer = csv.writer(output)
+    def __init__(self, ttl=None, sliding=None, cache_size=None, cache_ttl=None):
+        self.ttl = ttl or config.get('session_ttl')
+        self.sliding = config.get('session_sliding') if sliding is None else sliding
+        self.cache_size = cache_size or config.get('session_cache_size')
+        self.cache_ttl = cache_ttl or config.get('session_cache_ttl')
+        # token -> (Session, thời điểm đọc từ database)
+        self.cache = collections.OrderedDict()
+        self.lock = threading.Lock()
     
-    # Viết header
-    writer.writerow(['DANH SÁCH NGUYỆN VỌNG ĐĂNG KÝ XÉT TUYỂN'])
-    writer.writerow(['Thí sinh:', candidate_info[0]])
-    writer.writerow(['Số CCCD:', candidate_info[1]])
-    writer.writerow(['Ngày sinh:', candidate_info[2]])
-    writer.writerow(['Giới tính:', candidate_info[3]])
-    writer.writerow([])
-    writer.writerow(['STT', 'Mã trường', 'Tên trường', 'Mã ngành', 'Tên ngành', 'Khối thi', 'Trạng thái', 'Thanh toán'])
+    def issue(self, user_id, username, role):
+        now = time.time()
+        session = Session(secrets.token_hex(32), user_id, username, role, now, now + self.ttl)
+        with db_pool.connection() as conn:
+            conn.execute('''
+                INSERT INTO sessions (token, user_id, username, role, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (session.token, user_id, username, role,
+                  datetime.fromtimestamp(now).isoformat(), session.expires_at))
+            conn.commit()
+        self._cache_put(session, now)
+        return session
     
-    # Viết dữ liệu nguyện vọng
-    for i, row in enumerate(aspirations, 1):
-        writer.writerow([
-            row[0],  # priority
-            row[1],  # university_code
-            row[2],  # university_name
-            row[3],  # major_code
-            row[4],  # major_name
-            row[5],  # subject_group
-            'Đã duyệt' if row[6] == 'approved' else 'Chờ duyệt',
-            'Đã thanh toán' if row[7] == 'paid' else 'Chưa thanh toán'
-        ])
+    def get(self, token):
+        now = time.time()
+        with self.lock:
+            entry = self.cache.get(token)
+            if entry is not None and now - entry[1] < self.cache_ttl:
+                self.cache.move_to_end(token)
+                session = entry[0]
+            else:
+                session = None
+        
+        if session is None:
+            session = self._load(token)
+            if session is None:
+                with self.lock:
+                    self.cache.pop(token, None)
+                return None
+            self._cache_put(session, now)
+        
+        if session.expires_at <= now:
+            with self.lock:
+                self.cache.pop(token, None)
+            return None
+        if self.sliding:
+            self._extend(session, now)
+        return session
     
-    writer.writerow([])
-    writer.writerow(['Ngày xuất:', datetime.now().strftime('%d/%m/%Y %H:%M')])
+    def revoke(self, token):
+        with db_pool.connection() as conn:
+            deleted = conn.execute('DELETE FROM sessions WHERE token = ?', (token,)).rowcount
+            conn.commit()
+        with self.lock:
+            self.cache.pop(token, None)
+        return deleted > 0
     
-    return output.getvalue()
-
-class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def purge_expired(self):
+        with db_pool.connection() as conn:
+            removed = conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),)).rowcount
+            conn.commit()
+        return removed
     
-    def do_GET(self):
-        if self.path == '/':
-            self.serve_embedded_html()
-        elif self.path.startswith('/api/'):
-            self.handle_api_get()
-        else:
-            self.send_error(404, "File not found")
+    def _load(self, token):
+        with db_pool.connection() as conn:
+            row = conn.execute('''
+                SELECT user_id, username, role, created_at, expires_at FROM sessions WHERE token = ?
+            ''', (token,)).fetchone()
+        if not row:
+            return None
+        return Session(token, row[0], row[1], row[2], datetime.fromisoformat(row[3]).timestamp(), row[4])
     
-    def do_POST(self):
-        if self.path.startswith('/api/'):
-            self.handle_api_post()
-        else:
-            self.send_error(404, "Endpoint not found")
+    def _extend(self, session, now):
+        # Chỉ ghi hạn mới khi đã lệch quá 1% TTL, tránh một lệnh UPDATE cho mỗi request
+        expires_at = now + self.ttl
+        if expires_at - session.expires_at < self.ttl * 0.01:
+            return
+        session.expires_at = expires_at
+        with db_pool.connection() as conn:
+            conn.execute('UPDATE sessions SET expires_at = ? WHERE token = ?', (expires_at, session.token))
+            conn.commit()
     
-    def serve_embedded_html(self):
-        """Serve the embedded HTML content"""
-        html_content = """
-<!DOCTYPE html>
-<html lang="vi">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Hệ thống Quản lý Tuyển sinh Đại học</title>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        :root {
-            --primary: #4361ee;
-            --secondary: #3f37c9;
-            --success: #4cc9f0;
-            --danger: #f72585;
-            --warning: #f8961e;
-            --info: #4895ef;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --gray: #6c757d;
-            --bg-light: #f5f7fb;
-            --card-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            --hover-shadow: 0 10px 15px rgba(0, 0, 0, 0.1);
-        }
-
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        }
-
-        body {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-        }
-
-        .login-container {
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-            width: 100%;
-            max-width: 450px;
-            padding: 40px;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .login-container::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(90deg, var(--primary), var(--success));
-        }
-
-        .login-header {
-            text-align: center;
-            margin-bottom: 30px;
-        }
-
-        .login-header h1 {
-            color: var(--dark);
-            font-size: 28px;
-            margin-bottom: 10px;
-            font-weight: 700;
-        }
-
-        .login-header p {
-            color: var(--gray);
-            font-size: 14px;
-        }
-
-        .form-group {
-            margin-bottom: 20px;
-        }
-
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            color: var(--dark);
-            font-weight: 600;
-            font-size: 14px;
-        }
-
-        .form-group input, .form-group select, .form-group textarea {
-            width: 100%;
-            padding: 14px 16px;
-            border: 2px solid #e1e5e9;
-            border-radius: 10px;
-            font-size: 14px;
-            transition: all 0.3s ease;
-            background: var(--light);
-        }
-
-        .form-group input:focus, .form-group select:focus, .form-group textarea:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.1);
-            background: white;
-        }
-
-        .btn {
-            padding: 14px 25px;
-            border: none;
-            border-radius: 10px;
-            font-size: 14px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            text-decoration: none;
-        }
-
-        .btn-block {
-            width: 100%;
-            justify-content: center;
-        }
-
-        .btn-primary {
-            background: linear-gradient(135deg, var(--primary), var(--secondary));
-            color: white;
-        }
-
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 20px rgba(67, 97, 238, 0.3);
-        }
-
-        .btn-success {
-            background: var(--success);
-            color: white;
-        }
+    def _cache_put(self, session, now):
+        with self.lock:
+            self.cache[session.token] = (session, now)
+            self.cache.move_to_end(session.token)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+SESSION_BACKENDS = {
+    'memory': TokenStore,
+    'sqlite': SQLiteSessionBackend,
+}
+
+session_backend = TokenStore()
+
+def use_session_backend(name):
+    """Chọn nơi lưu phiên đăng nhập ('memory' hoặc 'sqlite')"""
+    global session_backend
+    config.set('session_backend', name)
+    session_backend = SESSION_BACKENDS[name]()
+    return session_backend
+
+def start_session_sweeper(interval=None):
+    """Dọn phiên hết hạn định kỳ trong luồng nền"""
+    interval = interval or config.get('session_sweep_interval')
+    stop = threading.Event()
+    
+    def run():
+        while not stop.wait(interval):
+            try:
+                session_backend.purge_expired()
+            except sqlite3.Error as e:
+                print(f"⚠️  Dọn phiên hết hạn thất bại: {e}")
+    
+    threading.Thread(target=run, name='session-sweeper', daemon=True).start()
+    return stop
 
-        .btn-success:hover {
-            background: #3ab8e0;
-            transform: translateY(-2px);
-        }
+def create_token(user_id, username, role):
+    if config.get('token_format') == 'signed':
+        return issue_signed_token(user_id, username, role)
+    return session_backend.issue(user_id, username, role).token
 
-        .btn-danger {
-            background: var(--danger);
-            color: white;
-        }
+def verify_token(token):
+    # Token ký có dạng payload.kid.signature; token opaque là chuỗi hex
+    if '.' in token:
+        return verify_signed_token(token)
+    return session_backend.get(token)
+
+def revoke_token(token):
+    """Thu hồi token khi đăng xuất"""
+    if '.' in token:
+        revoke_signed_token(token)
+    else:
+        session_backend.revoke(token)
 
-        .btn-danger:hover {
-            background: #e11574;
-            transform: translateY(-2px);
-        }
+# ==================== SIGNED TOKENS ====================
 
-        .btn-warning {
-            background: var(--warning);
-            color: white;
-        }
+def b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
 
-        .btn-warning:hover {
-            background: #e6891b;
-            transform: translateY(-2px);
-        }
+def b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
 
-        .btn-secondary {
-            background: var(--gray);
-            color: white;
-        }
+class TokenKeyring:
+    """Các khóa HMAC dùng để ký token, lưu trong file JSON dùng chung giữa các process.
+    
+    Khóa mới nhất dùng để ký; khóa cũ vẫn được dùng để kiểm tra cho tới khi mọi
+    token nó đã ký hết hạn, nên xoay khóa không làm người dùng bị đăng xuất.
+    Các process tự đọc lại file khi nó thay đổi.
+    """
+    
+    reload_interval = 1
+    
+    def __init__(self, path=None):
+        self.path = path or config.get('token_key_file')
+        self.current = None
+        self.keys = {}
+        self.mtime = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+    
+    def read_file(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'current': None, 'keys': {}}
+    
+    def refresh(self, force=False):
+        now = time.time()
+        if not force and now - self.checked_at < self.reload_interval:
+            return
+        self.checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self.mtime:
+            return
+        data = self.read_file()
+        with self.lock:
+            self.keys = {kid: bytes.fromhex(key['secret']) for kid, key in data['keys'].items()}
+            self.current = data['current']
+            self.mtime = mtime
+    
+    def rotate(self):
+        """Tạo khóa ký mới; bỏ các khóa đã thôi ký lâu hơn thời hạn token"""
+        now = time.time()
+        data = self.read_file()
+        keys = data['keys']
+        if data['current'] in keys:
+            keys[data['current']]['retired_at'] = now
+        for kid in [kid for kid, key in keys.items()
+                    if key.get('retired_at') and now - key['retired_at'] > config.get('session_ttl')]:
+            del keys[kid]
+        
+        kid = secrets.token_hex(4)
+        keys[kid] = {'secret': secrets.token_hex(32), 'created_at': now}
+        data['current'] = kid
+        
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self.refresh(force=True)
+        return kid
+    
+    def ensure(self):
+        """Tạo khóa nếu chưa có, xoay khóa nếu khóa hiện tại đã quá hạn dùng"""
+        data = self.read_file()
+        current = data['keys'].get(data['current'])
+        if current is None or time.time() - current['created_at'] > config.get('token_key_rotation_interval'):
+            return self.rotate()
+        self.refresh(force=True)
+        return data['current']
+    
+    def signing_key(self):
+        self.refresh()
+        if self.current is None:
+            self.ensure()
+        with self.lock:
+            return self.current, self.keys[self.current]
+    
+    def verification_key(self, kid):
+        self.refresh()
+        key = self.keys.get(kid)
+        if key is None and time.time() - self.checked_at > 0.1:
+            # Có thể process khác vừa xoay khóa
+            self.refresh(force=True)
+            key = self.keys.get(kid)
+        return key
+
+class RevocationList:
+    """Các token ký đã đăng xuất (theo jti) cho tới khi chúng tự hết hạn.
+    
+    Mỗi process giữ bản sao trong bộ nhớ và chỉ đọc thêm các dòng mới của bảng
+    revoked_tokens theo chu kỳ, nên việc kiểm tra token không chạm database.
+    """
+    
+    def __init__(self):
+        self.revoked = {}
+        self.last_id = 0
+        self.refreshed_at = 0
+        self.lock = threading.Lock()
+    
+    def add(self, jti, expires_at):
+        with db_pool.connection() as conn:
+            conn.execute('INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)',
+                         (jti, expires_at))
+            conn.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (time.time(),))
+            conn.commit()
+        with self.lock:
+            self.revoked[jti] = expires_at
+    
+    def is_revoked(self, jti):
+        now = time.time()
+        if now - self.refreshed_at >= config.get('token_revocation_refresh'):
+            self.refresh(now)
+        return jti in self.revoked
+    
+    def refresh(self, now):
+        with self.lock:
+            if now - self.refreshed_at < config.get('token_revocation_refresh'):
+                return
+            self.refreshed_at = now
+            with db_pool.connection() as conn:
+                rows = conn.execute('''
+                    SELECT id, jti, expires_at FROM revoked_tokens WHERE id > ? ORDER BY id
+                ''', (self.last_id,)).fetchall()
+            for row_id, jti, expires_at in rows:
+                self.revoked[jti] = expires_at
+                self.last_id = row_id
+            for jti in [jti for jti, expires_at in self.revoked.items() if expires_at < now]:
+                del self.revoked[jti]
+
+token_keyring = TokenKeyring()
+revoked_tokens = RevocationList()
+
+def sign_token_payload(key, payload):
+    return b64encode(hmac.new(key, payload.encode('ascii'), hashlib.sha256).digest())
+
+def issue_signed_token(user_id, username, role):
+    """Tạo token tự chứa user_id, role, candidate_id và thời hạn, ký bằng khóa hiện tại"""
+    now = int(time.time())
+    claims = {
+        'jti': secrets.token_hex(8),
+        'uid': user_id,
+        'usr': username,
+        'role': role,
+        'cid': get_candidate_id(user_id) if role == 'candidate' else None,
+        'iat': now,
+        'exp': now + config.get('session_ttl')
+    }
+    payload = b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    kid, key = token_keyring.signing_key()
+    return f'{payload}.{kid}.{sign_token_payload(key, payload)}'
+
+def decode_signed_token(token):
+    """Kiểm tra chữ ký (so sánh thời gian hằng) và thời hạn; trả về claims hoặc None"""
+    # Header Authorization có thể chứa ký tự ngoài ASCII, payload chỉ ký được khi là ASCII
+    if not token.isascii():
+        return None
+    parts = token.split('.')
+    if len(parts) != 3:
+        return None
+    payload, kid, signature = parts
+    key = token_keyring.verification_key(kid)
+    if key is None:
+        return None
+    if not hmac.compare_digest(sign_token_payload(key, payload).encode(), signature.encode()):
+        return None
+    try:
+        claims = json.loads(b64decode(payload))
+    except ValueError:
+        return None
+    if claims['exp'] <= time.time():
+        return None
+    return claims
 
-        .btn-secondary:hover {
-            background: #5a6268;
-            transform: translateY(-2px);
-        }
+def verify_signed_token(token):
+    claims = decode_signed_token(token)
+    if claims is None or revoked_tokens.is_revoked(claims['jti']):
+        return None
+    return Session(token, claims['uid'], claims['usr'], claims['role'],
+                   claims['iat'], claims['exp'], claims['cid'])
+
+def revoke_signed_token(token):
+    claims = decode_signed_token(token)
+    if claims is not None:
+        revoked_tokens.add(claims['jti'], claims['exp'])
+
+# Cache user_id -> candidate_id (None với tài khoản không phải thí sinh)
+candidate_ids = {}
+candidate_ids_lock = threading.Lock()
+
+def get_candidate_id(user_id):
+    """Tra candidate_id của user, chỉ truy vấn database lần đầu"""
+    with candidate_ids_lock:
+        if user_id in candidate_ids:
+            return candidate_ids[user_id]
+    
+    with db_pool.connection() as conn:
+        row = conn.execute('SELECT id FROM candidates WHERE user_id = ?', (user_id,)).fetchone()
+    candidate_id = row[0] if row else None
+    
+    with candidate_ids_lock:
+        if len(candidate_ids) >= config.get('candidate_cache_size'):
+            # Bỏ mục cũ nhất (dict giữ thứ tự thêm vào)
+            candidate_ids.pop(next(iter(candidate_ids)))
+        candidate_ids[user_id] = candidate_id
+    return candidate_id
+
+class RequestUser:
+    """Người dùng của request hiện tại, được middleware xác thực một lần"""
+    __slots__ = ('token', 'user_id', 'username', 'role', '_candidate_id')
+    
+    def __init__(self, token, user_id, username, role, candidate_id=False):
+        self.token = token
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self._candidate_id = candidate_id
+    
+    @property
+    def candidate_id(self):
+        # Chỉ tra khi handler cần, tối đa một lần cho mỗi request
+        if self._candidate_id is False:
+            self._candidate_id = get_candidate_id(self.user_id)
+        return self._candidate_id
+
+# ==================== REFERENCE DATA CACHE ====================
+
+def json_bytes(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+def content_etag(body, encoding='identity'):
+    """ETag mạnh theo nội dung phản hồi, khác nhau giữa các Content-Encoding"""
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f'"{digest}"' if encoding == 'identity' else f'"{digest}-{encoding}"'
+
+JSON_ENCODINGS = ('gzip', 'deflate')
+
+def json_compressor(encoding):
+    # wbits 31: định dạng gzip; 15: định dạng zlib, là "deflate" theo HTTP
+    return zlib.compressobj(config.get('json_compress_level'), zlib.DEFLATED,
+                            31 if encoding == 'gzip' else 15)
+
+def etag_matches(if_none_match, etag):
+    """So khớp If-None-Match (so sánh yếu theo RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+class CatalogSnapshot:
+    """Một phiên bản của danh mục trường/ngành/kỳ thi, đã serialize sẵn thành JSON"""
+    __slots__ = ('version', 'loaded_at', 'universities', 'majors', 'active_exam')
+    
+    def __init__(self, version, loaded_at, universities, active_exam):
+        self.version = version
+        self.loaded_at = loaded_at
+        self.universities = universities
+        # university_id -> bytes, nạp dần khi được hỏi tới
+        self.majors = {}
+        self.active_exam = active_exam
+
+class CatalogCache:
+    """Cache trong process cho universities, majors và kỳ thi đang mở.
+    
+    Trigger trên ba bảng tăng catalog_version mỗi khi có ghi (kể cả từ process
+    khác hay công cụ ngoài), cache so version tối đa mỗi catalog_version_check_interval
+    giây; catalog_cache_ttl là giới hạn dự phòng. Code ghi vào các bảng này trong
+    process nên gọi invalidate() để có hiệu lực ngay.
+    """
+    
+    def __init__(self):
+        self.snapshot = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+    
+    def invalidate(self):
+        self.snapshot = None
+    
+    def is_fresh(self, snapshot, now):
+        return (snapshot is not None
+                and now - self.checked_at < config.get('catalog_version_check_interval')
+                and now - snapshot.loaded_at < config.get('catalog_cache_ttl'))
+    
+    def current(self):
+        snapshot = self.snapshot
+        if self.is_fresh(snapshot, time.monotonic()):
+            return snapshot
+        
+        with self.lock:
+            snapshot = self.snapshot
+            now = time.monotonic()
+            if self.is_fresh(snapshot, now):
+                return snapshot
+            
+            with db_pool.connection() as conn:
+                version = conn.execute('SELECT version FROM catalog_version WHERE id = 1').fetchone()[0]
+                if (snapshot is None or snapshot.version != version
+                        or now - snapshot.loaded_at >= config.get('catalog_cache_ttl')):
+                    snapshot = self.load(conn, version, now)
+            self.snapshot = snapshot
+            self.checked_at = now
+            return snapshot
+    
+    def load(self, conn, version, now):
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM universities WHERE status = "active" ORDER BY name')
+        universities = []
+        for row in cursor.fetchall():
+            universities.append({
+                'id': row[0],
+                'code': row[1],
+                'name': row[2],
+                'address': row[3],
+                'phone': row[4],
+                'email': row[5],
+                'website': row[6],
+                'description': row[7]
+            })
+        
+        cursor.execute('SELECT * FROM exams WHERE status = "active" ORDER BY created_at DESC LIMIT 1')
+        exam = cursor.fetchone()
+        active_exam = None
+        if exam:
+            active_exam = json_bytes({'success': True, 'data': {
+                'id': exam[0],
+                'code': exam[1],
+                'name': exam[2],
+                'description': exam[3],
+                'registration_start': exam[4],
+                'registration_end': exam[5],
+                'result_announcement': exam[6],
+                'status': exam[7],
+                'max_aspirations': exam[8],
+                'aspiration_fee': exam[9],
+                'created_at': exam[10]
+            }})
+        
+        return CatalogSnapshot(version, now, json_bytes({'success': True, 'data': universities}), active_exam)
+    
+    def universities_json(self):
+        return self.current().universities
+    
+    def active_exam_json(self):
+        return self.current().active_exam
+    
+    def majors_json(self, university_id):
+        snapshot = self.current()
+        body = snapshot.majors.get(university_id)
+        if body is not None:
+            return body
+        
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT * FROM majors 
+                WHERE university_id = ? AND status = "active" 
+                ORDER BY name
+            ''', (university_id,))
+            
+            majors = []
+            for row in cursor.fetchall():
+                majors.append({
+                    'id': row[0],
+                    'university_id': row[1],
+                    'code': row[2],
+                    'name': row[3],
+                    'description': row[4],
+                    'quota': row[5],
+                    'subject_group': row[6],
+                    'duration': row[7],
+                    'tuition_fee': row[8]
+                })
+        
+        body = json_bytes({'success': True, 'data': majors})
+        # Không cache id không có ngành để id tùy ý không làm cache phình to
+        if majors:
+            snapshot.majors[university_id] = body
+        return body
 
-        .btn-sm {
-            padding: 8px 16px;
-            font-size: 12px;
-        }
+catalog_cache = CatalogCache()
 
-        .login-footer {
-            text-align: center;
-            margin-top: 20px;
-            padding-top: 20px;
-            border-top: 1px solid #e1e5e9;
-        }
+# ==================== PAYMENT SYSTEM ====================
 
-        .login-footer a {
-            color: var(--primary);
-            text-decoration: none;
-            font-weight: 600;
-        }
+def create_payment(candidate_id, exam_id, aspiration_id, amount, payment_method):
+    """Tạo thanh toán mới"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        # Kiểm tra xem nguyện vọng đã được thanh toán chưa
+        cursor.execute('SELECT id FROM payments WHERE aspiration_id = ? AND status = "completed"', (aspiration_id,))
+        if cursor.fetchone():
+            return None, "Nguyện vọng này đã được thanh toán"
+        
+        transaction_id = f"TXN{datetime.now().strftime('%Y%m%d%H%M%S')}{secrets.token_hex(4)}"
+        
+        cursor.execute('''
+            INSERT INTO payments (candidate_id, exam_id, aspiration_id, amount, payment_method, transaction_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (candidate_id, exam_id, aspiration_id, amount, payment_method, transaction_id))
+        
+        payment_id = cursor.lastrowid
+        
+        conn.commit()
+    
+    return payment_id, transaction_id
 
-        .login-footer a:hover {
-            text-decoration: underline;
-        }
+def verify_payment(transaction_id):
+    """Xác nhận thanh toán"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        # Cập nhật trạng thái thanh toán
+        cursor.execute('''
+            UPDATE payments 
+            SET status = 'completed', payment_date = CURRENT_TIMESTAMP
+            WHERE transaction_id = ? AND status = 'pending'
+        ''', (transaction_id,))
+        
+        # Cập nhật trạng thái thanh toán của nguyện vọng
+        cursor.execute('''
+            UPDATE aspirations 
+            SET payment_status = 'paid'
+            WHERE id = (
+                SELECT aspiration_id FROM payments WHERE transaction_id = ?
+            )
+        ''', (transaction_id,))
+        
+        conn.commit()
 
-        .system-container {
-            display: none;
-            width: 100%;
-            min-height: 100vh;
-            background: var(--bg-light);
-        }
+# ==================== DOCUMENT SYSTEM ====================
 
-        .container {
-            display: flex;
-            min-height: 100vh;
-        }
+def get_documents(category=None):
+    """Lấy danh sách tài liệu"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        if category:
+            cursor.execute('SELECT * FROM documents WHERE category = ? AND status = "active" ORDER BY created_at DESC', (category,))
+        else:
+            cursor.execute('SELECT * FROM documents WHERE status = "active" ORDER BY created_at DESC')
+        
+        documents = []
+        for row in cursor.fetchall():
+            documents.append({
+                'id': row[0],
+                'title': row[1],
+                'description': row[2],
+                'file_path': row[3],
+                'file_type': row[4],
+                'file_size': row[5],
+                'category': row[6],
+                'created_at': row[9]
+            })
+    return documents
 
-        .sidebar {
-            width: 280px;
-            background: white;
-            box-shadow: var(--card-shadow);
-            position: fixed;
-            height: 100vh;
-            overflow-y: auto;
-            z-index: 1000;
-        }
+# ==================== MANAGER APPROVAL SYSTEM ====================
 
-        .sidebar-header {
-            padding: 25px 20px;
-            background: linear-gradient(135deg, var(--primary), var(--secondary));
-            color: white;
-            text-align: center;
-        }
+def encode_page_cursor(registered_at, aspiration_id):
+    """Cursor trang sau: vị trí (registered_at, id) của dòng cuối trang hiện tại"""
+    return b64encode(json.dumps([registered_at, aspiration_id]).encode())
+
+def decode_page_cursor(text):
+    try:
+        registered_at, aspiration_id = json.loads(b64decode(text))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(registered_at, str) or type(aspiration_id) is not int:
+        raise ValueError('Invalid cursor')
+    return registered_at, aspiration_id
+
+def parse_registered_from(text):
+    return datetime.fromisoformat(text).strftime('%Y-%m-%d %H:%M:%S')
+
+def parse_registered_to(text):
+    # Chỉ có ngày: lấy hết ngày đó
+    value = datetime.fromisoformat(text)
+    if len(text) == 10:
+        value += timedelta(days=1, seconds=-1)
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+# Bộ lọc nguyện vọng chờ duyệt: tên tham số -> hàm chuyển đổi (ValueError nếu sai)
+PENDING_FILTERS = {
+    'university_id': int,
+    'major_id': int,
+    'payment_status': str,
+    'registered_from': parse_registered_from,
+    'registered_to': parse_registered_to,
+}
+
+def pending_filter_conditions(university_id=None, major_id=None, payment_status=None,
+                              registered_from=None, registered_to=None):
+    """Điều kiện WHERE (trên bảng aspirations a) và tham số cho bộ lọc nguyện vọng chờ duyệt"""
+    conditions = ["a.status = 'pending'"]
+    params = []
+    if university_id is not None:
+        conditions.append('a.university_id = ?')
+        params.append(university_id)
+    if major_id is not None:
+        conditions.append('a.major_id = ?')
+        params.append(major_id)
+    if payment_status is not None:
+        conditions.append('a.payment_status = ?')
+        params.append(payment_status)
+    if registered_from is not None:
+        conditions.append('a.registered_at >= ?')
+        params.append(registered_from)
+    if registered_to is not None:
+        conditions.append('a.registered_at <= ?')
+        params.append(registered_to)
+    return conditions, params
+
+def pending_aspirations_query(limit, cursor=None, **filters):
+    """SQL và tham số cho một trang nguyện vọng chờ duyệt (đọc limit + 1 dòng)"""
+    conditions, params = pending_filter_conditions(**filters)
+    if cursor is not None:
+        conditions.append('(a.registered_at, a.id) < (?, ?)')
+        params.extend(cursor)
+    
+    sql = f'''
+        SELECT a.id, a.priority_order, a.registered_at,
+               u.name as university_name, m.name as major_name,
+               c.citizen_id, usr.full_name as candidate_name,
+               usr.email, c.phone, a.payment_status
+        FROM aspirations a
+        JOIN universities u ON a.university_id = u.id
+        JOIN majors m ON a.major_id = m.id
+        JOIN candidates c ON a.candidate_id = c.id
+        JOIN users usr ON c.user_id = usr.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY a.registered_at DESC, a.id DESC
+        LIMIT ?
+    '''
+    return sql, params + [limit + 1]
+
+def get_pending_aspirations(limit, cursor=None, **filters):
+    """Lấy một trang nguyện vọng chờ duyệt, mới nhất trước.
+    
+    Phân trang theo keyset (registered_at, id) thay cho OFFSET: mỗi trang chỉ đọc
+    limit + 1 dòng trên index, không phụ thuộc trang sâu bao nhiêu. Trả về
+    (danh sách, cursor trang sau hoặc None).
+    """
+    sql, params = pending_aspirations_query(limit, cursor, **filters)
+    with db_pool.connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_page_cursor(rows[-1][2], rows[-1][0])
+    
+    pending_aspirations = []
+    for row in rows:
+        pending_aspirations.append({
+            'id': row[0],
+            'priority': row[1],
+            'registered_at': row[2],
+            'university_name': row[3],
+            'major_name': row[4],
+            'citizen_id': row[5],
+            'candidate_name': row[6],
+            'email': row[7],
+            'phone': row[8],
+            'payment_status': row[9]
+        })
+    return pending_aspirations, next_cursor
 
-        .sidebar-header h2 {
-            font-size: 20px;
-            margin-bottom: 5px;
-            font-weight: 700;
-        }
+def approve_aspiration(aspiration_id, manager_id, notes=''):
+    """Duyệt nguyện vọng"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE aspirations 
+            SET status = 'approved', approved_by = ?, approved_at = CURRENT_TIMESTAMP, manager_notes = ?
+            WHERE id = ?
+        ''', (manager_id, notes, aspiration_id))
+        
+        conn.commit()
 
-        .sidebar-header p {
-            font-size: 12px;
-            opacity: 0.9;
-        }
+def reject_aspiration(aspiration_id, reason=''):
+    """Từ chối nguyện vọng"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE aspirations 
+            SET status = 'rejected', manager_notes = ?
+            WHERE id = ?
+        ''', (reason, aspiration_id))
+        
+        conn.commit()
 
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin-top: 20px;
-        }
+def aspiration_status_query(count):
+    return f"SELECT id, status FROM aspirations WHERE id IN ({','.join('?' * count)})"
 
-        .sidebar-menu li {
-            padding: 15px 25px;
-            cursor: pointer;
-            transition: all 0.3s;
-            border-left: 4px solid transparent;
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            color: var(--gray);
-            font-weight: 500;
-        }
+def pending_ids_query(limit, **filters):
+    """SQL và tham số lấy tối đa limit ID nguyện vọng chờ duyệt khớp bộ lọc"""
+    conditions, params = pending_filter_conditions(**filters)
+    return f"SELECT a.id FROM aspirations a WHERE {' AND '.join(conditions)} LIMIT ?", params + [limit]
 
-        .sidebar-menu li:hover {
-            background: rgba(67, 97, 238, 0.05);
-            color: var(--primary);
-            border-left-color: var(--primary);
-        }
+def apply_decision_chunk(conn, decision, manager_id, notes, aspiration_ids):
+    """Áp dụng quyết định cho một lô trong transaction đang mở; trả về kết quả từng nguyện vọng"""
+    current = dict(conn.execute(aspiration_status_query(len(aspiration_ids)), aspiration_ids).fetchall())
+    pending = [aspiration_id for aspiration_id in aspiration_ids if current.get(aspiration_id) == 'pending']
+    
+    if decision == 'approved':
+        conn.executemany('''
+            UPDATE aspirations
+            SET status = 'approved', approved_by = ?, approved_at = CURRENT_TIMESTAMP, manager_notes = ?
+            WHERE id = ? AND status = 'pending'
+        ''', [(manager_id, notes, aspiration_id) for aspiration_id in pending])
+    else:
+        conn.executemany('''
+            UPDATE aspirations
+            SET status = 'rejected', manager_notes = ?
+            WHERE id = ? AND status = 'pending'
+        ''', [(notes, aspiration_id) for aspiration_id in pending])
+    
+    results = []
+    for aspiration_id in aspiration_ids:
+        status = current.get(aspiration_id)
+        if status is None:
+            results.append({'id': aspiration_id, 'result': 'not_found'})
+        elif status == 'pending':
+            results.append({'id': aspiration_id, 'result': 'updated', 'status': decision})
+        elif status == decision:
+            results.append({'id': aspiration_id, 'result': 'unchanged', 'status': status})
+        else:
+            results.append({'id': aspiration_id, 'result': 'conflict', 'status': status})
+    return results
 
-        .sidebar-menu li.active {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            border-left-color: var(--primary);
-            font-weight: 600;
-        }
+def decide_aspirations(decision, manager_id, notes='', aspiration_ids=None, filters=None, limit=None):
+    """Duyệt/từ chối hàng loạt theo danh sách ID hoặc theo bộ lọc nguyện vọng chờ duyệt.
+    
+    Mỗi lô bulk_decision_chunk_size nguyện vọng là một transaction (một lần fsync).
+    Chỉ nguyện vọng còn 'pending' bị đổi nên gửi lại yêu cầu sau khi lỗi giữa chừng
+    là an toàn: lô đã commit trả về 'unchanged', lô chưa commit được làm lại.
+    Theo bộ lọc, mỗi lần gọi xử lý tối đa limit nguyện vọng; gọi lại để xử lý tiếp.
+    """
+    chunk_size = config.get('bulk_decision_chunk_size')
+    limit = limit or config.get('bulk_decision_max_ids')
+    results = []
+    with db_pool.connection() as conn:
+        if aspiration_ids is not None:
+            aspiration_ids = list(dict.fromkeys(aspiration_ids))
+            for start in range(0, len(aspiration_ids), chunk_size):
+                # BEGIN IMMEDIATE: trạng thái đọc được không đổi cho tới khi cập nhật xong lô
+                conn.execute('BEGIN IMMEDIATE')
+                results.extend(apply_decision_chunk(conn, decision, manager_id, notes,
+                                                    aspiration_ids[start:start + chunk_size]))
+                conn.commit()
+        else:
+            while len(results) < limit:
+                conn.execute('BEGIN IMMEDIATE')
+                chunk = [row[0] for row in conn.execute(
+                    *pending_ids_query(min(chunk_size, limit - len(results)), **filters))]
+                if not chunk:
+                    conn.rollback()
+                    break
+                results.extend(apply_decision_chunk(conn, decision, manager_id, notes, chunk))
+                conn.commit()
+    return results
+
+# Cách nhóm số liệu: tên -> (biểu thức khóa, biểu thức nhãn)
+STATS_BREAKDOWN_GROUPS = {
+    'university': ('u.id', 'u.name'),
+    'subject_group': ("COALESCE(m.subject_group, '')", "COALESCE(m.subject_group, '')"),
+    'major': ('m.id', "u.code || ' - ' || m.name"),
+}
+
+def parse_stats_group(text):
+    if text not in STATS_BREAKDOWN_GROUPS:
+        raise ValueError(text)
+    return text
+
+def stats_breakdown_query(group_by, university_id=None, subject_group=None):
+    """SQL và tham số tổng hợp major_stats theo nhóm group_by"""
+    key, label = STATS_BREAKDOWN_GROUPS[group_by]
+    conditions = ['1']
+    params = []
+    if university_id is not None:
+        conditions.append('m.university_id = ?')
+        params.append(university_id)
+    if subject_group is not None:
+        conditions.append("COALESCE(m.subject_group, '') = ?")
+        params.append(subject_group)
+    
+    sql = f'''
+        SELECT {key}, {label}, SUM(COALESCE(m.quota, 0)),
+               {", ".join(f"SUM(COALESCE(s.{column}, 0))" for column in MAJOR_STATS_COLUMNS)}
+        FROM majors m
+        JOIN universities u ON m.university_id = u.id
+        LEFT JOIN major_stats s ON s.major_id = m.id
+        WHERE {' AND '.join(conditions)}
+        GROUP BY {key}
+        ORDER BY {label}
+    '''
+    return sql, params
+
+def get_stats_breakdown(group_by, university_id=None, subject_group=None):
+    """Số nguyện vọng, đã duyệt, đã thanh toán và tỉ lệ lấp đầy chỉ tiêu theo nhóm.
+    
+    Đọc từ major_stats (một dòng mỗi ngành) nên thời gian không phụ thuộc số nguyện vọng.
+    """
+    columns = list(MAJOR_STATS_COLUMNS)
+    with db_pool.connection() as conn:
+        rows = conn.execute(*stats_breakdown_query(group_by, university_id, subject_group)).fetchall()
+    
+    def summarize(item):
+        item['fill_rate'] = round(item['approved'] / item['quota'], 4) if item['quota'] else None
+        return item
+    
+    breakdown = [summarize({'key': row[0], 'label': row[1], 'quota': row[2], **dict(zip(columns, row[3:]))})
+                 for row in rows]
+    totals = summarize({column: sum(item[column] for item in breakdown) for column in ['quota'] + columns})
+    return {'group_by': group_by, 'rows': breakdown, 'totals': totals}
+
+# ==================== LIVE EVENTS ====================
+
+SSE_HEARTBEAT = b': ping\n\n'
+
+def status_event_frame(event_id, aspiration_id, status, payment_status, created_at):
+    data = json.dumps({'aspiration_id': aspiration_id, 'status': status,
+                       'payment_status': payment_status, 'created_at': created_at})
+    return f'id: {event_id}\nevent: aspiration\ndata: {data}\n\n'.encode()
+
+def status_event_bounds(conn):
+    """(id nhỏ nhất, id lớn nhất) đang lưu trong status_events"""
+    oldest = conn.execute('SELECT MIN(id) FROM status_events').fetchone()[0]
+    latest = conn.execute('SELECT MAX(id) FROM status_events').fetchone()[0]
+    return oldest or 0, latest or 0
+
+def read_status_events(conn, after_id, user_id=None, limit=-1):
+    """Sự kiện có id > after_id (của một user, hoặc của mọi user nếu user_id là None)"""
+    if user_id is None:
+        return conn.execute('''
+            SELECT id, user_id, aspiration_id, status, payment_status, created_at
+            FROM status_events WHERE id > ? ORDER BY id LIMIT ?
+        ''', (after_id, limit)).fetchall()
+    return conn.execute('''
+        SELECT id, user_id, aspiration_id, status, payment_status, created_at
+        FROM status_events WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?
+    ''', (user_id, after_id, limit)).fetchall()
+
+def purge_status_events(conn):
+    conn.execute("DELETE FROM status_events WHERE created_at < datetime('now', ?)",
+                 (f"-{config.get('status_event_retention')} seconds",))
+    conn.commit()
 
-        .main-content {
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            margin-left: 280px;
-        }
+class EventSubscriber(asyncio.Protocol):
+    """Một kết nối SSE đã gửi xong header, từ đây chỉ nhận dữ liệu do EventHub đẩy xuống"""
+    
+    def __init__(self, hub, user_id, last_id, stream_writer=None):
+        self.hub = hub
+        # None: nhận sự kiện của mọi thí sinh (cán bộ/quản trị)
+        self.user_id = user_id
+        self.last_id = last_id
+        # StreamWriter của front end asyncio đóng transport khi bị thu hồi nên phải giữ lại
+        self.stream_writer = stream_writer
+        self.transport = None
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        self.hub.add(self)
+    
+    def data_received(self, data):
+        pass
+    
+    def connection_lost(self, exc):
+        self.hub.remove(self)
+    
+    def send(self, event_id, frame):
+        if event_id <= self.last_id:
+            return
+        self.last_id = event_id
+        self.write(frame)
+    
+    def write(self, frame):
+        if self.transport.get_write_buffer_size() > config.get('sse_max_buffer'):
+            # Client đọc không kịp: ngắt để nó kết nối lại với Last-Event-ID
+            self.transport.abort()
+            return
+        self.transport.write(frame)
 
-        .header {
-            background: white;
-            padding: 20px 30px;
-            box-shadow: var(--card-shadow);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            position: sticky;
-            top: 0;
-            z-index: 100;
-        }
+class EventHub:
+    """Đẩy thay đổi trạng thái nguyện vọng tới các kết nối SSE của process.
+    
+    Một luồng đọc các dòng mới của status_events theo chu kỳ (database là kênh chung
+    giữa các worker), event loop mã hóa mỗi sự kiện một lần rồi ghi vào kết nối của
+    đúng user. Kết nối đang chờ chỉ là một transport trong event loop, không giữ
+    luồng nào, và heartbeat dùng một timer chung cho mọi kết nối.
+    """
+    
+    def __init__(self):
+        self.loop = None
+        self.by_user = {}
+        self.watchers = set()
+        self.count = 0
+        self.recent = collections.deque()
+        self.stop = threading.Event()
+    
+    def start(self, loop=None):
+        """Chạy trên event loop có sẵn (front end asyncio) hoặc trên luồng riêng"""
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='event-hub', daemon=True).start()
+        self.loop = loop
+        self.recent = collections.deque(maxlen=config.get('sse_replay_buffer'))
+        with db_pool.connection() as conn:
+            _, latest = status_event_bounds(conn)
+        asyncio.run_coroutine_threadsafe(self.heartbeat(), loop)
+        threading.Thread(target=self.poll, args=(latest,), name='event-poller', daemon=True).start()
+    
+    def available(self):
+        return self.loop is not None and self.count < config.get('sse_max_subscribers')
+    
+    def poll(self, last_id):
+        purge_at = 0
+        while not self.stop.wait(config.get('sse_poll_interval')):
+            try:
+                with db_pool.connection() as conn:
+                    events = read_status_events(conn, last_id, limit=config.get('sse_replay_buffer'))
+                    if time.monotonic() >= purge_at:
+                        purge_status_events(conn)
+                        purge_at = time.monotonic() + config.get('session_sweep_interval')
+            except sqlite3.Error as e:
+                print(f"⚠️  Đọc sự kiện trạng thái thất bại: {e}")
+                continue
+            if events:
+                last_id = events[-1][0]
+                self.loop.call_soon_threadsafe(self.dispatch, events)
+    
+    def dispatch(self, events):
+        for event_id, user_id, *fields in events:
+            frame = status_event_frame(event_id, *fields)
+            self.recent.append((event_id, user_id, frame))
+            for subscriber in self.by_user.get(user_id, ()):
+                subscriber.send(event_id, frame)
+            for subscriber in self.watchers:
+                subscriber.send(event_id, frame)
+    
+    def channel(self, subscriber):
+        if subscriber.user_id is None:
+            return self.watchers
+        return self.by_user.setdefault(subscriber.user_id, set())
+    
+    def add(self, subscriber):
+        self.channel(subscriber).add(subscriber)
+        self.count += 1
+        # Sự kiện đã phát trong lúc handler đọc backlog và giao kết nối
+        missed = []
+        for event_id, user_id, frame in reversed(self.recent):
+            if event_id <= subscriber.last_id:
+                break
+            if subscriber.user_id in (None, user_id):
+                missed.append((event_id, frame))
+        for event_id, frame in reversed(missed):
+            subscriber.send(event_id, frame)
+    
+    def remove(self, subscriber):
+        channel = self.channel(subscriber)
+        if subscriber in channel:
+            channel.remove(subscriber)
+            self.count -= 1
+        if not channel and subscriber.user_id is not None:
+            del self.by_user[subscriber.user_id]
+    
+    def subscribers(self):
+        yield from self.watchers
+        for channel in self.by_user.values():
+            yield from channel
+    
+    async def heartbeat(self):
+        while True:
+            await asyncio.sleep(config.get('sse_heartbeat_interval'))
+            for subscriber in list(self.subscribers()):
+                subscriber.write(SSE_HEARTBEAT)
+    
+    def attach_socket(self, sock, user_id, last_id):
+        """Nhận socket từ luồng worker của server đa luồng"""
+        asyncio.run_coroutine_threadsafe(
+            self.loop.connect_accepted_socket(lambda: EventSubscriber(self, user_id, last_id), sock), self.loop)
+    
+    def attach_stream(self, writer, user_id, last_id):
+        """Nhận kết nối của front end asyncio (cùng event loop với hub)"""
+        subscriber = EventSubscriber(self, user_id, last_id, writer)
+        writer.transport.set_protocol(subscriber)
+        subscriber.connection_made(writer.transport)
+    
+    def close(self):
+        self.stop.set()
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.abort_all)
+    
+    def abort_all(self):
+        for subscriber in list(self.subscribers()):
+            subscriber.transport.abort()
 
-        .header h1 {
-            color: var(--dark);
-            font-size: 24px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            font-weight: 700;
-        }
+event_hub = EventHub()
 
-        .user-info {
-            display: flex;
-            align-items: center;
-            gap: 15px;
-        }
+# ==================== PRINT SYSTEM ====================
 
-        .user-avatar {
-            width: 45px;
-            height: 45px;
-            border-radius: 50%;
-            background: linear-gradient(135deg, var(--primary), var(--success));
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-weight: 600;
-            font-size: 16px;
-        }
-
-        .content-section {
-            flex: 1;
-            padding: 30px;
-            overflow-y: auto;
-            display: none;
-        }
-
-        .content-section.active {
-            display: block;
-            animation: fadeIn 0.5s ease;
-        }
-
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(20px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-
-        .stat-card {
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            box-shadow: var(--card-shadow);
-            display: flex;
-            align-items: center;
-            gap: 20px;
-            transition: all 0.3s ease;
-            border-left: 4px solid var(--primary);
-        }
-
-        .stat-card:hover {
-            transform: translateY(-5px);
-            box-shadow: var(--hover-shadow);
-        }
-
-        .stat-card.primary {
-            border-left-color: var(--primary);
-        }
-
-        .stat-card.success {
-            border-left-color: var(--success);
-        }
-
-        .stat-card.danger {
-            border-left-color: var(--danger);
-        }
-
-        .stat-card.warning {
-            border-left-color: var(--warning);
-        }
-
-        .stat-icon {
-            width: 60px;
-            height: 60px;
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 24px;
-            color: white;
-        }
-
-        .stat-card.primary .stat-icon {
-            background: linear-gradient(135deg, var(--primary), var(--secondary));
-        }
-
-        .stat-card.success .stat-icon {
-            background: linear-gradient(135deg, var(--success), #3a86ff);
-        }
-
-        .stat-card.danger .stat-icon {
-            background: linear-gradient(135deg, var(--danger), #b5179e);
-        }
-
-        .stat-card.warning .stat-icon {
-            background: linear-gradient(135deg, var(--warning), #f3722c);
-        }
-
-        .stat-info h3 {
-            color: var(--gray);
-            font-size: 14px;
-            margin-bottom: 5px;
-            font-weight: 500;
-        }
-
-        .stat-info p {
-            color: var(--dark);
-            font-size: 28px;
-            font-weight: 700;
-        }
-
-        .content-panel {
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            box-shadow: var(--card-shadow);
-            margin-bottom: 20px;
-        }
-
-        .content-panel h3 {
-            color: var(--dark);
-            margin-bottom: 20px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            font-weight: 600;
-        }
-
-        .table-container {
-            background: white;
-            border-radius: 15px;
-            box-shadow: var(--card-shadow);
-            overflow: hidden;
-        }
-
-        table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-
-        th, td {
-            padding: 15px 20px;
-            text-align: left;
-            border-bottom: 1px solid #e9ecef;
-        }
-
-        th {
-            background: #f8f9fa;
-            font-weight: 600;
-            color: var(--dark);
-            font-size: 14px;
-        }
-
-        tr:hover {
-            background: #f8f9fa;
-        }
-
-        .university-card {
-            border: 2px solid #e1e5e9;
-            border-radius: 12px;
-            padding: 20px;
-            margin-bottom: 15px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .university-card:hover {
-            border-color: var(--primary);
-            transform: translateY(-2px);
-            box-shadow: var(--hover-shadow);
-        }
-
-        .university-card.selected {
-            border-color: var(--primary);
-            background: rgba(67, 97, 238, 0.05);
-        }
-
-        .major-list {
-            max-height: 300px;
-            overflow-y: auto;
-            border: 2px solid #e1e5e9;
-            border-radius: 10px;
-            margin-top: 15px;
-        }
-
-        .major-item {
-            padding: 15px;
-            border-bottom: 1px solid #e9ecef;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .major-item:hover {
-            background: #f8f9fa;
-        }
-
-        .major-item.selected {
-            background: var(--primary);
-            color: white;
-        }
-
-        .aspiration-container {
-            background: white;
-            border: 2px solid #e1e5e9;
-            border-radius: 12px;
-            padding: 20px;
-            margin-bottom: 15px;
-            transition: all 0.3s ease;
-        }
-
-        .aspiration-container:hover {
-            border-color: var(--primary);
-            box-shadow: var(--hover-shadow);
-        }
-
-        .aspiration-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 15px;
-        }
-
-        .priority-badge {
-            background: var(--danger);
-            color: white;
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-        }
-
-        .status-badge {
-            padding: 6px 12px;
-            border-radius: 15px;
-            font-size: 12px;
-            font-weight: 600;
-        }
-
-        .status-pending {
-            background: #fff3cd;
-            color: #856404;
-        }
-
-        .status-approved {
-            background: #d4edda;
-            color: #155724;
-        }
-
-        .status-rejected {
-            background: #f8d7da;
-            color: #721c24;
-        }
-
-        .payment-status {
-            padding: 6px 12px;
-            border-radius: 15px;
-            font-size: 12px;
-            font-weight: 600;
-        }
-
-        .payment-pending {
-            background: #fff3cd;
-            color: #856404;
-        }
-
-        .payment-paid {
-            background: #d4edda;
-            color: #155724;
-        }
-
-        .alert {
-            padding: 15px 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-
-        .alert-success {
-            background: #d4edda;
-            color: #155724;
-            border: 1px solid #c3e6cb;
-        }
-
-        .alert-error {
-            background: #f8d7da;
-            color: #721c24;
-            border: 1px solid #f5c6cb;
-        }
-
-        .alert-warning {
-            background: #fff3cd;
-            color: #856404;
-            border: 1px solid #ffeaa7;
-        }
-
-        .alert-info {
-            background: #d1ecf1;
-            color: #0c5460;
-            border: 1px solid #bee5eb;
-        }
-
-        .loading {
-            display: none;
-            position: fixed;
-            z-index: 9999;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(255,255,255,0.9);
-            backdrop-filter: blur(5px);
-        }
-
-        .spinner {
-            border: 5px solid #f3f3f3;
-            border-top: 5px solid var(--primary);
-            border-radius: 50%;
-            width: 50px;
-            height: 50px;
-            animation: spin 1s linear infinite;
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            margin: -25px 0 0 -25px;
-        }
-
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-
-        .modal {
-            display: none;
-            position: fixed;
-            z-index: 1000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0,0,0,0.5);
-            backdrop-filter: blur(5px);
-        }
-
-        .modal-content {
-            background: white;
-            margin: 5% auto;
-            border-radius: 20px;
-            width: 500px;
-            max-width: 90%;
-            box-shadow: 0 25px 50px rgba(0,0,0,0.2);
-            animation: modalSlideIn 0.3s ease;
-            overflow: hidden;
-        }
-
-        @keyframes modalSlideIn {
-            from {
-                opacity: 0;
-                transform: translateY(-50px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-
-        .modal-header {
-            padding: 25px 30px;
-            border-bottom: 1px solid #e9ecef;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            background: linear-gradient(135deg, var(--primary), var(--secondary));
-            color: white;
-        }
-
-        .modal-header h3 {
-            color: white;
-            margin: 0;
-            font-weight: 600;
-        }
-
-        .close {
-            font-size: 24px;
-            cursor: pointer;
-            color: rgba(255,255,255,0.8);
-            transition: color 0.3s ease;
-        }
-
-        .close:hover {
-            color: white;
-        }
-
-        .modal-body {
-            padding: 30px;
-            max-height: 70vh;
-            overflow-y: auto;
-        }
-
-        .form-actions {
-            display: flex;
-            gap: 15px;
-            justify-content: flex-end;
-            margin-top: 25px;
-        }
-
-        .document-list {
-            display: grid;
-            gap: 15px;
-        }
-
-        .document-item {
-            display: flex;
-            align-items: center;
-            gap: 15px;
-            padding: 20px;
-            border: 1px solid #e1e5e9;
-            border-radius: 12px;
-            transition: all 0.3s ease;
-        }
-
-        .document-item:hover {
-            border-color: var(--primary);
-            background: #f8f9fa;
-            transform: translateY(-2px);
-        }
-
-        .document-icon {
-            width: 50px;
-            height: 50px;
-            background: linear-gradient(135deg, var(--primary), var(--secondary));
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-size: 20px;
-        }
-
-        .document-info {
-            flex: 1;
-        }
-
-        .document-info h4 {
-            color: var(--dark);
-            margin-bottom: 5px;
-            font-weight: 600;
-        }
-
-        .document-info p {
-            color: var(--gray);
-            font-size: 14px;
-        }
-
-        .payment-methods {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            gap: 15px;
-            margin: 20px 0;
-        }
-
-        .payment-method {
-            border: 2px solid #e1e5e9;
-            border-radius: 12px;
-            padding: 20px;
-            text-align: center;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .payment-method:hover {
-            border-color: var(--primary);
-            transform: translateY(-2px);
-        }
-
-        .payment-method.selected {
-            border-color: var(--primary);
-            background: rgba(67, 97, 238, 0.05);
-        }
-
-        .payment-icon {
-            font-size: 28px;
-            margin-bottom: 10px;
-            color: var(--primary);
-        }
-
-        .bank-info {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 12px;
-            margin: 15px 0;
-        }
-
-        .print-container {
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: var(--card-shadow);
-        }
-
-        .print-header {
-            text-align: center;
-            margin-bottom: 30px;
-            border-bottom: 2px solid #000;
-            padding-bottom: 20px;
-        }
-
-        .print-header h1 {
-            font-size: 24px;
-            margin-bottom: 10px;
-            text-transform: uppercase;
-            font-weight: 700;
-        }
-
-        .print-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-bottom: 30px;
-        }
-
-        .print-table th, .print-table td {
-            border: 1px solid #000;
-            padding: 12px;
-            text-align: left;
-        }
-
-        .print-table th {
-            background: #f0f0f0;
-            font-weight: bold;
-        }
-
-        .print-footer {
-            margin-top: 50px;
-            text-align: center;
-        }
-
-        .signature-section {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 50px;
-            margin-top: 80px;
-        }
-
-        .signature-box {
-            text-align: center;
-        }
-
-        .signature-line {
-            border-top: 1px solid #000;
-            width: 200px;
-            margin: 50px auto 10px auto;
-        }
-
-        .tabs {
-            display: flex;
-            border-bottom: 2px solid #e9ecef;
-            margin-bottom: 20px;
-            background: white;
-            border-radius: 10px 10px 0 0;
-            overflow: hidden;
-        }
-
-        .tab {
-            padding: 15px 25px;
-            cursor: pointer;
-            border-bottom: 3px solid transparent;
-            transition: all 0.3s ease;
-            font-weight: 500;
-            background: #f8f9fa;
-        }
-
-        .tab.active {
-            border-bottom-color: var(--primary);
-            color: var(--primary);
-            background: white;
-            font-weight: 600;
-        }
-
-        .tab-content {
-            display: none;
-        }
-
-        .tab-content.active {
-            display: block;
-        }
-
-        .section-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 30px;
-        }
-
-        .section-header h2 {
-            color: var(--dark);
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            font-weight: 700;
-        }
-
-        .print-actions {
-            display: flex;
-            gap: 15px;
-            margin: 20px 0;
-        }
-
-        .action-buttons {
-            display: flex;
-            gap: 10px;
-            flex-wrap: wrap;
-        }
-
-        .edit-btn, .save-btn, .cancel-btn {
-            padding: 8px 16px;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-size: 12px;
-            font-weight: 600;
-            transition: all 0.3s ease;
-        }
-
-        .edit-btn {
-            background: var(--warning);
-            color: white;
-        }
-
-        .edit-btn:hover {
-            background: #e6891b;
-        }
-
-        .save-btn {
-            background: var(--success);
-            color: white;
-        }
-
-        .save-btn:hover {
-            background: #3ab8e0;
-        }
-
-        .cancel-btn {
-            background: var(--gray);
-            color: white;
-        }
-
-        .cancel-btn:hover {
-            background: #5a6268;
-        }
-
-        .editable-field {
-            padding: 8px 12px;
-            border: 1px solid transparent;
-            border-radius: 6px;
-            transition: all 0.3s ease;
-        }
-
-        .editable-field:hover {
-            border-color: #e1e5e9;
-            background: #f8f9fa;
-        }
-
-        .editable-field.editing {
-            border-color: var(--primary);
-            background: white;
-            box-shadow: 0 0 0 2px rgba(67, 97, 238, 0.1);
-        }
-
-        @media print {
-            body * {
-                visibility: hidden;
-            }
-            .print-container, .print-container * {
-                visibility: visible;
-            }
-            .print-container {
-                position: absolute;
-                left: 0;
-                top: 0;
-                width: 100%;
-                box-shadow: none;
-            }
-            .no-print {
-                display: none !important;
-            }
-        }
-
-        @media (max-width: 768px) {
-            .container {
-                flex-direction: column;
-            }
-            
-            .sidebar {
-                width: 100%;
-                height: auto;
-                position: relative;
-            }
-            
-            .main-content {
-                margin-left: 0;
-            }
-            
-            .stats-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .section-header {
-                flex-direction: column;
-                gap: 15px;
-                align-items: flex-start;
-            }
-            
-            .print-actions, .form-actions {
-                flex-direction: column;
-            }
-            
-            .action-buttons {
-                justify-content: center;
-            }
-        }
-    </style>
-</head>
-<body>
-    <!-- Login Page -->
-    <div class="login-container" id="loginPage">
-        <div class="login-header">
-            <h1><i class="fas fa-graduation-cap"></i> Hệ thống Tuyển sinh</h1>
-            <p>Đăng nhập để tiếp tục</p>
-        </div>
-        
-        <form id="loginForm">
-            <div class="form-group">
-                <label for="username"><i class="fas fa-user"></i> Tên đăng nhập</label>
-                <input type="text" id="username" name="username" placeholder="Nhập tên đăng nhập" required>
-            </div>
-            
-            <div class="form-group">
-                <label for="password"><i class="fas fa-lock"></i> Mật khẩu</label>
-                <input type="password" id="password" name="password" placeholder="Nhập mật khẩu" required>
-            </div>
-            
-            <button type="submit" class="btn btn-primary btn-block">
-                <i class="fas fa-sign-in-alt"></i> Đăng nhập
-            </button>
-        </form>
-        
-        <div class="login-footer">
-            <p>Chưa có tài khoản? <a href="#" onclick="showRegisterModal()">Đăng ký ngay</a></p>
-        </div>
-    </div>
-
-    <!-- Main System -->
-    <div class="system-container" id="systemContainer">
-        <div class="container">
-            <!-- Sidebar -->
-            <div class="sidebar">
-                <div class="sidebar-header">
-                    <h2><i class="fas fa-graduation-cap"></i> Hệ thống Tuyển sinh</h2>
-                    <p id="userRoleDisplay">Thí sinh</p>
-                </div>
-                <ul class="sidebar-menu" id="sidebarMenu">
-                    <!-- Menu will be loaded dynamically -->
-                </ul>
-            </div>
-
-            <!-- Main Content -->
-            <div class="main-content">
-                <!-- Header -->
-                <div class="header">
-                    <h1 id="section-title"><i class="fas fa-tachometer-alt"></i> Tổng quan hệ thống</h1>
-                    <div class="user-info">
-                        <span id="userFullname">Nguyễn Văn A</span>
-                        <div class="user-avatar">
-                            <i class="fas fa-user-graduate"></i>
-                        </div>
-                    </div>
-                </div>
-
-                <!-- Content Sections -->
-                <div id="dashboard" class="content-section active">
-                    <!-- Dashboard content -->
-                </div>
-
-                <div id="profile" class="content-section">
-                    <!-- Profile content -->
-                </div>
-
-                <div id="aspiration" class="content-section">
-                    <!-- Aspiration content -->
-                </div>
-
-                <div id="payment" class="content-section">
-                    <!-- Payment content -->
-                </div>
-
-                <div id="documents" class="content-section">
-                    <!-- Documents content -->
-                </div>
-
-                <div id="print" class="content-section">
-                    <!-- Print content -->
-                </div>
-
-                <div id="manager-aspiration" class="content-section">
-                    <!-- Manager aspiration content -->
-                </div>
-
-                <div id="results" class="content-section">
-                    <!-- Results content -->
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Register Modal -->
-    <div id="registerModal" class="modal">
-        <div class="modal-content">
-            <div class="modal-header">
-                <h3><i class="fas fa-user-plus"></i> Đăng ký tài khoản thí sinh</h3>
-                <span class="close" onclick="closeModal('registerModal')">&times;</span>
-            </div>
-            <div class="modal-body">
-                <form id="registerForm">
-                    <div class="form-group">
-                        <label for="regUsername">Tên đăng nhập *</label>
-                        <input type="text" id="regUsername" name="username" required>
-                    </div>
-                    <div class="form-group">
-                        <label for="regPassword">Mật khẩu *</label>
-                        <input type="password" id="regPassword" name="password" required>
-                    </div>
-                    <div class="form-group">
-                        <label for="regEmail">Email *</label>
-                        <input type="email" id="regEmail" name="email" required>
-                    </div>
-                    <div class="form-group">
-                        <label for="regFullname">Họ và tên *</label>
-                        <input type="text" id="regFullname" name="full_name" required>
-                    </div>
-                    <div class="form-group">
-                        <label for="regCitizenId">Số CCCD *</label>
-                        <input type="text" id="regCitizenId" name="citizen_id" required>
-                    </div>
-                    <div class="form-actions">
-                        <button type="button" class="btn btn-secondary" onclick="closeModal('registerModal')">Hủy</button>
-                        <button type="submit" class="btn btn-primary">Đăng ký</button>
-                    </div>
-                </form>
-            </div>
-        </div>
-    </div>
-
-    <!-- Payment Modal -->
-    <div id="paymentModal" class="modal">
-        <div class="modal-content">
-            <div class="modal-header">
-                <h3><i class="fas fa-credit-card"></i> Thanh toán nguyện vọng</h3>
-                <span class="close" onclick="closeModal('paymentModal')">&times;</span>
-            </div>
-            <div class="modal-body">
-                <div id="paymentContent">
-                    <!-- Payment content -->
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Approval Modal -->
-    <div id="approvalModal" class="modal">
-        <div class="modal-content">
-            <div class="modal-header">
-                <h3 id="approvalModalTitle"><i class="fas fa-check-circle"></i> Duyệt nguyện vọng</h3>
-                <span class="close" onclick="closeModal('approvalModal')">&times;</span>
-            </div>
-            <div class="modal-body">
-                <div id="approvalContent">
-                    <!-- Approval content -->
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Print Modal -->
-    <div id="printModal" class="modal">
-        <div class="modal-content" style="max-width: 800px;">
-            <div class="modal-header">
-                <h3><i class="fas fa-print"></i> In danh sách nguyện vọng</h3>
-                <span class="close" onclick="closeModal('printModal')">&times;</span>
-            </div>
-            <div class="modal-body">
-                <div id="printContent">
-                    <!-- Print content -->
-                </div>
-                <div class="form-actions no-print">
-                    <button class="btn btn-secondary" onclick="closeModal('printModal')">Đóng</button>
-                    <button class="btn btn-primary" onclick="window.print()">
-                        <i class="fas fa-print"></i> In
-                    </button>
-                    <button class="btn btn-success" onclick="exportToCSV()">
-                        <i class="fas fa-file-csv"></i> Xuất CSV
-                    </button>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Loading Spinner -->
-    <div id="loading" class="loading">
-        <div class="spinner"></div>
-    </div>
-
-    <script>
-        // ==================== GLOBAL VARIABLES ====================
-        let currentUser = null;
-        let currentRole = 'candidate';
-        let universities = [];
-        let majors = [];
-        let aspirations = [];
-        let documents = [];
-        let payments = [];
-        let pendingAspirations = [];
-        let selectedUniversity = null;
-        let selectedMajor = null;
-        let selectedPaymentMethod = null;
-        let selectedAspirationForPayment = null;
-        let selectedAspirationForApproval = null;
-        let editingFields = new Set();
-        const apiBaseUrl = 'http://localhost:8000/api';
-
-        // ==================== UTILITY FUNCTIONS ====================
-        function showLoading() {
-            document.getElementById('loading').style.display = 'block';
-        }
-
-        function hideLoading() {
-            document.getElementById('loading').style.display = 'none';
-        }
-
-        function showModal(modalId) {
-            document.getElementById(modalId).style.display = 'block';
-        }
-
-        function closeModal(modalId) {
-            document.getElementById(modalId).style.display = 'none';
-        }
-
-        function showAlert(message, type = 'info') {
-            const alertDiv = document.createElement('div');
-            alertDiv.className = `alert alert-${type}`;
-            alertDiv.innerHTML = `
-                <i class="fas fa-${type === 'success' ? 'check-circle' : type === 'error' ? 'exclamation-circle' : type === 'warning' ? 'exclamation-triangle' : 'info-circle'}"></i>
-                ${message}
-            `;
-            
-            const container = document.querySelector('.main-content');
-            container.insertBefore(alertDiv, container.firstChild);
-            
-            setTimeout(() => {
-                alertDiv.remove();
-            }, 5000);
-        }
-
-        async function apiCall(endpoint, options = {}) {
-            const token = localStorage.getItem('token');
-            const headers = {
-                'Content-Type': 'application/json',
-                ...options.headers
-            };
-            
-            if (token) {
-                headers['Authorization'] = token;
-            }
-            
-            try {
-                const response = await fetch(`${apiBaseUrl}${endpoint}`, {
-                    headers,
-                    ...options
-                });
-                
-                if (!response.ok) {
-                    throw new Error(`HTTP error! status: ${response.status}`);
-                }
-                
-                return await response.json();
-            } catch (error) {
-                console.error('API call failed:', error);
-                showAlert('Kết nối server thất bại. Vui lòng thử lại.', 'error');
-                throw error;
-            }
-        }
-
-        // ==================== AUTHENTICATION ====================
-        document.getElementById('loginForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            showLoading();
-
-            const formData = {
-                username: document.getElementById('username').value,
-                password: document.getElementById('password').value
-            };
-
-            try {
-                const result = await apiCall('/auth/login', {
-                    method: 'POST',
-                    body: JSON.stringify(formData)
-                });
-
-                if (result.success) {
-                    currentUser = result.user;
-                    currentRole = result.user.role;
-                    localStorage.setItem('token', result.token);
-                    showSystem();
-                    showAlert('Đăng nhập thành công!', 'success');
-                } else {
-                    showAlert(result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Đăng nhập thất bại. Vui lòng thử lại.', 'error');
-            } finally {
-                hideLoading();
-            }
-        });
-
-        document.getElementById('registerForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            showLoading();
-
-            const formData = {
-                username: document.getElementById('regUsername').value,
-                password: document.getElementById('regPassword').value,
-                email: document.getElementById('regEmail').value,
-                full_name: document.getElementById('regFullname').value,
-                citizen_id: document.getElementById('regCitizenId').value
-            };
-
-            try {
-                const result = await apiCall('/auth/register', {
-                    method: 'POST',
-                    body: JSON.stringify(formData)
-                });
-
-                if (result.success) {
-                    closeModal('registerModal');
-                    showAlert('Đăng ký thành công! Vui lòng đăng nhập.', 'success');
-                    document.getElementById('registerForm').reset();
-                } else {
-                    showAlert(result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Đăng ký thất bại. Vui lòng thử lại.', 'error');
-            } finally {
-                hideLoading();
-            }
-        });
-
-        function showRegisterModal() {
-            showModal('registerModal');
-        }
-
-        function logout() {
-            currentUser = null;
-            localStorage.removeItem('token');
-            document.getElementById('systemContainer').style.display = 'none';
-            document.getElementById('loginPage').style.display = 'block';
-            document.getElementById('loginForm').reset();
-        }
-
-        // ==================== SYSTEM FUNCTIONS ====================
-        function showSystem() {
-            document.getElementById('loginPage').style.display = 'none';
-            document.getElementById('systemContainer').style.display = 'block';
-            
-            document.getElementById('userFullname').textContent = currentUser.full_name;
-            document.getElementById('userRoleDisplay').textContent = 
-                currentUser.role === 'admin' ? 'Quản trị viên' : 
-                currentUser.role === 'manager' ? 'Cán bộ tuyển sinh' : 'Thí sinh';
-            
-            loadSidebarMenu();
-            showSection('dashboard');
-        }
-
-        function loadSidebarMenu() {
-            const sidebarMenu = document.getElementById('sidebarMenu');
-            let menuItems = '';
-
-            if (currentRole === 'candidate') {
-                menuItems = `
-                    <li class="active" onclick="showSection('dashboard')">
-                        <i class="fas fa-tachometer-alt"></i> Tổng quan
-                    </li>
-                    <li onclick="showSection('profile')">
-                        <i class="fas fa-user"></i> Hồ sơ cá nhân
-                    </li>
-                    <li onclick="showSection('aspiration')">
-                        <i class="fas fa-list-ol"></i> Đăng ký nguyện vọng
-                    </li>
-                    <li onclick="showSection('payment')">
-                        <i class="fas fa-credit-card"></i> Thanh toán
-                    </li>
-                    <li onclick="showSection('documents')">
-                        <i class="fas fa-file-alt"></i> Tài liệu
-                    </li>
-                    <li onclick="showSection('print')">
-                        <i class="fas fa-print"></i> In ấn
-                    </li>
-                    <li onclick="showSection('results')">
-                        <i class="fas fa-chart-bar"></i> Kết quả
-                    </li>
-                    <li onclick="logout()">
-                        <i class="fas fa-sign-out-alt"></i> Đăng xuất
-                    </li>
-                `;
-            } else if (currentRole === 'manager') {
-                menuItems = `
-                    <li class="active" onclick="showSection('dashboard')">
-                        <i class="fas fa-tachometer-alt"></i> Tổng quan
-                    </li>
-                    <li onclick="showSection('manager-aspiration')">
-                        <i class="fas fa-list-ol"></i> Duyệt nguyện vọng
-                    </li>
-                    <li onclick="logout()">
-                        <i class="fas fa-sign-out-alt"></i> Đăng xuất
-                    </li>
-                `;
-            } else if (currentRole === 'admin') {
-                menuItems = `
-                    <li class="active" onclick="showSection('dashboard')">
-                        <i class="fas fa-tachometer-alt"></i> Tổng quan
-                    </li>
-                    <li onclick="showSection('manager-aspiration')">
-                        <i class="fas fa-list-ol"></i> Quản lý nguyện vọng
-                    </li>
-                    <li onclick="logout()">
-                        <i class="fas fa-sign-out-alt"></i> Đăng xuất
-                    </li>
-                `;
-            }
-
-            sidebarMenu.innerHTML = menuItems;
-        }
-
-        function showSection(sectionId) {
-            // Hide all sections
-            document.querySelectorAll('.content-section').forEach(section => {
-                section.classList.remove('active');
-            });
-            
-            // Update active menu item
-            document.querySelectorAll('.sidebar-menu li').forEach(item => {
-                item.classList.remove('active');
-            });
-            
-            // Show selected section
-            document.getElementById(sectionId).classList.add('active');
-            
-            // Update section title
-            const titles = {
-                'dashboard': 'Tổng quan hệ thống',
-                'profile': 'Hồ sơ cá nhân',
-                'aspiration': 'Đăng ký nguyện vọng',
-                'payment': 'Thanh toán',
-                'documents': 'Tài liệu',
-                'print': 'In ấn',
-                'manager-aspiration': 'Duyệt nguyện vọng',
-                'results': 'Kết quả tuyển sinh'
-            };
-            
-            document.getElementById('section-title').innerHTML = `
-                <i class="fas fa-${getSectionIcon(sectionId)}"></i> ${titles[sectionId]}
-            `;
-            
-            // Mark active menu item
-            const menuItems = document.querySelectorAll('.sidebar-menu li');
-            for (let i = 0; i < menuItems.length; i++) {
-                if (menuItems[i].getAttribute('onclick') === `showSection('${sectionId}')`) {
-                    menuItems[i].classList.add('active');
-                    break;
-                }
-            }
-            
-            // Load section content
-            loadSectionContent(sectionId);
-        }
-
-        function getSectionIcon(sectionId) {
-            const icons = {
-                'dashboard': 'tachometer-alt',
-                'profile': 'user',
-                'aspiration': 'list-ol',
-                'payment': 'credit-card',
-                'documents': 'file-alt',
-                'print': 'print',
-                'manager-aspiration': 'check-circle',
-                'results': 'chart-bar'
-            };
-            return icons[sectionId] || 'circle';
-        }
-
-        async function loadSectionContent(sectionId) {
-            showLoading();
-            
-            try {
-                switch (sectionId) {
-                    case 'dashboard':
-                        await loadDashboard();
-                        break;
-                    case 'profile':
-                        await loadProfile();
-                        break;
-                    case 'aspiration':
-                        await loadAspiration();
-                        break;
-                    case 'payment':
-                        await loadPayment();
-                        break;
-                    case 'documents':
-                        await loadDocuments();
-                        break;
-                    case 'print':
-                        await loadPrint();
-                        break;
-                    case 'manager-aspiration':
-                        await loadManagerAspiration();
-                        break;
-                    case 'results':
-                        await loadResults();
-                        break;
-                }
-            } catch (error) {
-                console.error('Error loading section:', error);
-                showAlert('Lỗi khi tải dữ liệu', 'error');
-            } finally {
-                hideLoading();
-            }
-        }
-
-        // ==================== SECTION LOADERS ====================
-        async function loadDashboard() {
-            const section = document.getElementById('dashboard');
-            
-            if (currentRole === 'candidate') {
-                try {
-                    const result = await apiCall('/candidate/stats');
-                    const stats = result.data;
-                    
-                    section.innerHTML = `
-                        <div class="stats-grid">
-                            <div class="stat-card primary">
-                                <div class="stat-icon">
-                                    <i class="fas fa-list-ol"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Tổng số nguyện vọng</h3>
-                                    <p>${stats.totalAspirations || 0}</p>
-                                </div>
-                            </div>
-                            <div class="stat-card success">
-                                <div class="stat-icon">
-                                    <i class="fas fa-check-circle"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Đã thanh toán</h3>
-                                    <p>${stats.paidAspirations || 0}</p>
-                                </div>
-                            </div>
-                            <div class="stat-card warning">
-                                <div class="stat-icon">
-                                    <i class="fas fa-clock"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Chờ duyệt</h3>
-                                    <p>${stats.pendingAspirations || 0}</p>
-                                </div>
-                            </div>
-                            <div class="stat-card danger">
-                                <div class="stat-icon">
-                                    <i class="fas fa-times-circle"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Bị từ chối</h3>
-                                    <p>${stats.rejectedAspirations || 0}</p>
-                                </div>
-                            </div>
-                        </div>
-                        
-                        <div class="content-panel">
-                            <h3><i class="fas fa-bell"></i> Thông báo quan trọng</h3>
-                            <div class="alert alert-info">
-                                <i class="fas fa-info-circle"></i>
-                                Thời hạn đăng ký nguyện vọng: 30/06/2025
-                            </div>
-                            <div class="alert alert-warning">
-                                <i class="fas fa-exclamation-triangle"></i>
-                                Vui lòng hoàn tất thanh toán trước 15/07/2025
-                            </div>
-                        </div>
-                        
-                        <div class="content-panel">
-                            <h3><i class="fas fa-list-ol"></i> Nguyện vọng gần đây</h3>
-                            <div id="recentAspirations">
-                                Đang tải...
-                            </div>
-                        </div>
-                    `;
-                    
-                    // Load recent aspirations
-                    await loadRecentAspirations();
-                } catch (error) {
-                    section.innerHTML = `
-                        <div class="alert alert-error">
-                            <i class="fas fa-exclamation-circle"></i>
-                            Lỗi khi tải dữ liệu dashboard
-                        </div>
-                    `;
-                }
-            } else if (currentRole === 'manager' || currentRole === 'admin') {
-                try {
-                    const endpoint = currentRole === 'manager' ? '/manager/stats' : '/admin/stats';
-                    const result = await apiCall(endpoint);
-                    const stats = result.data;
-                    
-                    section.innerHTML = `
-                        <div class="stats-grid">
-                            <div class="stat-card primary">
-                                <div class="stat-icon">
-                                    <i class="fas fa-list-ol"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Tổng nguyện vọng</h3>
-                                    <p>${stats.totalAspirations || stats.aspirations || 0}</p>
-                                </div>
-                            </div>
-                            <div class="stat-card danger">
-                                <div class="stat-icon">
-                                    <i class="fas fa-clock"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Chờ duyệt</h3>
-                                    <p>${stats.pendingAspirations || 0}</p>
-                                </div>
-                            </div>
-                            <div class="stat-card success">
-                                <div class="stat-icon">
-                                    <i class="fas fa-check-circle"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Đã duyệt</h3>
-                                    <p>${stats.approvedAspirations || 0}</p>
-                                </div>
-                            </div>
-                            <div class="stat-card warning">
-                                <div class="stat-icon">
-                                    <i class="fas fa-credit-card"></i>
-                                </div>
-                                <div class="stat-info">
-                                    <h3>Đã thanh toán</h3>
-                                    <p>${stats.totalPayments || 0}</p>
-                                </div>
-                            </div>
-                        </div>
-                        
-                        <div class="content-panel">
-                            <h3><i class="fas fa-clock"></i> Nguyện vọng chờ duyệt (5 mới nhất)</h3>
-                            <div id="pendingAspirationsList">
-                                Đang tải...
-                            </div>
-                        </div>
-                    `;
-                    
-                    // Load pending aspirations for manager
-                    await loadPendingAspirationsForManager();
-                } catch (error) {
-                    section.innerHTML = `
-                        <div class="alert alert-error">
-                            <i class="fas fa-exclamation-circle"></i>
-                            Lỗi khi tải dữ liệu dashboard
-                        </div>
-                    `;
-                }
-            }
-        }
-
-        async function loadRecentAspirations() {
-            try {
-                const result = await apiCall('/candidate/aspirations');
-                const aspirations = result.data;
-                
-                const container = document.getElementById('recentAspirations');
-                
-                if (aspirations.length > 0) {
-                    container.innerHTML = `
-                        <div class="table-container">
-                            <table>
-                                <thead>
-                                    <tr>
-                                        <th>STT</th>
-                                        <th>Trường</th>
-                                        <th>Ngành</th>
-                                        <th>Trạng thái</th>
-                                        <th>Thanh toán</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-                                    ${aspirations.slice(0, 5).map(asp => `
-                                        <tr>
-                                            <td>${asp.priority}</td>
-                                            <td>${asp.university_name}</td>
-                                            <td>${asp.major_name}</td>
-                                            <td>
-                                                <span class="status-badge ${getStatusClass(asp.status)}">
-                                                    ${getStatusText(asp.status)}
-                                                </span>
-                                            </td>
-                                            <td>
-                                                <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
-                                                    ${getPaymentStatusText(asp.payment_status)}
-                                                </span>
-                                            </td>
-                                        </tr>
-                                    `).join('')}
-                                </tbody>
-                            </table>
-                        </div>
-                    `;
-                } else {
-                    container.innerHTML = '<p class="text-muted">Chưa có nguyện vọng nào</p>';
-                }
-            } catch (error) {
-                document.getElementById('recentAspirations').innerHTML = 
-                    '<p class="text-muted">Lỗi khi tải danh sách nguyện vọng</p>';
-            }
-        }
-
-        async function loadPendingAspirationsForManager() {
-            try {
-                const result = await apiCall('/manager/pending-aspirations');
-                const pendingAspirations = result.data;
-                
-                const container = document.getElementById('pendingAspirationsList');
-                
-                if (pendingAspirations.length > 0) {
-                    container.innerHTML = `
-                        <div class="table-container">
-                            <table>
-                                <thead>
-                                    <tr>
-                                        <th>Thí sinh</th>
-                                        <th>CCCD</th>
-                                        <th>Trường</th>
-                                        <th>Ngành</th>
-                                        <th>Ưu tiên</th>
-                                        <th>Thanh toán</th>
-                                        <th>Thao tác</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-                                    ${pendingAspirations.slice(0, 5).map(asp => `
-                                        <tr>
-                                            <td>${asp.candidate_name}</td>
-                                            <td>${asp.citizen_id}</td>
-                                            <td>${asp.university_name}</td>
-                                            <td>${asp.major_name}</td>
-                                            <td>${asp.priority}</td>
-                                            <td>
-                                                <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
-                                                    ${getPaymentStatusText(asp.payment_status)}
-                                                </span>
-                                            </td>
-                                            <td>
-                                                <button class="btn btn-success btn-sm" onclick="showApprovalModal(${asp.id}, 'approve')">
-                                                    <i class="fas fa-check"></i>
-                                                </button>
-                                                <button class="btn btn-danger btn-sm" onclick="showApprovalModal(${asp.id}, 'reject')">
-                                                    <i class="fas fa-times"></i>
-                                                </button>
-                                            </td>
-                                        </tr>
-                                    `).join('')}
-                                </tbody>
-                            </table>
-                        </div>
-                    `;
-                } else {
-                    container.innerHTML = '<p class="text-muted">Không có nguyện vọng nào chờ duyệt</p>';
-                }
-            } catch (error) {
-                document.getElementById('pendingAspirationsList').innerHTML = 
-                    '<p class="text-muted">Lỗi khi tải danh sách nguyện vọng chờ duyệt</p>';
-            }
-        }
-
-        async function loadProfile() {
-            try {
-                const result = await apiCall('/candidate/profile');
-                const profile = result.data;
-                
-                const section = document.getElementById('profile');
-                
-                section.innerHTML = `
-                    <div class="content-panel">
-                        <div class="section-header">
-                            <h3><i class="fas fa-user"></i> Thông tin cá nhân</h3>
-                            <button class="btn btn-primary" onclick="enableProfileEditing()">
-                                <i class="fas fa-edit"></i> Chỉnh sửa
-                            </button>
-                        </div>
-                        <form id="profileForm">
-                            <div class="form-group">
-                                <label>Họ và tên</label>
-                                <input type="text" id="profileFullname" value="${profile.full_name}" readonly>
-                            </div>
-                            <div class="form-group">
-                                <label>Email</label>
-                                <input type="email" id="profileEmail" value="${profile.email}" readonly>
-                            </div>
-                            <div class="form-group">
-                                <label>Số CCCD</label>
-                                <input type="text" id="profileCitizenId" value="${profile.citizen_id}" readonly>
-                            </div>
-                            <div class="form-group">
-                                <label>Ngày sinh</label>
-                                <input type="date" id="profileDob" value="${profile.date_of_birth || ''}" readonly>
-                            </div>
-                            <div class="form-group">
-                                <label>Giới tính</label>
-                                <select id="profileGender" disabled>
-                                    <option value="">Chọn giới tính</option>
-                                    <option value="male" ${profile.gender === 'male' ? 'selected' : ''}>Nam</option>
-                                    <option value="female" ${profile.gender === 'female' ? 'selected' : ''}>Nữ</option>
-                                </select>
-                            </div>
-                            <div class="form-group">
-                                <label>Địa chỉ</label>
-                                <textarea id="profileAddress" rows="3" readonly>${profile.address || ''}</textarea>
-                            </div>
-                            <div class="form-group">
-                                <label>Số điện thoại</label>
-                                <input type="tel" id="profilePhone" value="${profile.phone || ''}" readonly>
-                            </div>
-                            <div class="form-group">
-                                <label>Trường THPT</label>
-                                <input type="text" id="profileHighSchool" value="${profile.high_school || ''}" readonly>
-                            </div>
-                            <div class="form-group">
-                                <label>Năm tốt nghiệp</label>
-                                <input type="number" id="profileGraduationYear" value="${profile.graduation_year || ''}" readonly>
-                            </div>
-                            <div class="form-actions" id="profileActions" style="display: none;">
-                                <button type="button" class="btn btn-secondary" onclick="cancelProfileEditing()">Hủy</button>
-                                <button type="submit" class="btn btn-primary">Cập nhật thông tin</button>
-                            </div>
-                        </form>
-                    </div>
-                `;
-                
-                document.getElementById('profileForm').addEventListener('submit', async function(e) {
-                    e.preventDefault();
-                    await saveProfile();
-                });
-            } catch (error) {
-                const section = document.getElementById('profile');
-                section.innerHTML = `
-                    <div class="alert alert-error">
-                        <i class="fas fa-exclamation-circle"></i>
-                        Lỗi khi tải thông tin hồ sơ
-                    </div>
-                `;
-            }
-        }
-
-        async function loadAspiration() {
-            try {
-                // Load universities and aspirations
-                const [uniResult, aspResult] = await Promise.all([
-                    apiCall('/universities'),
-                    apiCall('/candidate/aspirations')
-                ]);
-                
-                universities = uniResult.data;
-                aspirations = aspResult.data;
-                
-                const section = document.getElementById('aspiration');
-                
-                section.innerHTML = `
-                    <div class="content-panel">
-                        <h3><i class="fas fa-list-ol"></i> Danh sách nguyện vọng hiện tại</h3>
-                        <div id="currentAspirations">
-                            ${aspirations.length > 0 ? `
-                                <div class="table-container">
-                                    <table>
-                                        <thead>
-                                            <tr>
-                                                <th>STT</th>
-                                                <th>Trường</th>
-                                                <th>Ngành</th>
-                                                <th>Trạng thái</th>
-                                                <th>Thanh toán</th>
-                                                <th>Thao tác</th>
-                                            </tr>
-                                        </thead>
-                                        <tbody>
-                                            ${aspirations.map(asp => `
-                                                <tr>
-                                                    <td>${asp.priority}</td>
-                                                    <td>${asp.university_name}</td>
-                                                    <td>${asp.major_name}</td>
-                                                    <td>
-                                                        <span class="status-badge ${getStatusClass(asp.status)}">
-                                                            ${getStatusText(asp.status)}
-                                                        </span>
-                                                    </td>
-                                                    <td>
-                                                        <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
-                                                            ${getPaymentStatusText(asp.payment_status)}
-                                                        </span>
-                                                    </td>
-                                                    <td>
-                                                        <button class="btn btn-danger btn-sm" onclick="removeAspiration(${asp.id})">
-                                                            <i class="fas fa-trash"></i>
-                                                        </button>
-                                                    </td>
-                                                </tr>
-                                            `).join('')}
-                                        </tbody>
-                                    </table>
-                                </div>
-                            ` : '<p class="text-muted">Chưa có nguyện vọng nào</p>'}
-                        </div>
-                    </div>
-                    
-                    <div class="content-panel">
-                        <h3><i class="fas fa-plus-circle"></i> Thêm nguyện vọng mới</h3>
-                        <div class="form-group">
-                            <label>Chọn trường đại học</label>
-                            <select id="universitySelect" onchange="loadUniversityMajors(this.value)">
-                                <option value="">-- Chọn trường --</option>
-                                ${universities.map(uni => `
-                                    <option value="${uni.id}">${uni.name}</option>
-                                `).join('')}
-                            </select>
-                        </div>
-                        
-                        <div class="form-group">
-                            <label>Chọn ngành học</label>
-                            <select id="majorSelect" disabled>
-                                <option value="">-- Chọn ngành --</option>
-                            </select>
-                        </div>
-                        
-                        <div class="form-group">
-                            <label>Thứ tự ưu tiên</label>
-                            <select id="prioritySelect">
-                                ${Array.from({length: 10}, (_, i) => `
-                                    <option value="${i + 1}">${i + 1}</option>
-                                `).join('')}
-                            </select>
-                        </div>
-                        
-                        <button class="btn btn-primary" onclick="addNewAspiration()">
-                            <i class="fas fa-plus"></i> Thêm nguyện vọng
-                        </button>
-                    </div>
-                `;
-            } catch (error) {
-                const section = document.getElementById('aspiration');
-                section.innerHTML = `
-                    <div class="alert alert-error">
-                        <i class="fas fa-exclamation-circle"></i>
-                        Lỗi khi tải thông tin nguyện vọng
-                    </div>
-                `;
-            }
-        }
-
-        async function loadPayment() {
-            try {
-                const [configResult, historyResult, aspResult] = await Promise.all([
-                    apiCall('/payment/config'),
-                    apiCall('/payment/history'),
-                    apiCall('/candidate/aspirations')
-                ]);
-                
-                const paymentConfig = configResult.data;
-                payments = historyResult.data;
-                aspirations = aspResult.data.filter(asp => asp.payment_status === 'pending');
-                
-                const section = document.getElementById('payment');
-                
-                section.innerHTML = `
-                    <div class="content-panel">
-                        <h3><i class="fas fa-credit-card"></i> Thanh toán nguyện vọng</h3>
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i>
-                            Phí đăng ký mỗi nguyện vọng: ${formatCurrency(paymentConfig.aspiration_fee)}
-                        </div>
-                        
-                        <div id="paymentAspirations">
-                            ${aspirations.length > 0 ? `
-                                <div class="table-container">
-                                    <table>
-                                        <thead>
-                                            <tr>
-                                                <th>STT</th>
-                                                <th>Trường</th>
-                                                <th>Ngành</th>
-                                                <th>Phí</th>
-                                                <th>Thao tác</th>
-                                            </tr>
-                                        </thead>
-                                        <tbody>
-                                            ${aspirations.map(asp => `
-                                                <tr>
-                                                    <td>${asp.priority}</td>
-                                                    <td>${asp.university_name}</td>
-                                                    <td>${asp.major_name}</td>
-                                                    <td>${formatCurrency(paymentConfig.aspiration_fee)}</td>
-                                                    <td>
-                                                        <button class="btn btn-primary btn-sm" onclick="showPaymentModal(${asp.id})">
-                                                            <i class="fas fa-credit-card"></i> Thanh toán
-                                                        </button>
-                                                    </td>
-                                                </tr>
-                                            `).join('')}
-                                        </tbody>
-                                    </table>
-                                </div>
-                            ` : '<p class="text-muted">Không có nguyện vọng nào cần thanh toán</p>'}
-                        </div>
-                    </div>
-                    
-                    <div class="content-panel">
-                        <h3><i class="fas fa-history"></i> Lịch sử thanh toán</h3>
-                        <div id="paymentHistory">
-                            ${payments.length > 0 ? `
-                                <div class="table-container">
-                                    <table>
-                                        <thead>
-                                            <tr>
-                                                <th>Mã GD</th>
-                                                <th>Ngày</th>
-                                                <th>Số tiền</th>
-                                                <th>Phương thức</th>
-                                                <th>Trạng thái</th>
-                                            </tr>
-                                        </thead>
-                                        <tbody>
-                                            ${payments.map(payment => `
-                                                <tr>
-                                                    <td>${payment.transaction_id || 'N/A'}</td>
-                                                    <td>${formatDate(payment.created_at)}</td>
-                                                    <td>${formatCurrency(payment.amount)}</td>
-                                                    <td>${getPaymentMethodText(payment.payment_method)}</td>
-                                                    <td>
-                                                        <span class="status-badge ${payment.status === 'completed' ? 'status-approved' : 'status-pending'}">
-                                                            ${payment.status === 'completed' ? 'Hoàn thành' : 'Chờ xử lý'}
-                                                        </span>
-                                                    </td>
-                                                </tr>
-                                            `).join('')}
-                                        </tbody>
-                                    </table>
-                                </div>
-                            ` : '<p class="text-muted">Chưa có giao dịch nào</p>'}
-                        </div>
-                    </div>
-                `;
-            } catch (error) {
-                const section = document.getElementById('payment');
-                section.innerHTML = `
-                    <div class="alert alert-error">
-                        <i class="fas fa-exclamation-circle"></i>
-                        Lỗi khi tải thông tin thanh toán
-                    </div>
-                `;
-            }
-        }
-
-        async function loadDocuments() {
-            try {
-                const result = await apiCall('/documents');
-                documents = result.data;
-                
-                const section = document.getElementById('documents');
-                
-                section.innerHTML = `
-                    <div class="content-panel">
-                        <h3><i class="fas fa-file-alt"></i> Tài liệu tuyển sinh</h3>
-                        <div class="document-list">
-                            ${documents.map(doc => `
-                                <div class="document-item">
-                                    <div class="document-icon">
-                                        <i class="fas fa-${getDocumentIcon(doc.category)}"></i>
-                                    </div>
-                                    <div class="document-info">
-                                        <h4>${doc.title}</h4>
-                                        <p>${doc.description}</p>
-                                        <small class="text-muted">Ngày đăng: ${formatDate(doc.created_at)}</small>
-                                    </div>
-                                    <button class="btn btn-primary">
-                                        <i class="fas fa-download"></i> Tải về
-                                    </button>
-                                </div>
-                            `).join('')}
-                        </div>
-                    </div>
-                `;
-            } catch (error) {
-                const section = document.getElementById('documents');
-                section.innerHTML = `
-                    <div class="alert alert-error">
-                        <i class="fas fa-exclamation-circle"></i>
-                        Lỗi khi tải tài liệu
-                    </div>
-                `;
-            }
-        }
-
-        async function loadPrint() {
-            try {
-                const section = document.getElementById('print');
-                
-                section.innerHTML = `
-                    <div class="content-panel">
-                        <h3><i class="fas fa-print"></i> In và xuất dữ liệu</h3>
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i>
-                            Xuất danh sách nguyện vọng của bạn ra file PDF hoặc CSV
-                        </div>
-                        
-                        <div class="print-actions">
-                            <button class="btn btn-primary" onclick="generatePrintData()">
-                                <i class="fas fa-file-pdf"></i> Xem trước bản in
-                            </button>
-                            <button class="btn btn-success" onclick="exportToCSV()">
-                                <i class="fas fa-file-csv"></i> Xuất file CSV
-                            </button>
-                        </div>
-                        
-                        <div id="printPreview" class="mt-4">
-                            <!-- Print preview will be loaded here -->
-                        </div>
-                    </div>
-                `;
-            } catch (error) {
-                const section = document.getElementById('print');
-                section.innerHTML = `
-                    <div class="alert alert-error">
-                        <i class="fas fa-exclamation-circle"></i>
-                        Lỗi khi tải tính năng in ấn
-                    </div>
-                `;
-            }
-        }
-
-        async function loadManagerAspiration() {
-            try {
-                const result = await apiCall('/manager/pending-aspirations');
-                pendingAspirations = result.data;
-                
-                const section = document.getElementById('manager-aspiration');
-                
-                section.innerHTML = `
-                    <div class="content-panel">
-                        <h3><i class="fas fa-tasks"></i> Quản lý nguyện vọng</h3>
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i>
-                            Danh sách nguyện vọng đang chờ duyệt
-                        </div>
-                        
-                        <div id="managerAspirationsList">
-                            ${pendingAspirations.length > 0 ? `
-                                <div class="table-container">
-                                    <table>
-                                        <thead>
-                                            <tr>
-                                                <th>Thí sinh</th>
-                                                <th>CCCD</th>
-                                                <th>Trường</th>
-                                                <th>Ngành</th>
-                                                <th>Ưu tiên</th>
-                                                <th>Thanh toán</th>
-                                                <th>Ngày đăng ký</th>
-                                                <th>Thao tác</th>
-                                            </tr>
-                                        </thead>
-                                        <tbody>
-                                            ${pendingAspirations.map(asp => `
-                                                <tr>
-                                                    <td>${asp.candidate_name}</td>
-                                                    <td>${asp.citizen_id}</td>
-                                                    <td>${asp.university_name}</td>
-                                                    <td>${asp.major_name}</td>
-                                                    <td>${asp.priority}</td>
-                                                    <td>
-                                                        <span class="payment-status ${getPaymentStatusClass(asp.payment_status)}">
-                                                            ${getPaymentStatusText(asp.payment_status)}
-                                                        </span>
-                                                    </td>
-                                                    <td>${formatDate(asp.registered_at)}</td>
-                                                    <td>
-                                                        <button class="btn btn-success btn-sm" onclick="showApprovalModal(${asp.id}, 'approve')">
-                                                            <i class="fas fa-check"></i> Duyệt
-                                                        </button>
-                                                        <button class="btn btn-danger btn-sm" onclick="showApprovalModal(${asp.id}, 'reject')">
-                                                            <i class="fas fa-times"></i> Từ chối
-                                                        </button>
-                                                    </td>
-                                                </tr>
-                                            `).join('')}
-                                        </tbody>
-                                    </table>
-                                </div>
-                            ` : '<p class="text-muted">Không có nguyện vọng nào chờ duyệt</p>'}
-                        </div>
-                    </div>
-                `;
-            } catch (error) {
-                const section = document.getElementById('manager-aspiration');
-                section.innerHTML = `
-                    <div class="alert alert-error">
-                        <i class="fas fa-exclamation-circle"></i>
-                        Lỗi khi tải danh sách nguyện vọng
-                    </div>
-                `;
-            }
-        }
-
-        async function loadResults() {
-            try {
-                const result = await apiCall('/candidate/results');
-                const results = result.data;
-                
-                const section = document.getElementById('results');
-                
-                section.innerHTML = `
-                    <div class="content-panel">
-                        <h3><i class="fas fa-chart-bar"></i> Kết quả tuyển sinh</h3>
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i>
-                            Kết quả xét tuyển sẽ được công bố sau khi kết thúc thời gian đăng ký
-                        </div>
-                        
-                        <div id="resultsList">
-                            ${results.length > 0 ? `
-                                <div class="table-container">
-                                    <table>
-                                        <thead>
-                                            <tr>
-                                                <th>STT</th>
-                                                <th>Trường</th>
-                                                <th>Ngành</th>
-                                                <th>Trạng thái</th>
-                                                <th>Ghi chú</th>
-                                            </tr>
-                                        </thead>
-                                        <tbody>
-                                            ${results.map(result => `
-                                                <tr>
-                                                    <td>${result.priority}</td>
-                                                    <td>${result.university_name}</td>
-                                                    <td>${result.major_name}</td>
-                                                    <td>
-                                                        <span class="status-badge ${getStatusClass(result.status)}">
-                                                            ${getStatusText(result.status)}
-                                                        </span>
-                                                    </td>
-                                                    <td>${result.status === 'approved' ? 'Đủ điều kiện' : 'Đang chờ'}</td>
-                                                </tr>
-                                            `).join('')}
-                                        </tbody>
-                                    </table>
-                                </div>
-                            ` : '<p class="text-muted">Chưa có kết quả nào</p>'}
-                        </div>
-                    </div>
-                `;
-            } catch (error) {
-                const section = document.getElementById('results');
-                section.innerHTML = `
-                    <div class="alert alert-error">
-                        <i class="fas fa-exclamation-circle"></i>
-                        Lỗi khi tải kết quả
-                    </div>
-                `;
+def generate_aspirations_pdf(candidate_id):
+    """Tạo PDF danh sách nguyện vọng"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        # Lấy thông tin thí sinh
+        cursor.execute('''
+            SELECT u.full_name, c.citizen_id, c.date_of_birth, c.gender,
+                   c.address, c.phone, c.high_school, c.graduation_year
+            FROM users u
+            JOIN candidates c ON u.id = c.user_id
+            WHERE c.id = ?
+        ''', (candidate_id,))
+        
+        candidate_info = cursor.fetchone()
+        
+        # Lấy danh sách nguyện vọng
+        cursor.execute('''
+            SELECT a.priority_order, u.name as university_name, m.name as major_name,
+                   a.status, a.payment_status, a.registered_at,
+                   m.subject_group, u.code as university_code, m.code as major_code
+            FROM aspirations a
+            JOIN universities u ON a.university_id = u.id
+            JOIN majors m ON a.major_id = m.id
+            WHERE a.candidate_id = ?
+            ORDER BY a.priority_order
+        ''', (candidate_id,))
+        
+        aspirations = cursor.fetchall()
+    
+    if not candidate_info:
+        return None
+    
+    print_data = {
+        'candidate': {
+            'full_name': candidate_info[0],
+            'citizen_id': candidate_info[1],
+            'date_of_birth': candidate_info[2],
+            'gender': candidate_info[3],
+            'address': candidate_info[4],
+            'phone': candidate_info[5],
+            'high_school': candidate_info[6],
+            'graduation_year': candidate_info[7]
+        },
+        'aspirations': [
+            {
+                'priority': row[0],
+                'university_name': row[1],
+                'major_name': row[2],
+                'status': row[3],
+                'payment_status': row[4],
+                'registered_at': row[5],
+                'subject_group': row[6],
+                'university_code': row[7],
+                'major_code': row[8]
             }
-        }
-
-        // ==================== HELPER FUNCTIONS ====================
-        function getStatusClass(status) {
-            const classes = {
-                'pending': 'status-pending',
-                'approved': 'status-approved',
-                'rejected': 'status-rejected',
-                'completed': 'status-approved'
-            };
-            return classes[status] || 'status-pending';
-        }
-
-        function getStatusText(status) {
-            const texts = {
-                'pending': 'Chờ duyệt',
-                'approved': 'Đã duyệt',
-                'rejected': 'Đã từ chối',
-                'completed': 'Hoàn thành'
-            };
-            return texts[status] || status;
-        }
-
-        function getPaymentStatusClass(status) {
-            const classes = {
-                'pending': 'payment-pending',
-                'paid': 'payment-paid'
-            };
-            return classes[status] || 'payment-pending';
-        }
-
-        function getPaymentStatusText(status) {
-            const texts = {
-                'pending': 'Chưa thanh toán',
-                'paid': 'Đã thanh toán'
-            };
-            return texts[status] || status;
-        }
-
-        function getPaymentMethodText(method) {
-            const texts = {
-                'bank_transfer': 'Chuyển khoản',
-                'momo': 'Ví MoMo',
-                'zalopay': 'Ví ZaloPay',
-                'credit_card': 'Thẻ tín dụng'
-            };
-            return texts[method] || method;
-        }
-
-        function getDocumentIcon(category) {
-            const icons = {
-                'guide': 'book',
-                'regulation': 'gavel',
-                'template': 'file-alt',
-                'announcement': 'bullhorn'
-            };
-            return icons[category] || 'file';
-        }
-
-        function formatCurrency(amount) {
-            return new Intl.NumberFormat('vi-VN', {
-                style: 'currency',
-                currency: 'VND'
-            }).format(amount);
-        }
+            for row in aspirations
+        ],
+        'print_date': datetime.now().strftime('%d/%m/%Y %H:%M'),
+        'contact_info': config.get('contact_info')
+    }
+    
+    return print_data
 
-        function formatDate(dateString) {
-            if (!dateString) return '-';
-            const date = new Date(dateString);
-            return date.toLocaleDateString('vi-VN');
-        }
+def export_aspirations_csv(candidate_id):
+    """Xuất danh sách nguyện vọng ra CSV"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        # Lấy thông tin thí sinh
+        cursor.execute('''
+            SELECT u.full_name, c.citizen_id, c.date_of_birth, c.gender,
+                   c.address, c.phone, c.high_school, c.graduation_year
+            FROM users u
+            JOIN candidates c ON u.id = c.user_id
+            WHERE c.id = ?
+        ''', (candidate_id,))
+        
+        candidate_info = cursor.fetchone()
+        
+        # Lấy danh sách nguyện vọng
+        cursor.execute('''
+            SELECT a.priority_order, u.code as university_code, u.name as university_name, 
+                   m.code as major_code, m.name as major_name, m.subject_group,
+                   a.status, a.payment_status, a.registered_at
+            FROM aspirations a
+            JOIN universities u ON a.university_id = u.id
+            JOIN majors m ON a.major_id = m.id
+            WHERE a.candidate_id = ?
+            ORDER BY a.priority_order
+        ''', (candidate_id,))
+        
+        aspirations = cursor.fetchall()
+    
+    if not candidate_info:
+        return None
+    
+    # Tạo CSV trong memory
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    # Viết header
+    writer.writerow(['DANH SÁCH NGUYỆN VỌNG ĐĂNG KÝ XÉT TUYỂN'])
+    writer.writerow(['Thí sinh:', candidate_info[0]])
+    writer.writerow(['Số CCCD:', candidate_info[1]])
+    writer.writerow(['Ngày sinh:', candidate_info[2]])
+    writer.writerow(['Giới tính:', candidate_info[3]])
+    writer.writerow([])
+    writer.writerow(['STT', 'Mã trường', 'Tên trường', 'Mã ngành', 'Tên ngành', 'Khối thi', 'Trạng thái', 'Thanh toán'])
+    
+    # Viết dữ liệu nguyện vọng
+    for i, row in enumerate(aspirations, 1):
+        writer.writerow([
+            row[0],  # priority
+            row[1],  # university_code
+            row[2],  # university_name
+            row[3],  # major_code
+            row[4],  # major_name
+            row[5],  # subject_group
+            'Đã duyệt' if row[6] == 'approved' else 'Chờ duyệt',
+            'Đã thanh toán' if row[7] == 'paid' else 'Chưa thanh toán'
+        ])
+    
+    writer.writerow([])
+    writer.writerow(['Ngày xuất:', datetime.now().strftime('%d/%m/%Y %H:%M')])
+    
+    return output.getvalue()
 
-        // ==================== PROFILE FUNCTIONS ====================
-        function enableProfileEditing() {
-            const fields = [
-                'profileFullname', 'profileEmail', 'profileDob', 'profileGender',
-                'profileAddress', 'profilePhone', 'profileHighSchool', 'profileGraduationYear'
-            ];
-            
-            fields.forEach(fieldId => {
-                const field = document.getElementById(fieldId);
-                if (field) {
-                    field.readOnly = false;
-                    field.disabled = false;
-                }
-            });
-            
-            document.getElementById('profileActions').style.display = 'flex';
-        }
+# ==================== FRONTEND ====================
+
+def choose_encoding(accept_encoding, available):
+    """Chọn Content-Encoding theo Accept-Encoding (có q-value); ưu tiên br, gzip rồi deflate"""
+    if not accept_encoding:
+        return 'identity'
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    
+    for encoding in ('br', 'gzip', 'deflate'):
+        if encoding in available and weights.get(encoding, weights.get('*', 0)) > 0:
+            return encoding
+    return 'identity'
 
-        function cancelProfileEditing() {
-            loadProfile();
-        }
+class PrecompressedAsset:
+    """Nội dung tĩnh được encode và nén sẵn một lần, mỗi bản nén có ETag riêng"""
+    
+    def __init__(self, body, content_type, cache_control):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        # encoding -> (bytes, ETag)
+        self.variants = {'identity': (body, f'"{digest}"')}
+        self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+    
+    def select(self, accept_encoding):
+        encoding = choose_encoding(accept_encoding, self.variants)
+        return (encoding, *self.variants[encoding])
 
-        async function saveProfile() {
-            showLoading();
-            
-            try {
-                const formData = {
-                    full_name: document.getElementById('profileFullname').value,
-                    email: document.getElementById('profileEmail').value,
-                    date_of_birth: document.getElementById('profileDob').value,
-                    gender: document.getElementById('profileGender').value,
-                    address: document.getElementById('profileAddress').value,
-                    phone: document.getElementById('profilePhone').value,
-                    high_school: document.getElementById('profileHighSchool').value,
-                    graduation_year: document.getElementById('profileGraduationYear').value
-                };
-                
-                const result = await apiCall('/candidate/profile/update', {
-                    method: 'POST',
-                    body: JSON.stringify(formData)
-                });
-                
-                if (result.success) {
-                    showAlert('Cập nhật thông tin thành công!', 'success');
-                    currentUser.full_name = formData.full_name;
-                    document.getElementById('userFullname').textContent = formData.full_name;
-                    
-                    await loadProfile();
-                } else {
-                    showAlert('Cập nhật thông tin thất bại', 'error');
-                }
-            } catch (error) {
-                showAlert('Cập nhật thông tin thất bại', 'error');
-            } finally {
-                hideLoading();
-            }
-        }
+# Nén sẵn ra file cạnh file gốc: (Content-Encoding, đuôi file, hàm nén)
+PRECOMPRESSORS = [('gzip', '.gz', lambda body: gzip.compress(body, compresslevel=9, mtime=0))]
+if brotli is not None:
+    PRECOMPRESSORS.append(('br', '.br', lambda body: brotli.compress(body, quality=11)))
 
-        // ==================== ASPIRATION FUNCTIONS ====================
-        async function loadUniversityMajors(universityId) {
-            if (!universityId) return;
-            
-            try {
-                const result = await apiCall(`/universities/${universityId}/majors`);
-                majors = result.data;
-                
-                const majorSelect = document.getElementById('majorSelect');
-                majorSelect.innerHTML = '<option value="">-- Chọn ngành --</option>' +
-                    majors.map(major => `
-                        <option value="${major.id}">${major.name} (${major.code})</option>
-                    `).join('');
-                majorSelect.disabled = false;
-            } catch (error) {
-                showAlert('Lỗi khi tải danh sách ngành học', 'error');
-            }
-        }
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
 
-        async function addNewAspiration() {
-            const universityId = document.getElementById('universitySelect').value;
-            const majorId = document.getElementById('majorSelect').value;
-            const priority = document.getElementById('prioritySelect').value;
-            
-            if (!universityId || !majorId || !priority) {
-                showAlert('Vui lòng chọn đầy đủ thông tin', 'error');
-                return;
-            }
-            
-            showLoading();
-            
-            try {
-                const result = await apiCall('/candidate/aspirations/add', {
-                    method: 'POST',
-                    body: JSON.stringify({
-                        university_id: universityId,
-                        major_id: majorId,
-                        priority: priority
-                    })
-                });
-                
-                if (result.success) {
-                    showAlert('Thêm nguyện vọng thành công!', 'success');
-                    await loadAspiration();
-                } else {
-                    showAlert(result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Thêm nguyện vọng thất bại', 'error');
-            } finally {
-                hideLoading();
-            }
-        }
+def fingerprint_name(name, digest):
+    stem, extension = os.path.splitext(name)
+    return f'{stem}.{digest[:12]}{extension}'
 
-        async function removeAspiration(aspirationId) {
-            if (!confirm('Bạn có chắc chắn muốn xóa nguyện vọng này?')) return;
-            
-            showLoading();
+class StaticAsset:
+    """Một file tĩnh: URL có hash nội dung, kèm các bản nén sẵn trên đĩa"""
+    
+    def __init__(self, name, path):
+        self.name = name
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        compressible = content_type.startswith(COMPRESSIBLE_TYPES)
+        self.content_type = content_type + '; charset=utf-8' if compressible else content_type
+        
+        with open(path, 'rb') as f:
+            body = f.read()
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.url_name = fingerprint_name(name, digest)
+        
+        # encoding -> (đường dẫn file, kích thước, ETag)
+        self.variants = {'identity': (path, len(body), f'"{digest}"')}
+        if compressible:
+            for encoding, suffix, compress in PRECOMPRESSORS:
+                compressed_path = path + suffix
+                if (not os.path.exists(compressed_path)
+                        or os.path.getmtime(compressed_path) < os.path.getmtime(path)):
+                    # Ghi file tạm rồi đổi tên để process khác không đọc phải file ghi dở
+                    tmp_path = f'{compressed_path}.{os.getpid()}.tmp'
+                    with open(tmp_path, 'wb') as f:
+                        f.write(compress(body))
+                    os.replace(tmp_path, compressed_path)
+                self.variants[encoding] = (compressed_path, os.path.getsize(compressed_path),
+                                           f'"{digest}-{encoding}"')
+
+class StaticAssets:
+    """Các file trong static_dir, phục vụ tại /static/<tên>.<hash>.<đuôi>"""
+    
+    def __init__(self, directory):
+        self.assets = {}
+        self.by_url = {}
+        if not os.path.isdir(directory):
+            return
+        compressed_suffixes = tuple(suffix for _, suffix, _ in PRECOMPRESSORS) + ('.gz', '.br', '.tmp')
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if name.startswith('.') or name.endswith(compressed_suffixes) or not os.path.isfile(path):
+                continue
+            asset = StaticAsset(name, path)
+            self.assets[name] = asset
+            self.by_url[asset.url_name] = asset
+    
+    def url(self, name):
+        return '/static/' + self.assets[name].url_name
+    
+    def rewrite(self, html):
+        """Thay "/static/<tên>" trong HTML bằng URL có hash; thư viện chưa vendor thì dùng CDN"""
+        for name in self.assets:
+            html = html.replace(f'"/static/{name}"', f'"{self.url(name)}"')
+        for name, cdn_url in VENDOR_ASSETS.items():
+            if name not in self.assets:
+                html = html.replace(f'"/static/{name}"', f'"{cdn_url}"')
+        return html
+
+# Thư viện bên thứ ba phục vụ từ static_dir: tên file -> URL gốc (cố định phiên bản).
+# Chart.js và Font Awesome (CSS + webfont) đã có sẵn trong static/ của repo; --vendor-assets
+# tải lại toàn bộ (máy có mạng). Thư viện chưa có file trong static_dir thì HTML dùng URL gốc.
+VENDOR_ASSETS = {
+    'chart.umd.js': 'https://cdn.jsdelivr.net/npm/chart.js@4.4.4/dist/chart.umd.js',
+    'fontawesome.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+}
+
+CSS_FONT_URL = re.compile(r'url\((["\']?)(\.\./webfonts/[^)"\'?#]+)[^)]*?\1\)')
+
+def vendor_assets(directory):
+    """Tải các thư viện trong VENDOR_ASSETS (kèm webfont của CSS) vào static_dir"""
+    os.makedirs(directory, exist_ok=True)
+    
+    def download(url):
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return response.read()
+    
+    def save(name, body):
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(body)
+        print(f"   ✅ {name} ({len(body):,} bytes)")
+    
+    for name, url in VENDOR_ASSETS.items():
+        body = download(url)
+        if name.endswith('.css'):
+            # Webfont được lưu phẳng trong static_dir, CSS trỏ thẳng tới URL có hash của font
+            fonts = {}
+            for match in CSS_FONT_URL.finditer(body.decode('utf-8')):
+                font_path = match.group(2)
+                if font_path not in fonts:
+                    font_name = os.path.basename(font_path)
+                    font_body = download(urllib.parse.urljoin(url, font_path))
+                    save(font_name, font_body)
+                    digest = hashlib.blake2b(font_body, digest_size=16).hexdigest()
+                    fonts[font_path] = '/static/' + fingerprint_name(font_name, digest)
+            body = CSS_FONT_URL.sub(lambda match: f'url({fonts[match.group(2)]})', body.decode('utf-8')).encode('utf-8')
+        save(name, body)
+
+def parse_byte_range(header, size):
+    """Phân tích header Range một khoảng: (start, end), None nếu không đáp ứng được,
+    False nếu nên bỏ qua header (sai cú pháp hoặc nhiều khoảng) và gửi toàn bộ file"""
+    if not header.startswith('bytes='):
+        return False
+    spec = header[6:].strip()
+    if ',' in spec:
+        return False
+    first, sep, last = spec.partition('-')
+    if not sep:
+        return False
+    try:
+        if first == '':
+            suffix = int(last)
+            if suffix <= 0:
+                return None
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if last and end < start:
+                return False
+            if start >= size:
+                return None
+            end = min(end, size - 1)
+    except ValueError:
+        return False
+    return start, end
+
+INDEX_HTML = """
+<!DOCTYPE html>
+<html lang="vi">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Hệ thống Quản lý Tuyển sinh Đại học</title>
+    <link href="/static/fontawesome.min.css" rel="stylesheet">
+    <link href="/static/app.css" rel="stylesheet">
+</head>
+<body data-chart-src="/static/chart.umd.js">
+    <!-- Login Page -->
+    <div class="login-container" id="loginPage">
+        <div class="login-header">
+            <h1><i class="fas fa-graduation-cap"></i> Hệ thống Tuyển sinh</h1>
+            <p>Đăng nhập để tiếp tục</p>
+        </div>
+        
+        <form id="loginForm">
+            <div class="form-group">
+                <label for="username"><i class="fas fa-user"></i> Tên đăng nhập</label>
+                <input type="text" id="username" name="username" placeholder="Nhập tên đăng nhập" required>
+            </div>
             
-            try {
-                const result = await apiCall('/candidate/aspirations/remove', {
-                    method: 'POST',
-                    body: JSON.stringify({ aspiration_id: aspirationId })
-                });
-                
-                if (result.success) {
-                    showAlert('Xóa nguyện vọng thành công!', 'success');
-                    await loadAspiration();
-                } else {
-                    showAlert(result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Xóa nguyện vọng thất bại', 'error');
-            } finally {
-                hideLoading();
-            }
-        }
-
-        // ==================== PAYMENT FUNCTIONS ====================
-        async function showPaymentModal(aspirationId) {
-            selectedAspirationForPayment = aspirationId;
+            <div class="form-group">
+                <label for="password"><i class="fas fa-lock"></i> Mật khẩu</label>
+                <input type="password" id="password" name="password" placeholder="Nhập mật khẩu" required>
+            </div>
             
-            try {
-                const configResult = await apiCall('/payment/config');
-                const paymentConfig = configResult.data;
-                
-                document.getElementById('paymentContent').innerHTML = `
-                    <div class="alert alert-info">
-                        <i class="fas fa-info-circle"></i>
-                        Phí đăng ký: ${formatCurrency(paymentConfig.aspiration_fee)}
-                    </div>
-                    
-                    <div class="form-group">
-                        <label>Chọn phương thức thanh toán</label>
-                        <div class="payment-methods">
-                            ${paymentConfig.payment_methods.map(method => `
-                                <div class="payment-method" onclick="selectPaymentMethod('${method.value}')">
-                                    <div class="payment-icon">
-                                        <i class="fas fa-${method.value === 'bank_transfer' ? 'university' : method.value === 'momo' ? 'mobile-alt' : method.value === 'zalopay' ? 'qrcode' : 'credit-card'}"></i>
-                                    </div>
-                                    <div>${method.label}</div>
-                                </div>
-                            `).join('')}
-                        </div>
-                    </div>
-                    
-                    ${selectedPaymentMethod === 'bank_transfer' ? `
-                        <div class="bank-info">
-                            <h4>Thông tin chuyển khoản:</h4>
-                            <p><strong>Ngân hàng:</strong> ${paymentConfig.bank_info.bank_name}</p>
-                            <p><strong>Số tài khoản:</strong> ${paymentConfig.bank_info.account_number}</p>
-                            <p><strong>Chủ tài khoản:</strong> ${paymentConfig.bank_info.account_holder}</p>
-                            <p><strong>Chi nhánh:</strong> ${paymentConfig.bank_info.branch}</p>
-                            <p><strong>Nội dung:</strong> Thanh toán nguyện vọng ${aspirationId}</p>
-                        </div>
-                    ` : ''}
-                    
-                    <div class="form-actions">
-                        <button type="button" class="btn btn-secondary" onclick="closeModal('paymentModal')">Hủy</button>
-                        <button type="button" class="btn btn-primary" onclick="processPayment()" ${!selectedPaymentMethod ? 'disabled' : ''}>
-                            <i class="fas fa-credit-card"></i> Xác nhận thanh toán
-                        </button>
-                    </div>
-                `;
-                
-                showModal('paymentModal');
-            } catch (error) {
-                showAlert('Lỗi khi tải thông tin thanh toán', 'error');
-            }
-        }
+            <button type="submit" class="btn btn-primary btn-block">
+                <i class="fas fa-sign-in-alt"></i> Đăng nhập
+            </button>
+        </form>
+        
+        <div class="login-footer">
+            <p>Chưa có tài khoản? <a href="#" onclick="showRegisterModal()">Đăng ký ngay</a></p>
+        </div>
+    </div>
 
-        function selectPaymentMethod(method) {
-            selectedPaymentMethod = method;
-            
-            // Update UI
-            document.querySelectorAll('.payment-method').forEach(el => {
-                el.classList.remove('selected');
-            });
-            event.target.closest('.payment-method').classList.add('selected');
-            
-            // Enable confirm button
-            document.querySelector('#paymentModal .btn-primary').disabled = false;
-            
-            // Refresh bank info if needed
-            if (method === 'bank_transfer') {
-                showPaymentModal(selectedAspirationForPayment);
-            }
-        }
+    <!-- Main System -->
+    <div class="system-container" id="systemContainer">
+        <div class="container">
+            <!-- Sidebar -->
+            <div class="sidebar">
+                <div class="sidebar-header">
+                    <h2><i class="fas fa-graduation-cap"></i> Hệ thống Tuyển sinh</h2>
+                    <p id="userRoleDisplay">Thí sinh</p>
+                </div>
+                <ul class="sidebar-menu" id="sidebarMenu">
+                    <!-- Menu will be loaded dynamically -->
+                </ul>
+            </div>
 
-        async function processPayment() {
-            if (!selectedPaymentMethod || !selectedAspirationForPayment) {
-                showAlert('Vui lòng chọn phương thức thanh toán', 'error');
-                return;
-            }
-            
-            showLoading();
-            
-            try {
-                const result = await apiCall('/payment/create', {
-                    method: 'POST',
-                    body: JSON.stringify({
-                        aspiration_id: selectedAspirationForPayment,
-                        payment_method: selectedPaymentMethod
-                    })
-                });
-                
-                if (result.success) {
-                    showAlert('Tạo giao dịch thành công!', 'success');
-                    closeModal('paymentModal');
-                    
-                    if (selectedPaymentMethod === 'bank_transfer') {
-                        showAlert('Vui lòng chuyển khoản theo thông tin đã cung cấp', 'info');
-                    } else {
-                        // Simulate payment verification for demo
-                        setTimeout(async () => {
-                            await apiCall('/payment/verify', {
-                                method: 'POST',
-                                body: JSON.stringify({
-                                    transaction_id: result.data.transaction_id
-                                })
-                            });
-                            showAlert('Thanh toán thành công!', 'success');
-                            await loadPayment();
-                        }, 2000);
-                    }
-                    
-                    await loadPayment();
-                } else {
-                    showAlert(result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Tạo giao dịch thất bại', 'error');
-            } finally {
-                hideLoading();
-            }
-        }
+            <!-- Main Content -->
+            <div class="main-content">
+                <!-- Header -->
+                <div class="header">
+                    <h1 id="section-title"><i class="fas fa-tachometer-alt"></i> Tổng quan hệ thống</h1>
+                    <div class="user-info">
+                        <span id="userFullname">Nguyễn Văn A</span>
+                        <div class="user-avatar">
+                            <i class="fas fa-user-graduate"></i>
+                        </div>
+                    </div>
+                </div>
 
-        // ==================== MANAGER FUNCTIONS ====================
-        async function showApprovalModal(aspirationId, action) {
-            selectedAspirationForApproval = aspirationId;
-            const aspiration = pendingAspirations.find(asp => asp.id === aspirationId);
-            
-            document.getElementById('approvalModalTitle').innerHTML = `
-                <i class="fas fa-${action === 'approve' ? 'check-circle' : 'times-circle'}"></i>
-                ${action === 'approve' ? 'Duyệt' : 'Từ chối'} Nguyện vọng
-            `;
-            
-            document.getElementById('approvalContent').innerHTML = `
-                <div class="alert alert-${action === 'approve' ? 'info' : 'warning'}">
-                    <i class="fas fa-${action === 'approve' ? 'info-circle' : 'exclamation-triangle'}"></i>
-                    Bạn đang ${action === 'approve' ? 'duyệt' : 'từ chối'} nguyện vọng của thí sinh <strong>${aspiration.candidate_name}</strong>
+                <!-- Content Sections -->
+                <div id="dashboard" class="content-section active">
+                    <!-- Dashboard content -->
                 </div>
-                
-                <div class="form-group">
-                    <label>Thí sinh: ${aspiration.candidate_name}</label>
+
+                <div id="profile" class="content-section">
+                    <!-- Profile content -->
                 </div>
-                
-                <div class="form-group">
-                    <label>CCCD: ${aspiration.citizen_id}</label>
+
+                <div id="aspiration" class="content-section">
+                    <!-- Aspiration content -->
                 </div>
-                
-                <div class="form-group">
-                    <label>Trường: ${aspiration.university_name}</label>
+
+                <div id="payment" class="content-section">
+                    <!-- Payment content -->
                 </div>
-                
-                <div class="form-group">
-                    <label>Ngành: ${aspiration.major_name}</label>
+
+                <div id="documents" class="content-section">
+                    <!-- Documents content -->
                 </div>
-                
-                <div class="form-group">
-                    <label>Ưu tiên: ${aspiration.priority}</label>
+
+                <div id="print" class="content-section">
+                    <!-- Print content -->
                 </div>
-                
-                <div class="form-group">
-                    <label>Ghi chú:</label>
-                    <textarea id="approvalNotes" rows="3" placeholder="${action === 'approve' ? 'Ghi chú cho thí sinh (nếu có)' : 'Lý do từ chối'}"></textarea>
+
+                <div id="manager-aspiration" class="content-section">
+                    <!-- Manager aspiration content -->
                 </div>
-                
-                <div class="form-actions">
-                    <button type="button" class="btn btn-secondary" onclick="closeModal('approvalModal')">Hủy</button>
-                    <button type="button" class="btn btn-${action === 'approve' ? 'success' : 'danger'}" onclick="${action === 'approve' ? 'approveAspiration' : 'rejectAspiration'}()">
-                        <i class="fas fa-${action === 'approve' ? 'check' : 'times'}"></i>
-                        ${action === 'approve' ? 'Duyệt' : 'Từ chối'}
-                    </button>
+
+                <div id="manager-stats" class="content-section">
+                    <!-- Manager stats content -->
                 </div>
-            `;
-            
-            showModal('approvalModal');
-        }
 
-        async function approveAspiration() {
-            const notes = document.getElementById('approvalNotes').value;
-            
-            showLoading();
-            
-            try {
-                const result = await apiCall('/manager/aspiration/approve', {
-                    method: 'POST',
-                    body: JSON.stringify({
-                        aspiration_id: selectedAspirationForApproval,
-                        notes: notes
-                    })
-                });
-                
-                if (result.success) {
-                    showAlert('Duyệt nguyện vọng thành công!', 'success');
-                    closeModal('approvalModal');
-                    await loadManagerAspiration();
-                    await loadDashboard();
-                } else {
-                    showAlert(result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Duyệt nguyện vọng thất bại', 'error');
-            } finally {
-                hideLoading();
-            }
-        }
+                <div id="results" class="content-section">
+                    <!-- Results content -->
+                </div>
+            </div>
+        </div>
+    </div>
 
-        async function rejectAspiration() {
-            const reason = document.getElementById('approvalNotes').value;
-            
-            if (!reason) {
-                showAlert('Vui lòng nhập lý do từ chối', 'error');
-                return;
-            }
-            
-            showLoading();
-            
-            try {
-                const result = await apiCall('/manager/aspiration/reject', {
-                    method: 'POST',
-                    body: JSON.stringify({
-                        aspiration_id: selectedAspirationForApproval,
-                        reason: reason
-                    })
-                });
-                
-                if (result.success) {
-                    showAlert('Từ chối nguyện vọng thành công!', 'success');
-                    closeModal('approvalModal');
-                    await loadManagerAspiration();
-                    await loadDashboard();
-                } else {
-                    showAlert(result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Từ chối nguyện vọng thất bại', 'error');
-            } finally {
-                hideLoading();
-            }
-        }
+    <!-- Register Modal -->
+    <div id="registerModal" class="modal">
+        <div class="modal-content">
+            <div class="modal-header">
+                <h3><i class="fas fa-user-plus"></i> Đăng ký tài khoản thí sinh</h3>
+                <span class="close" onclick="closeModal('registerModal')">&times;</span>
+            </div>
+            <div class="modal-body">
+                <form id="registerForm">
+                    <div class="form-group">
+                        <label for="regUsername">Tên đăng nhập *</label>
+                        <input type="text" id="regUsername" name="username" required>
+                    </div>
+                    <div class="form-group">
+                        <label for="regPassword">Mật khẩu *</label>
+                        <input type="password" id="regPassword" name="password" required>
+                    </div>
+                    <div class="form-group">
+                        <label for="regEmail">Email *</label>
+                        <input type="email" id="regEmail" name="email" required>
+                    </div>
+                    <div class="form-group">
+                        <label for="regFullname">Họ và tên *</label>
+                        <input type="text" id="regFullname" name="full_name" required>
+                    </div>
+                    <div class="form-group">
+                        <label for="regCitizenId">Số CCCD *</label>
+                        <input type="text" id="regCitizenId" name="citizen_id" required>
+                    </div>
+                    <div class="form-actions">
+                        <button type="button" class="btn btn-secondary" onclick="closeModal('registerModal')">Hủy</button>
+                        <button type="submit" class="btn btn-primary">Đăng ký</button>
+                    </div>
+                </form>
+            </div>
+        </div>
+    </div>
 
-        // ==================== PRINT FUNCTIONS ====================
-        async function generatePrintData() {
-            try {
-                const result = await apiCall('/print/aspirations');
-                
-                if (result.success) {
-                    const data = result.data;
-                    
-                    document.getElementById('printContent').innerHTML = `
-                        <div class="print-container">
-                            <div class="print-header">
-                                <h1>ĐẠI HỌC QUỐC GIA HÀ NỘI</h1>
-                                <h2>DANH SÁCH NGUYỆN VỌNG ĐĂNG KÝ XÉT TUYỂN</h2>
-                                <p>Kỳ thi tuyển sinh đại học năm 2025</p>
-                            </div>
-                            
-                            <div class="candidate-info">
-                                <h3>THÔNG TIN THÍ SINH</h3>
-                                <table class="print-table">
-                                    <tr>
-                                        <td><strong>Họ và tên:</strong></td>
-                                        <td>${data.candidate.full_name}</td>
-                                        <td><strong>Số CCCD:</strong></td>
-                                        <td>${data.candidate.citizen_id}</td>
-                                    </tr>
-                                    <tr>
-                                        <td><strong>Ngày sinh:</strong></td>
-                                        <td>${data.candidate.date_of_birth}</td>
-                                        <td><strong>Giới tính:</strong></td>
-                                        <td>${data.candidate.gender === 'male' ? 'Nam' : 'Nữ'}</td>
-                                    </tr>
-                                    <tr>
-                                        <td><strong>Địa chỉ:</strong></td>
-                                        <td colspan="3">${data.candidate.address}</td>
-                                    </tr>
-                                    <tr>
-                                        <td><strong>Trường THPT:</strong></td>
-                                        <td>${data.candidate.high_school}</td>
-                                        <td><strong>Năm tốt nghiệp:</strong></td>
-                                        <td>${data.candidate.graduation_year}</td>
-                                    </tr>
-                                </table>
-                            </div>
-                            
-                            <div class="aspirations-list">
-                                <h3>DANH SÁCH NGUYỆN VỌNG</h3>
-                                <table class="print-table">
-                                    <thead>
-                                        <tr>
-                                            <th>STT</th>
-                                            <th>Mã trường</th>
-                                            <th>Tên trường</th>
-                                            <th>Mã ngành</th>
-                                            <th>Tên ngành</th>
-                                            <th>Khối thi</th>
-                                            <th>Trạng thái</th>
-                                        </tr>
-                                    </thead>
-                                    <tbody>
-                                        ${data.aspirations.map(asp => `
-                                            <tr>
-                                                <td>${asp.priority}</td>
-                                                <td>${asp.university_code}</td>
-                                                <td>${asp.university_name}</td>
-                                                <td>${asp.major_code}</td>
-                                                <td>${asp.major_name}</td>
-                                                <td>${asp.subject_group}</td>
-                                                <td>${getStatusText(asp.status)}</td>
-                                            </tr>
-                                        `).join('')}
-                                    </tbody>
-                                </table>
-                            </div>
-                            
-                            <div class="print-footer">
-                                <p>Ngày in: ${data.print_date}</p>
-                                <div class="signature-section">
-                                    <div class="signature-box">
-                                        <p>Thí sinh</p>
-                                        <div class="signature-line"></div>
-                                        <p><em>(Ký và ghi rõ họ tên)</em></p>
-                                    </div>
-                                    <div class="signature-box">
-                                        <p>Cán bộ tiếp nhận</p>
-                                        <div class="signature-line"></div>
-                                        <p><em>(Ký, ghi rõ họ tên và đóng dấu)</em></p>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    `;
-                    
-                    showModal('printModal');
-                } else {
-                    showAlert('Lỗi khi tạo dữ liệu in', 'error');
-                }
-            } catch (error) {
-                showAlert('Lỗi khi tạo dữ liệu in', 'error');
-            }
-        }
+    <!-- Payment Modal -->
+    <div id="paymentModal" class="modal">
+        <div class="modal-content">
+            <div class="modal-header">
+                <h3><i class="fas fa-credit-card"></i> Thanh toán nguyện vọng</h3>
+                <span class="close" onclick="closeModal('paymentModal')">&times;</span>
+            </div>
+            <div class="modal-body">
+                <div id="paymentContent">
+                    <!-- Payment content -->
+                </div>
+            </div>
+        </div>
+    </div>
 
-        async function exportToCSV() {
-            try {
-                const result = await apiCall('/print/aspirations/csv');
-                
-                if (result.success) {
-                    // Create and download CSV file
-                    const blob = new Blob([result.data], { type: 'text/csv;charset=utf-8;' });
-                    const link = document.createElement('a');
-                    const url = URL.createObjectURL(blob);
-                    
-                    link.setAttribute('href', url);
-                    link.setAttribute('download', 'danh_sach_nguyen_vong.csv');
-                    link.style.visibility = 'hidden';
-                    
-                    document.body.appendChild(link);
-                    link.click();
-                    document.body.removeChild(link);
-                    
-                    showAlert('Xuất file CSV thành công!', 'success');
-                } else {
-                    showAlert('Lỗi khi xuất file CSV', 'error');
-                }
-            } catch (error) {
-                showAlert('Lỗi khi xuất file CSV', 'error');
-            }
-        }
+    <!-- Approval Modal -->
+    <div id="approvalModal" class="modal">
+        <div class="modal-content">
+            <div class="modal-header">
+                <h3 id="approvalModalTitle"><i class="fas fa-check-circle"></i> Duyệt nguyện vọng</h3>
+                <span class="close" onclick="closeModal('approvalModal')">&times;</span>
+            </div>
+            <div class="modal-body">
+                <div id="approvalContent">
+                    <!-- Approval content -->
+                </div>
+            </div>
+        </div>
+    </div>
 
-        // ==================== INITIALIZATION ====================
-        document.addEventListener('DOMContentLoaded', function() {
-            const token = localStorage.getItem('token');
-            if (token) {
-                // In a real application, you would verify the token with the server
-                // For now, we'll just show the login page
-                document.getElementById('loginPage').style.display = 'block';
-            } else {
-                document.getElementById('loginPage').style.display = 'block';
-            }
-        });
+    <!-- Print Modal -->
+    <div id="printModal" class="modal">
+        <div class="modal-content" style="max-width: 800px;">
+            <div class="modal-header">
+                <h3><i class="fas fa-print"></i> In danh sách nguyện vọng</h3>
+                <span class="close" onclick="closeModal('printModal')">&times;</span>
+            </div>
+            <div class="modal-body">
+                <div id="printContent">
+                    <!-- Print content -->
+                </div>
+                <div class="form-actions no-print">
+                    <button class="btn btn-secondary" onclick="closeModal('printModal')">Đóng</button>
+                    <button class="btn btn-primary" onclick="window.print()">
+                        <i class="fas fa-print"></i> In
+                    </button>
+                    <button class="btn btn-success" onclick="exportToCSV()">
+                        <i class="fas fa-file-csv"></i> Xuất CSV
+                    </button>
+                </div>
+            </div>
+        </div>
+    </div>
 
-    </script>
+    <!-- Loading Spinner -->
+    <div id="loading" class="loading">
+        <div class="spinner"></div>
+    </div>
+
+    <script src="/static/app.js"></script>
 </body>
 </html>
 """
+
+static_assets = None
+index_page = None
+frontend_lock = threading.Lock()
+
+def load_frontend_assets():
+    """Quét static/ và nén sẵn trang chính một lần; trả về (static_assets, index_page).
+    
+    Không làm ở mức module: process con của PasswordHasher import lại module
+    nhưng không phục vụ giao diện.
+    """
+    global static_assets, index_page
+    if index_page is None:
+        with frontend_lock:
+            if index_page is None:
+                static_assets = StaticAssets(config.get('static_dir'))
+                # HTML được nén sẵn thay vì encode lại mỗi request; luôn hỏi lại bằng
+                # ETag để trình duyệt thấy ngay URL asset mới sau khi triển khai
+                index_page = PrecompressedAsset(static_assets.rewrite(INDEX_HTML).encode('utf-8'),
+                                                'text/html; charset=utf-8', config.get('html_cache_control'))
+    return static_assets, index_page
+
+# ==================== ROUTER ====================
+
+class Route:
+    """Một endpoint: method + path template, kèm metadata cho middleware"""
+    
+    # Bộ chuyển kiểu cho tham số path/query, vd. /api/universities/{university_id:int}/majors
+    CONVERTERS = {'int': int, 'str': str}
+    
+    def __init__(self, method, template, handler_name, auth=None, cache_control=None, query=None):
+        self.method = method
+        self.template = template
+        self.handler_name = handler_name
+        # None: công khai, 'user': cần đăng nhập, tuple: chỉ các role trong tuple
+        self.auth = auth
+        # Header Cache-Control của phản hồi; route có policy được gắn ETag và trả 304 khi khớp
+        self.cache_control = cache_control
+        # Tên tham số query -> kiểu, vd. {'category': str}
+        self.query = query or {}
+        self.segments = []
+        for segment in template.strip('/').split('/'):
+            if segment.startswith('{') and segment.endswith('}'):
+                name, _, type_name = segment[1:-1].partition(':')
+                self.segments.append((name, self.CONVERTERS[type_name or 'str']))
+            else:
+                self.segments.append(segment)
+        self.is_static = all(isinstance(segment, str) for segment in self.segments)
+    
+    def parse_query(self, query_string):
+        """Lấy các tham số query đã khai báo, chuyển đúng kiểu"""
+        values = {}
+        if not self.query or not query_string:
+            return values
+        for name, raw_values in urllib.parse.parse_qs(query_string).items():
+            convert = self.query.get(name)
+            if convert is None:
+                continue
+            try:
+                values[name] = convert(raw_values[-1])
+            except ValueError:
+                raise ValueError(f'Invalid query parameter: {name}')
+        return values
+
+class RouteNode:
+    __slots__ = ('children', 'param', 'routes')
+    
+    def __init__(self):
+        self.children = {}
+        # (tên tham số, hàm chuyển kiểu, node con) cho segment động
+        self.param = None
+        # method -> Route
+        self.routes = {}
+
+class Router:
+    """Dispatch theo method + path: path tĩnh tra dict O(1), path có tham số đi theo trie"""
+    
+    def __init__(self, routes=()):
+        self.static = {}
+        self.root = RouteNode()
+        for route in routes:
+            self.add(route)
+    
+    def add(self, route):
+        if route.is_static:
+            self.static.setdefault('/' + '/'.join(route.segments), {})[route.method] = route
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(html_content.encode('utf-8'))
-
-    def handle_api_get(self):
-        """Xử lý API GET requests"""
-        if self.path == '/api/universities':
-            self.get_universities()
-        elif self.path.startswith('/api/universities/') and '/majors' in self.path:
-            parts = self.path.split('/')
-            university_id = parts[3]
-            self.get_majors(university_id)
-        elif self.path == '/api/exams/active':
-            self.get_active_exam()
-        elif self.path == '/api/candidate/profile':
-            self.get_candidate_profile()
-        elif self.path == '/api/candidate/aspirations':
-            self.get_candidate_aspirations()
-        elif self.path == '/api/candidate/results':
-            self.get_candidate_results()
-        elif self.path == '/api/candidate/stats':
-            self.get_candidate_stats()
-        elif self.path == '/api/documents':
-            self.get_documents()
-        elif self.path == '/api/payment/config':
-            self.get_payment_config()
-        elif self.path == '/api/payment/history':
-            self.get_payment_history()
-        elif self.path == '/api/manager/pending-aspirations':
-            self.get_pending_aspirations()
-        elif self.path == '/api/manager/stats':
-            self.get_manager_stats()
-        elif self.path == '/api/admin/stats':
-            self.get_admin_stats()
-        elif self.path == '/api/print/aspirations':
-            self.print_aspirations()
-        elif self.path == '/api/print/aspirations/csv':
-            self.export_aspirations_csv()
-        else:
-            self.send_error(404, "API endpoint not found")
+        node = self.root
+        for segment in route.segments:
+            if isinstance(segment, str):
+                node = node.children.setdefault(segment, RouteNode())
+            else:
+                name, convert = segment
+                if node.param is None:
+                    node.param = (name, convert, RouteNode())
+                elif node.param[:2] != (name, convert):
+                    raise ValueError(f'Conflicting path parameter in {route.template}')
+                node = node.param[2]
+        node.routes[route.method] = route
     
-    def handle_api_post(self):
-        """Xử lý API POST requests"""
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
+    def match(self, method, path):
+        """Trả về (route, tham số path, các method hợp lệ cho path)"""
+        params = {}
+        routes = self.static.get(path)
+        if routes is None:
+            node = self.root
+            for segment in path.strip('/').split('/'):
+                child = node.children.get(segment)
+                if child is None:
+                    if node.param is None:
+                        return None, params, ()
+                    name, convert, child = node.param
+                    try:
+                        params[name] = convert(segment)
+                    except ValueError:
+                        return None, params, ()
+                node = child
+            routes = node.routes
+        return routes.get(method), params, tuple(routes)
+
+MANAGER_ROLES = ('manager', 'admin')
+
+# Danh mục chỉ đổi vài lần mỗi mùa tuyển sinh; sau max-age trình duyệt hỏi lại bằng If-None-Match
+CATALOG_CACHE_CONTROL = 'public, max-age=60'
+
+router = Router([
+    Route('GET', '/', 'serve_embedded_html'),
+    Route('GET', '/static/{name}', 'serve_static'),
+    Route('GET', '/api/universities', 'get_universities', cache_control=CATALOG_CACHE_CONTROL),
+    Route('GET', '/api/universities/{university_id:int}/majors', 'get_majors', cache_control=CATALOG_CACHE_CONTROL),
+    Route('GET', '/api/exams/active', 'get_active_exam', cache_control=CATALOG_CACHE_CONTROL),
+    Route('GET', '/api/candidate/profile', 'get_candidate_profile', auth='user'),
+    Route('GET', '/api/candidate/aspirations', 'get_candidate_aspirations', auth='user'),
+    Route('GET', '/api/candidate/results', 'get_candidate_results', auth='user'),
+    Route('GET', '/api/candidate/stats', 'get_candidate_stats', auth='user'),
+    Route('GET', '/api/documents', 'get_documents', cache_control='public, max-age=300', query={'category': str}),
+    Route('GET', '/api/payment/config', 'get_payment_config', cache_control='public, max-age=3600'),
+    Route('GET', '/api/payment/history', 'get_payment_history', auth='user'),
+    Route('GET', '/api/manager/pending-aspirations', 'get_pending_aspirations', auth=MANAGER_ROLES,
+          query={'cursor': decode_page_cursor, 'limit': int, **PENDING_FILTERS}),
+    Route('GET', '/api/manager/stats', 'get_manager_stats', auth=('manager',)),
+    Route('GET', '/api/manager/stats/breakdown', 'get_stats_breakdown', auth=MANAGER_ROLES,
+          query={'group_by': parse_stats_group, 'university_id': int, 'subject_group': str}),
+    Route('GET', '/api/admin/stats', 'get_admin_stats', auth=('admin',)),
+    Route('GET', '/api/events', 'stream_events', auth='user'),
+    Route('GET', '/api/print/aspirations', 'print_aspirations', auth='user'),
+    Route('GET', '/api/print/aspirations/csv', 'export_aspirations_csv', auth='user'),
+    Route('POST', '/api/auth/login', 'login'),
+    Route('POST', '/api/auth/register', 'register'),
+    Route('POST', '/api/auth/logout', 'logout', auth='user'),
+    Route('POST', '/api/candidate/profile/update', 'update_candidate_profile', auth='user'),
+    Route('POST', '/api/candidate/aspirations/add', 'add_aspiration', auth='user'),
+    Route('POST', '/api/candidate/aspirations/remove', 'remove_aspiration', auth='user'),
+    Route('POST', '/api/candidate/aspirations/reorder', 'reorder_aspirations', auth='user'),
+    Route('POST', '/api/payment/create', 'create_payment', auth='user'),
+    Route('POST', '/api/payment/verify', 'verify_payment', auth='user'),
+    Route('POST', '/api/manager/aspiration/approve', 'approve_aspiration', auth=MANAGER_ROLES),
+    Route('POST', '/api/manager/aspiration/reject', 'reject_aspiration', auth=MANAGER_ROLES),
+    Route('POST', '/api/manager/aspirations/bulk-approve', 'bulk_approve_aspirations', auth=MANAGER_ROLES),
+    Route('POST', '/api/manager/aspirations/bulk-reject', 'bulk_reject_aspirations', auth=MANAGER_ROLES),
+])
+
+class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests_served = 0
+    route = None
+    body_pending = False
+    keep_open = False
+    
+    def handle(self):
+        """Phục vụ các request đã đến trên kết nối; kết nối rảnh được trả lại cho server"""
+        self.close_connection = True
+        served_before = getattr(self.server, 'requests_served_on', None)
+        self.requests_served = (served_before(self.connection) if served_before else 0) + 1
+        self.handle_one_request()
         
+        while not self.close_connection:
+            if not self.next_request_ready():
+                # Không giữ luồng worker để chờ: server theo dõi socket rảnh bằng selector
+                self.keep_open = True
+                return
+            self.requests_served += 1
+            self.handle_one_request()
+    
+    def next_request_ready(self):
+        """Request kế tiếp (pipelining) đã có trong bộ đệm hoặc socket chưa, không chờ"""
+        timeout = self.connection.gettimeout()
+        self.connection.settimeout(0)
         try:
-            data = json.loads(post_data.decode('utf-8'))
-        except:
-            self.send_json_response({'success': False, 'error': 'Invalid JSON'}, 400)
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(timeout)
+    
+    def keep_alive_allowed(self):
+        if self.requests_served >= config.get('keepalive_max_requests'):
+            return False
+        # Server đơn luồng không có keep_alive_allowed: giữ kết nối sẽ chặn mọi client khác
+        server_allows = getattr(self.server, 'keep_alive_allowed', None)
+        return server_allows is not None and server_allows()
+    
+    def parse_request(self):
+        self.body_pending = False
+        if not super().parse_request():
+            return False
+        # Body chưa đọc hết: nếu giữ kết nối, phần còn lại bị hiểu thành request kế tiếp
+        content_length = self.headers.get('Content-Length', '').strip()
+        self.body_pending = 'Transfer-Encoding' in self.headers or content_length not in ('', '0')
+        return True
+    
+    def end_headers(self):
+        if not self.close_connection and (self.body_pending or not self.keep_alive_allowed()):
+            self.send_header('Connection', 'close')
+        super().end_headers()
+    
+    def do_GET(self):
+        self.dispatch('GET')
+    
+    def do_POST(self):
+        self.dispatch('POST')
+    
+    def dispatch(self, method):
+        """Tìm route theo router rồi gọi handler với tham số path/query đã chuyển kiểu"""
+        url = urllib.parse.urlsplit(self.path)
+        route, params, allowed = router.match(method, url.path)
+        # Handler được dùng lại cho các request keep-alive: không giữ route của request trước
+        self.route = None
+        
+        if route is None:
+            if allowed:
+                self.send_response(405)
+                self.send_header('Allow', ', '.join(allowed + ('OPTIONS',)))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            elif url.path.startswith('/api/'):
+                self.send_error(404, "API endpoint not found")
+            else:
+                self.send_error(404, "File not found")
             return
         
-        if self.path == '/api/auth/login':
-            self.login(data)
-        elif self.path == '/api/auth/register':
-            self.register(data)
-        elif self.path == '/api/candidate/profile/update':
-            self.update_candidate_profile(data)
-        elif self.path == '/api/candidate/aspirations/add':
-            self.add_aspiration(data)
-        elif self.path == '/api/candidate/aspirations/remove':
-            self.remove_aspiration(data)
-        elif self.path == '/api/candidate/aspirations/reorder':
-            self.reorder_aspirations(data)
-        elif self.path == '/api/payment/create':
-            self.create_payment(data)
-        elif self.path == '/api/payment/verify':
-            self.verify_payment(data)
-        elif self.path == '/api/manager/aspiration/approve':
-            self.approve_aspiration(data)
-        elif self.path == '/api/manager/aspiration/reject':
-            self.reject_aspiration(data)
+        try:
+            params.update(route.parse_query(url.query))
+        except ValueError as e:
+            self.send_json_response({'success': False, 'error': str(e)}, 400)
+            return
+        
+        self.route = route
+        if route.auth is not None:
+            user = self.authenticate(route)
+            if user is None:
+                return
+            params['user'] = user
+        
+        handler = getattr(self, route.handler_name)
+        if method == 'POST':
+            data = self.read_json_body()
+            if data is None:
+                return
+            handler(data, **params)
         else:
-            self.send_error(404, "API endpoint not found")
-    
-    # ==================== API METHODS ====================
+            handler(**params)
     
-    def get_candidate_stats(self):
-        """Lấy thống kê cho thí sinh"""
+    def serve_embedded_html(self):
+        """Serve the embedded HTML content"""
+        self.send_asset(load_frontend_assets()[1])
+
+    def authenticate(self, route):
+        """Middleware xác thực: kiểm tra token và quyền theo metadata của route"""
         token = self.headers.get('Authorization')
         if not token:
             self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
+            return None
         
-        user_info = verify_token(token)
-        if not user_info:
+        session = verify_token(token)
+        if not session:
             self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
+            return None
         
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
+        if isinstance(route.auth, tuple) and session.role not in route.auth:
+            self.send_json_response({'success': False, 'error': 'Permission denied'}, 403)
+            return None
         
-        # Get candidate ID
-        cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-        candidate = cursor.fetchone()
+        return RequestUser(token, session.user_id, session.username, session.role, session.candidate_id)
+    
+    def send_rate_limited(self, retry_after):
+        self.send_json_response({'success': False, 'error': 'Too many attempts'}, 429,
+                                {'Retry-After': str(max(1, round(retry_after)))})
+    
+    def read_json_body(self):
+        """Đọc body JSON của request POST; trả lỗi 400/413 và None nếu không hợp lệ"""
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self.send_json_response({'success': False, 'error': 'Invalid Content-Length'}, 400)
+            return None
+        # Không đọc body quá lớn vào bộ nhớ; body_pending vẫn bật nên kết nối bị đóng sau phản hồi
+        if content_length < 0 or content_length > config.get('max_request_body'):
+            self.send_json_response({'success': False, 'error': 'Request body too large'}, 413)
+            return None
+        post_data = self.rfile.read(content_length)
+        self.body_pending = 'Transfer-Encoding' in self.headers
         
-        if not candidate:
+        try:
+            return json.loads(post_data.decode('utf-8'))
+        except:
+            self.send_json_response({'success': False, 'error': 'Invalid JSON'}, 400)
+            return None
+    
+    # ==================== API METHODS ====================
+    
+    def get_candidate_stats(self, user):
+        """Lấy thống kê cho thí sinh"""
+        candidate_id = user.candidate_id
+        if candidate_id is None:
             self.send_json_response({'success': False, 'error': 'Candidate not found'})
             return
         
-        candidate_id = candidate[0]
-        
-        # Count aspirations by status
-        cursor.execute('SELECT status, COUNT(*) FROM aspirations WHERE candidate_id = ? GROUP BY status', (candidate_id,))
-        status_counts = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        # Count paid aspirations
-        cursor.execute('SELECT COUNT(*) FROM aspirations WHERE candidate_id = ? AND payment_status = "paid"', (candidate_id,))
-        paid_count = cursor.fetchone()[0]
-        
-        conn.close()
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Đếm theo trạng thái và số đã thanh toán trong một lượt trên index covering
+            cursor.execute('''
+                SELECT status, COUNT(*), SUM(payment_status = 'paid')
+                FROM aspirations WHERE candidate_id = ? GROUP BY status
+            ''', (candidate_id,))
+            rows = cursor.fetchall()
+            status_counts = {row[0]: row[1] for row in rows}
+            paid_count = sum(row[2] for row in rows)
         
         self.send_json_response({
             'success': True,
@@ -3626,9 +3109,8 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
             }
         })
     
-    def get_documents(self):
+    def get_documents(self, category=None):
         """Lấy danh sách tài liệu"""
-        category = self.path.split('?category=')[1] if '?category=' in self.path else None
         documents = get_documents(category)
         self.send_json_response({'success': True, 'data': documents})
     
@@ -3652,72 +3134,45 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
         }
         
         self.send_json_response({'success': True, 'data': payment_config})
-    
-    def get_payment_history(self):
-        """Lấy lịch sử thanh toán"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        # Get candidate ID
-        cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-        candidate = cursor.fetchone()
-        
-        if not candidate:
-            self.send_json_response({'success': False, 'error': 'Candidate not found'})
-            return
-        
-        candidate_id = candidate[0]
-        
-        cursor.execute('''
-            SELECT p.id, p.amount, p.payment_method, p.status, p.payment_date, p.created_at,
-                   u.name as university_name, m.name as major_name, a.priority_order
-            FROM payments p
-            JOIN aspirations a ON p.aspiration_id = a.id
-            JOIN universities u ON a.university_id = u.id
-            JOIN majors m ON a.major_id = m.id
-            WHERE p.candidate_id = ?
-            ORDER BY p.created_at DESC
-        ''', (candidate_id,))
-        
-        payments = []
-        for row in cursor.fetchall():
-            payments.append({
-                'id': row[0],
-                'amount': row[1],
-                'payment_method': row[2],
-                'status': row[3],
-                'payment_date': row[4],
-                'created_at': row[5],
-                'university_name': row[6],
-                'major_name': row[7],
-                'priority': row[8]
-            })
+    
+    def get_payment_history(self, user):
+        """Lấy lịch sử thanh toán"""
+        candidate_id = user.candidate_id
+        if candidate_id is None:
+            self.send_json_response({'success': False, 'error': 'Candidate not found'})
+            return
         
-        conn.close()
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT p.id, p.amount, p.payment_method, p.status, p.payment_date, p.created_at,
+                       u.name as university_name, m.name as major_name, a.priority_order
+                FROM payments p
+                JOIN aspirations a ON p.aspiration_id = a.id
+                JOIN universities u ON a.university_id = u.id
+                JOIN majors m ON a.major_id = m.id
+                WHERE p.candidate_id = ?
+                ORDER BY p.created_at DESC
+            ''', (candidate_id,))
+            
+            payments = []
+            for row in cursor.fetchall():
+                payments.append({
+                    'id': row[0],
+                    'amount': row[1],
+                    'payment_method': row[2],
+                    'status': row[3],
+                    'payment_date': row[4],
+                    'created_at': row[5],
+                    'university_name': row[6],
+                    'major_name': row[7],
+                    'priority': row[8]
+                })
         self.send_json_response({'success': True, 'data': payments})
     
-    def create_payment(self, data):
+    def create_payment(self, data, user):
         """Tạo thanh toán"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
         try:
             aspiration_id = data.get('aspiration_id')
             payment_method = data.get('payment_method')
@@ -3727,27 +3182,23 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
                 return
             
             # Get candidate ID
-            conn = sqlite3.connect('university_admission.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-            candidate = cursor.fetchone()
-            
-            if not candidate:
+            candidate_id = user.candidate_id
+            if candidate_id is None:
                 self.send_json_response({'success': False, 'error': 'Candidate not found'})
                 return
             
-            candidate_id = candidate[0]
-            
-            # Get exam ID from aspiration
-            cursor.execute('SELECT exam_id FROM aspirations WHERE id = ? AND candidate_id = ?', (aspiration_id, candidate_id))
-            aspiration = cursor.fetchone()
-            
-            if not aspiration:
-                self.send_json_response({'success': False, 'error': 'Aspiration not found'})
-                return
-            
-            exam_id = aspiration[0]
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get exam ID from aspiration
+                cursor.execute('SELECT exam_id FROM aspirations WHERE id = ? AND candidate_id = ?', (aspiration_id, candidate_id))
+                aspiration = cursor.fetchone()
+                
+                if not aspiration:
+                    self.send_json_response({'success': False, 'error': 'Aspiration not found'})
+                    return
+                
+                exam_id = aspiration[0]
             
             # Create payment
             amount = 50000  # Fixed fee
@@ -3757,8 +3208,6 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_json_response({'success': False, 'error': transaction_id})
                 return
             
-            conn.close()
-            
             self.send_json_response({
                 'success': True, 
                 'data': {
@@ -3771,13 +3220,8 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def verify_payment(self, data):
+    def verify_payment(self, data, user):
         """Xác nhận thanh toán"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
         try:
             transaction_id = data.get('transaction_id')
             
@@ -3792,33 +3236,16 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def get_pending_aspirations(self):
-        """Lấy danh sách nguyện vọng chờ duyệt"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info or user_info['role'] not in ['manager', 'admin']:
-            self.send_json_response({'success': False, 'error': 'Permission denied'}, 403)
-            return
-        
-        pending_aspirations = get_pending_aspirations()
-        self.send_json_response({'success': True, 'data': pending_aspirations})
+    def get_pending_aspirations(self, user, limit=None, **filters):
+        """Lấy một trang nguyện vọng chờ duyệt"""
+        if limit is None:
+            limit = config.get('pending_page_size')
+        limit = max(1, min(limit, config.get('pending_page_max')))
+        pending_aspirations, next_cursor = get_pending_aspirations(limit, **filters)
+        self.send_json_response({'success': True, 'data': pending_aspirations, 'next_cursor': next_cursor})
     
-    def approve_aspiration(self, data):
+    def approve_aspiration(self, data, user):
         """Duyệt nguyện vọng"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info or user_info['role'] not in ['manager', 'admin']:
-            self.send_json_response({'success': False, 'error': 'Permission denied'}, 403)
-            return
-        
         try:
             aspiration_id = data.get('aspiration_id')
             notes = data.get('notes', '')
@@ -3827,25 +3254,15 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_json_response({'success': False, 'error': 'Aspiration ID is required'}, 400)
                 return
             
-            approve_aspiration(aspiration_id, user_info['user_id'], notes)
+            approve_aspiration(aspiration_id, user.user_id, notes)
             
             self.send_json_response({'success': True, 'message': 'Aspiration approved successfully'})
             
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def reject_aspiration(self, data):
+    def reject_aspiration(self, data, user):
         """Từ chối nguyện vọng"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info or user_info['role'] not in ['manager', 'admin']:
-            self.send_json_response({'success': False, 'error': 'Permission denied'}, 403)
-            return
-        
         try:
             aspiration_id = data.get('aspiration_id')
             reason = data.get('reason', '')
@@ -3861,31 +3278,61 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def print_aspirations(self):
-        """In danh sách nguyện vọng"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
+    def bulk_approve_aspirations(self, data, user):
+        """Duyệt nhiều nguyện vọng"""
+        self.decide_aspirations(data, user, 'approved', data.get('notes', ''))
+    
+    def bulk_reject_aspirations(self, data, user):
+        """Từ chối nhiều nguyện vọng"""
+        self.decide_aspirations(data, user, 'rejected', data.get('reason', ''))
+    
+    def decide_aspirations(self, data, user, decision, notes):
+        aspiration_ids = data.get('aspiration_ids')
+        filters = data.get('filter')
         
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
+        if (aspiration_ids is None) == (filters is None):
+            self.send_json_response({'success': False, 'error': 'Either aspiration_ids or filter is required'}, 400)
             return
         
-        # Get candidate ID
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
+        if aspiration_ids is not None:
+            if (not isinstance(aspiration_ids, list)
+                    or not all(type(aspiration_id) is int for aspiration_id in aspiration_ids)):
+                self.send_json_response({'success': False, 'error': 'aspiration_ids must be a list of integers'}, 400)
+                return
+            if len(aspiration_ids) > config.get('bulk_decision_max_ids'):
+                self.send_json_response({'success': False, 'error': 'Too many aspiration_ids'}, 400)
+                return
+        else:
+            if not isinstance(filters, dict) or not filters:
+                self.send_json_response({'success': False, 'error': 'filter must be a non-empty object'}, 400)
+                return
+            try:
+                filters = {name: PENDING_FILTERS[name](value) for name, value in filters.items()}
+            except (KeyError, TypeError, ValueError):
+                self.send_json_response({'success': False, 'error': 'Invalid filter'}, 400)
+                return
         
-        cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-        candidate = cursor.fetchone()
+        limit = config.get('bulk_decision_max_ids')
+        try:
+            results = decide_aspirations(decision, user.user_id, notes, aspiration_ids, filters, limit)
+        except Exception as e:
+            self.send_json_response({'success': False, 'error': str(e)})
+            return
         
-        if not candidate:
+        summary = collections.Counter(item['result'] for item in results)
+        response = {'success': True, 'summary': summary, 'results': results}
+        if filters is not None:
+            # Bộ lọc có thể khớp rất nhiều dòng: mỗi request xử lý tối đa limit, client gọi lại nếu còn
+            response['has_more'] = len(results) >= limit
+        self.send_json_response(response)
+    
+    def print_aspirations(self, user):
+        """In danh sách nguyện vọng"""
+        candidate_id = user.candidate_id
+        if candidate_id is None:
             self.send_json_response({'success': False, 'error': 'Candidate not found'})
             return
         
-        candidate_id = candidate[0]
-        
         # Lấy dữ liệu nguyện vọng để in
         print_data = generate_aspirations_pdf(candidate_id)
         
@@ -3894,31 +3341,13 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
         else:
             self.send_json_response({'success': False, 'error': 'Không tìm thấy dữ liệu nguyện vọng'})
     
-    def export_aspirations_csv(self):
+    def export_aspirations_csv(self, user):
         """Xuất danh sách nguyện vọng ra CSV"""
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
-        # Get candidate ID
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-        candidate = cursor.fetchone()
-        
-        if not candidate:
+        candidate_id = user.candidate_id
+        if candidate_id is None:
             self.send_json_response({'success': False, 'error': 'Candidate not found'})
             return
         
-        candidate_id = candidate[0]
-        
         # Xuất dữ liệu ra CSV
         csv_data = export_aspirations_csv(candidate_id)
         
@@ -3928,315 +3357,204 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
             self.send_json_response({'success': False, 'error': 'Không tìm thấy dữ liệu nguyện vọng'})
     
     def get_universities(self):
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM universities WHERE status = "active" ORDER BY name')
-        universities = []
-        for row in cursor.fetchall():
-            universities.append({
-                'id': row[0],
-                'code': row[1],
-                'name': row[2],
-                'address': row[3],
-                'phone': row[4],
-                'email': row[5],
-                'website': row[6],
-                'description': row[7]
-            })
-        
-        conn.close()
-        self.send_json_response({'success': True, 'data': universities})
+        self.send_json_bytes(catalog_cache.universities_json())
     
     def get_majors(self, university_id):
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM majors 
-            WHERE university_id = ? AND status = "active" 
-            ORDER BY name
-        ''', (university_id,))
-        
-        majors = []
-        for row in cursor.fetchall():
-            majors.append({
-                'id': row[0],
-                'university_id': row[1],
-                'code': row[2],
-                'name': row[3],
-                'description': row[4],
-                'quota': row[5],
-                'subject_group': row[6],
-                'duration': row[7],
-                'tuition_fee': row[8]
-            })
-        
-        conn.close()
-        self.send_json_response({'success': True, 'data': majors})
+        self.send_json_bytes(catalog_cache.majors_json(university_id))
     
     def get_active_exam(self):
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM exams WHERE status = "active" ORDER BY created_at DESC LIMIT 1')
-        exam = cursor.fetchone()
-        conn.close()
-        
-        if exam:
-            exam_data = {
-                'id': exam[0],
-                'code': exam[1],
-                'name': exam[2],
-                'description': exam[3],
-                'registration_start': exam[4],
-                'registration_end': exam[5],
-                'result_announcement': exam[6],
-                'status': exam[7],
-                'max_aspirations': exam[8],
-                'aspiration_fee': exam[9],
-                'created_at': exam[10]
-            }
-            self.send_json_response({'success': True, 'data': exam_data})
+        body = catalog_cache.active_exam_json()
+        if body:
+            self.send_json_bytes(body)
         else:
             self.send_json_response({'success': False, 'error': 'No active exam'})
     
-    def get_candidate_profile(self):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT u.id, u.username, u.email, u.full_name, u.role,
-                   c.citizen_id, c.date_of_birth, c.gender, c.address, 
-                   c.phone, c.high_school, c.graduation_year
-            FROM users u
-            LEFT JOIN candidates c ON u.id = c.user_id
-            WHERE u.id = ?
-        ''', (user_info['user_id'],))
-        
-        user = cursor.fetchone()
-        conn.close()
+    def get_candidate_profile(self, user):
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT u.id, u.username, u.email, u.full_name, u.role,
+                       c.citizen_id, c.date_of_birth, c.gender, c.address, 
+                       c.phone, c.high_school, c.graduation_year
+                FROM users u
+                LEFT JOIN candidates c ON u.id = c.user_id
+                WHERE u.id = ?
+            ''', (user.user_id,))
+            
+            profile = cursor.fetchone()
         
-        if user:
+        if profile:
             self.send_json_response({
                 'success': True,
                 'data': {
-                    'id': user[0],
-                    'username': user[1],
-                    'email': user[2],
-                    'full_name': user[3],
-                    'role': user[4],
-                    'citizen_id': user[5],
-                    'date_of_birth': user[6],
-                    'gender': user[7],
-                    'address': user[8],
-                    'phone': user[9],
-                    'high_school': user[10],
-                    'graduation_year': user[11]
+                    'id': profile[0],
+                    'username': profile[1],
+                    'email': profile[2],
+                    'full_name': profile[3],
+                    'role': profile[4],
+                    'citizen_id': profile[5],
+                    'date_of_birth': profile[6],
+                    'gender': profile[7],
+                    'address': profile[8],
+                    'phone': profile[9],
+                    'high_school': profile[10],
+                    'graduation_year': profile[11]
                 }
             })
         else:
             self.send_json_response({'success': False, 'error': 'User not found'})
     
-    def get_candidate_aspirations(self):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        # Get candidate ID
-        cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-        candidate = cursor.fetchone()
-        
-        if not candidate:
+    def get_candidate_aspirations(self, user):
+        candidate_id = user.candidate_id
+        if candidate_id is None:
             self.send_json_response({'success': True, 'data': []})
             return
         
-        candidate_id = candidate[0]
-        
-        cursor.execute('''
-            SELECT a.id, a.priority_order, a.status, a.registered_at, a.payment_status,
-                   u.name as university_name, m.name as major_name,
-                   u.code as university_code, m.code as major_code
-            FROM aspirations a
-            JOIN universities u ON a.university_id = u.id
-            JOIN majors m ON a.major_id = m.id
-            WHERE a.candidate_id = ?
-            ORDER BY a.priority_order
-        ''', (candidate_id,))
-        
-        aspirations = []
-        for row in cursor.fetchall():
-            aspirations.append({
-                'id': row[0],
-                'priority': row[1],
-                'status': row[2],
-                'registered_at': row[3],
-                'payment_status': row[4],
-                'university_name': row[5],
-                'major_name': row[6],
-                'university_code': row[7],
-                'major_code': row[8]
-            })
-        
-        conn.close()
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT a.id, a.priority_order, a.status, a.registered_at, a.payment_status,
+                       u.name as university_name, m.name as major_name,
+                       u.code as university_code, m.code as major_code
+                FROM aspirations a
+                JOIN universities u ON a.university_id = u.id
+                JOIN majors m ON a.major_id = m.id
+                WHERE a.candidate_id = ?
+                ORDER BY a.priority_order
+            ''', (candidate_id,))
+            
+            aspirations = []
+            for row in cursor.fetchall():
+                aspirations.append({
+                    'id': row[0],
+                    'priority': row[1],
+                    'status': row[2],
+                    'registered_at': row[3],
+                    'payment_status': row[4],
+                    'university_name': row[5],
+                    'major_name': row[6],
+                    'university_code': row[7],
+                    'major_code': row[8]
+                })
         self.send_json_response({'success': True, 'data': aspirations})
     
-    def get_candidate_results(self):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        # Get candidate ID
-        cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-        candidate = cursor.fetchone()
-        
-        if not candidate:
+    def get_candidate_results(self, user):
+        candidate_id = user.candidate_id
+        if candidate_id is None:
             self.send_json_response({'success': True, 'data': []})
             return
         
-        candidate_id = candidate[0]
-        
-        cursor.execute('''
-            SELECT a.id, a.priority_order, a.status,
-                   u.name as university_name, m.name as major_name,
-                   a.registered_at
-            FROM aspirations a
-            JOIN universities u ON a.university_id = u.id
-            JOIN majors m ON a.major_id = m.id
-            WHERE a.candidate_id = ?
-            ORDER BY a.priority_order
-        ''', (candidate_id,))
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row[0],
-                'priority': row[1],
-                'status': row[2],
-                'university_name': row[3],
-                'major_name': row[4],
-                'registered_at': row[5]
-            })
-        
-        conn.close()
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT a.id, a.priority_order, a.status,
+                       u.name as university_name, m.name as major_name,
+                       a.registered_at
+                FROM aspirations a
+                JOIN universities u ON a.university_id = u.id
+                JOIN majors m ON a.major_id = m.id
+                WHERE a.candidate_id = ?
+                ORDER BY a.priority_order
+            ''', (candidate_id,))
+            
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    'id': row[0],
+                    'priority': row[1],
+                    'status': row[2],
+                    'university_name': row[3],
+                    'major_name': row[4],
+                    'registered_at': row[5]
+                })
         self.send_json_response({'success': True, 'data': results})
     
-    def get_admin_stats(self):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info or user_info['role'] != 'admin':
-            self.send_json_response({'success': False, 'error': 'Permission denied'}, 403)
-            return
-        
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM users WHERE role = "candidate" AND status = "active"')
-        total_candidates = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM universities WHERE status = "active"')
-        total_universities = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM aspirations')
-        total_aspirations = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM aspirations WHERE status = "pending"')
-        pending_aspirations = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM aspirations WHERE status = "approved"')
-        approved_aspirations = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM payments WHERE status = "completed"')
-        total_payments = cursor.fetchone()[0]
-        
-        conn.close()
+    def get_admin_stats(self, user):
+        # Bộ đếm do trigger cập nhật: đọc một lần thay cho sáu lần COUNT(*)
+        with db_pool.connection() as conn:
+            counters = read_stats_counters(conn)
         
         self.send_json_response({
             'success': True,
             'data': {
-                'candidates': total_candidates,
-                'universities': total_universities,
-                'aspirations': total_aspirations,
-                'pendingAspirations': pending_aspirations,
-                'approvedAspirations': approved_aspirations,
-                'totalPayments': total_payments
+                'candidates': counters['candidates_active'],
+                'universities': counters['universities_active'],
+                'aspirations': counters['aspirations'],
+                'pendingAspirations': counters['aspirations_pending'],
+                'approvedAspirations': counters['aspirations_approved'],
+                'totalPayments': counters['payments_completed']
             }
         })
     
-    def get_manager_stats(self):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info or user_info['role'] != 'manager':
-            self.send_json_response({'success': False, 'error': 'Permission denied'}, 403)
-            return
-        
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM aspirations WHERE status = "pending"')
-        pending_aspirations = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM aspirations WHERE status = "approved"')
-        approved_aspirations = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM aspirations WHERE status = "rejected"')
-        rejected_aspirations = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM payments WHERE status = "completed"')
-        total_payments = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM aspirations')
-        total_aspirations = cursor.fetchone()[0]
-        
-        conn.close()
+    def get_manager_stats(self, user):
+        with db_pool.connection() as conn:
+            counters = read_stats_counters(conn)
         
         self.send_json_response({
             'success': True,
             'data': {
-                'totalAspirations': total_aspirations,
-                'pendingAspirations': pending_aspirations,
-                'approvedAspirations': approved_aspirations,
-                'rejectedAspirations': rejected_aspirations,
-                'totalPayments': total_payments
+                'totalAspirations': counters['aspirations'],
+                'pendingAspirations': counters['aspirations_pending'],
+                'approvedAspirations': counters['aspirations_approved'],
+                'rejectedAspirations': counters['aspirations_rejected'],
+                'totalPayments': counters['payments_completed']
             }
         })
     
+    def get_stats_breakdown(self, user, group_by=None, university_id=None, subject_group=None):
+        """Số liệu theo trường / khối thi / ngành, lọc theo trường hoặc khối thi để xem chi tiết"""
+        if group_by is None:
+            group_by = 'university' if university_id is None and subject_group is None else 'major'
+        breakdown = get_stats_breakdown(group_by, university_id, subject_group)
+        self.send_json_response({'success': True, 'data': breakdown})
+    
+    def stream_events(self, user):
+        """Kênh SSE: gửi các sự kiện bị lỡ theo Last-Event-ID rồi giao kết nối cho event_hub"""
+        if not event_hub.available():
+            self.send_json_response({'success': False, 'error': 'Event stream unavailable'}, 503,
+                                    {'Retry-After': '5'})
+            return
+        
+        # Thí sinh nhận sự kiện của mình, cán bộ/quản trị nhận mọi sự kiện để cập nhật dashboard
+        channel = user.user_id if user.role == 'candidate' else None
+        try:
+            last_id = int(self.headers.get('Last-Event-ID', ''))
+        except ValueError:
+            last_id = None
+        
+        frames = [f"retry: {config.get('sse_retry')}\n\n".encode()]
+        with db_pool.connection() as conn:
+            oldest, latest = status_event_bounds(conn)
+            start_id = max(latest, last_id or 0)
+            if last_id is not None and last_id < latest:
+                limit = config.get('sse_backlog_limit')
+                events = read_status_events(conn, last_id, channel, limit + 1)
+                if last_id < oldest - 1 or len(events) > limit:
+                    # Sự kiện cần gửi đã bị dọn hoặc quá nhiều: client tải lại toàn bộ
+                    frames.append(f'id: {latest}\nevent: reset\ndata: {{}}\n\n'.encode())
+                else:
+                    frames.extend(status_event_frame(event_id, *fields) for event_id, _, *fields in events)
+                    if events:
+                        start_id = max(start_id, events[-1][0])
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(b''.join(frames))
+        self.detach_event_stream(channel, start_id)
+    
+    def detach_event_stream(self, user_id, last_id):
+        """Giao socket cho event_hub, trả luồng worker về cho server"""
+        self.wfile.flush()
+        event_hub.attach_socket(socket.socket(fileno=self.connection.detach()), user_id, last_id)
+    
     def login(self, data):
         username = data.get('username')
         password = data.get('password')
@@ -4245,19 +3563,37 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
             self.send_json_response({'success': False, 'error': 'Username and password are required'}, 400)
             return
         
-        conn = sqlite3.connect('university_admission.db')
-        cursor = conn.cursor()
+        retry_after = (login_ip_limiter.allow(self.client_address[0])
+                       or login_account_limiter.allow(username))
+        if retry_after:
+            self.send_rate_limited(retry_after)
+            return
         
-        cursor.execute('''
-            SELECT id, username, password, email, full_name, role 
-            FROM users 
-            WHERE username = ? AND status = "active"
-        ''', (username,))
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, username, password, email, full_name, role 
+                FROM users 
+                WHERE username = ? AND status = "active"
+            ''', (username,))
+            
+            user = cursor.fetchone()
         
-        user = cursor.fetchone()
-        conn.close()
+        try:
+            valid, needs_rehash = password_hasher.verify(password, user[2] if user else dummy_password_hash())
+            if user and valid and needs_rehash:
+                # Chuyển hash cũ sang tham số hiện tại ngay khi biết mật khẩu
+                new_hash = password_hasher.hash(password)
+                with db_pool.connection() as conn:
+                    conn.execute('UPDATE users SET password = ? WHERE id = ? AND password = ?',
+                                 (new_hash, user[0], user[2]))
+                    conn.commit()
+        except PasswordHasherBusy:
+            self.send_json_response({'success': False, 'error': 'Server busy'}, 503, {'Retry-After': '1'})
+            return
         
-        if user and verify_password(password, user[2]):
+        if user and valid:
             token = create_token(user[0], user[1], user[5])
             
             self.send_json_response({
@@ -4274,6 +3610,10 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
         else:
             self.send_json_response({'success': False, 'error': 'Invalid credentials'}, 401)
     
+    def logout(self, data, user):
+        revoke_token(user.token)
+        self.send_json_response({'success': True, 'message': 'Logged out'})
+    
     def register(self, data):
         try:
             required_fields = ['username', 'password', 'email', 'full_name', 'citizen_id']
@@ -4281,87 +3621,79 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
                 if not data.get(field):
                     self.send_json_response({'success': False, 'error': f'Field {field} is required'}, 400)
                     return
-
-            conn = sqlite3.connect('university_admission.db')
-            cursor = conn.cursor()
             
-            cursor.execute('SELECT id FROM users WHERE username = ? OR email = ?', 
-                         (data['username'], data['email']))
-            if cursor.fetchone():
-                self.send_json_response({'success': False, 'error': 'Username or email already exists'})
+            retry_after = login_ip_limiter.allow(self.client_address[0])
+            if retry_after:
+                self.send_rate_limited(retry_after)
                 return
             
-            cursor.execute('''
-                INSERT INTO users (username, password, email, full_name, role) 
-                VALUES (?, ?, ?, ?, 'candidate')
-            ''', (data['username'], hash_password(data['password']), data['email'], data['full_name']))
-            
-            user_id = cursor.lastrowid
-            
-            cursor.execute('''
-                INSERT INTO candidates (user_id, citizen_id, date_of_birth, gender, address, phone, high_school, graduation_year)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, data['citizen_id'], data.get('date_of_birth'), data.get('gender'), 
-                  data.get('address'), data.get('phone'), data.get('high_school'), data.get('graduation_year')))
-            
-            conn.commit()
-            conn.close()
+            # Băm trước khi lấy kết nối để không giữ kết nối trong lúc chờ KDF
+            password_hash = password_hasher.hash(data['password'])
+
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Hai lượt tìm trên hai unique index thay vì OR (planner có thể chọn quét bảng)
+                cursor.execute('''
+                    SELECT id FROM users WHERE username = ?
+                    UNION ALL
+                    SELECT id FROM users WHERE email = ?
+                ''', (data['username'], data['email']))
+                if cursor.fetchone():
+                    self.send_json_response({'success': False, 'error': 'Username or email already exists'})
+                    return
+                
+                cursor.execute('''
+                    INSERT INTO users (username, password, email, full_name, role) 
+                    VALUES (?, ?, ?, ?, 'candidate')
+                ''', (data['username'], password_hash, data['email'], data['full_name']))
+                
+                user_id = cursor.lastrowid
+                
+                cursor.execute('''
+                    INSERT INTO candidates (user_id, citizen_id, date_of_birth, gender, address, phone, high_school, graduation_year)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (user_id, data['citizen_id'], data.get('date_of_birth'), data.get('gender'), 
+                      data.get('address'), data.get('phone'), data.get('high_school'), data.get('graduation_year')))
+                
+                conn.commit()
             
             self.send_json_response({'success': True, 'message': 'Registration successful'})
             
+        except PasswordHasherBusy:
+            self.send_json_response({'success': False, 'error': 'Server busy'}, 503, {'Retry-After': '1'})
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def update_candidate_profile(self, data):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
+    def update_candidate_profile(self, data, user):
         try:
-            conn = sqlite3.connect('university_admission.db')
-            cursor = conn.cursor()
-            
-            # Update user table
-            cursor.execute('''
-                UPDATE users 
-                SET email = ?, full_name = ?
-                WHERE id = ?
-            ''', (data.get('email'), data.get('full_name'), user_info['user_id']))
-            
-            # Update candidates table
-            cursor.execute('''
-                UPDATE candidates 
-                SET date_of_birth = ?, gender = ?, address = ?, phone = ?, 
-                    high_school = ?, graduation_year = ?
-                WHERE user_id = ?
-            ''', (data.get('date_of_birth'), data.get('gender'), data.get('address'),
-                  data.get('phone'), data.get('high_school'), data.get('graduation_year'), user_info['user_id']))
-            
-            conn.commit()
-            conn.close()
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Update user table
+                cursor.execute('''
+                    UPDATE users 
+                    SET email = ?, full_name = ?
+                    WHERE id = ?
+                ''', (data.get('email'), data.get('full_name'), user.user_id))
+                
+                # Update candidates table
+                cursor.execute('''
+                    UPDATE candidates 
+                    SET date_of_birth = ?, gender = ?, address = ?, phone = ?, 
+                        high_school = ?, graduation_year = ?
+                    WHERE user_id = ?
+                ''', (data.get('date_of_birth'), data.get('gender'), data.get('address'),
+                      data.get('phone'), data.get('high_school'), data.get('graduation_year'), user.user_id))
+                
+                conn.commit()
             
             self.send_json_response({'success': True, 'message': 'Profile updated successfully'})
             
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def add_aspiration(self, data):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
+    def add_aspiration(self, data, user):
         try:
             university_id = data.get('university_id')
             major_id = data.get('major_id')
@@ -4371,59 +3703,44 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_json_response({'success': False, 'error': 'Missing required fields'}, 400)
                 return
             
-            conn = sqlite3.connect('university_admission.db')
-            cursor = conn.cursor()
-            
-            # Get candidate ID
-            cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-            candidate = cursor.fetchone()
-            if not candidate:
+            candidate_id = user.candidate_id
+            if candidate_id is None:
                 self.send_json_response({'success': False, 'error': 'Candidate not found'})
                 return
             
-            candidate_id = candidate[0]
-            
-            cursor.execute('SELECT id FROM exams WHERE status = "active" LIMIT 1')
-            exam = cursor.fetchone()
-            if not exam:
-                self.send_json_response({'success': False, 'error': 'No active exam'})
-                return
-            
-            exam_id = exam[0]
-            
-            cursor.execute('''
-                SELECT id FROM aspirations 
-                WHERE candidate_id = ? AND exam_id = ? AND priority_order = ?
-            ''', (candidate_id, exam_id, priority))
-            
-            if cursor.fetchone():
-                self.send_json_response({'success': False, 'error': 'Priority order already exists'})
-                return
-            
-            cursor.execute('''
-                INSERT INTO aspirations (candidate_id, exam_id, university_id, major_id, priority_order)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (candidate_id, exam_id, university_id, major_id, priority))
-            
-            conn.commit()
-            conn.close()
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('SELECT id FROM exams WHERE status = "active" LIMIT 1')
+                exam = cursor.fetchone()
+                if not exam:
+                    self.send_json_response({'success': False, 'error': 'No active exam'})
+                    return
+                
+                exam_id = exam[0]
+                
+                cursor.execute('''
+                    SELECT id FROM aspirations 
+                    WHERE candidate_id = ? AND exam_id = ? AND priority_order = ?
+                ''', (candidate_id, exam_id, priority))
+                
+                if cursor.fetchone():
+                    self.send_json_response({'success': False, 'error': 'Priority order already exists'})
+                    return
+                
+                cursor.execute('''
+                    INSERT INTO aspirations (candidate_id, exam_id, university_id, major_id, priority_order)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (candidate_id, exam_id, university_id, major_id, priority))
+                
+                conn.commit()
             
             self.send_json_response({'success': True, 'message': 'Aspiration added successfully'})
             
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def remove_aspiration(self, data):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
+    def remove_aspiration(self, data, user):
         try:
             aspiration_id = data.get('aspiration_id')
             
@@ -4431,41 +3748,29 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_json_response({'success': False, 'error': 'Aspiration ID is required'}, 400)
                 return
             
-            conn = sqlite3.connect('university_admission.db')
-            cursor = conn.cursor()
-            
-            # Verify the aspiration belongs to the current user
-            cursor.execute('''
-                SELECT a.id FROM aspirations a
-                JOIN candidates c ON a.candidate_id = c.id
-                WHERE a.id = ? AND c.user_id = ?
-            ''', (aspiration_id, user_info['user_id']))
-            
-            if not cursor.fetchone():
-                self.send_json_response({'success': False, 'error': 'Aspiration not found or access denied'})
-                return
-            
-            cursor.execute('DELETE FROM aspirations WHERE id = ?', (aspiration_id,))
-            
-            conn.commit()
-            conn.close()
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Verify the aspiration belongs to the current user
+                cursor.execute('''
+                    SELECT id FROM aspirations
+                    WHERE id = ? AND candidate_id = ?
+                ''', (aspiration_id, user.candidate_id))
+                
+                if not cursor.fetchone():
+                    self.send_json_response({'success': False, 'error': 'Aspiration not found or access denied'})
+                    return
+                
+                cursor.execute('DELETE FROM aspirations WHERE id = ?', (aspiration_id,))
+                
+                conn.commit()
             
             self.send_json_response({'success': True, 'message': 'Aspiration removed successfully'})
             
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def reorder_aspirations(self, data):
-        token = self.headers.get('Authorization')
-        if not token:
-            self.send_json_response({'success': False, 'error': 'Unauthorized'}, 401)
-            return
-        
-        user_info = verify_token(token)
-        if not user_info:
-            self.send_json_response({'success': False, 'error': 'Invalid token'}, 401)
-            return
-        
+    def reorder_aspirations(self, data, user):
         try:
             aspirations = data.get('aspirations', [])
             
@@ -4473,88 +3778,922 @@ class AdmissionRequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_json_response({'success': False, 'error': 'No aspirations provided'}, 400)
                 return
             
-            conn = sqlite3.connect('university_admission.db')
-            cursor = conn.cursor()
-            
-            # Get candidate ID
-            cursor.execute('SELECT id FROM candidates WHERE user_id = ?', (user_info['user_id'],))
-            candidate = cursor.fetchone()
-            if not candidate:
+            candidate_id = user.candidate_id
+            if candidate_id is None:
                 self.send_json_response({'success': False, 'error': 'Candidate not found'})
                 return
             
-            candidate_id = candidate[0]
-            
-            for aspiration in aspirations:
-                # Verify the aspiration belongs to the current user
-                cursor.execute('''
-                    SELECT id FROM aspirations 
-                    WHERE id = ? AND candidate_id = ?
-                ''', (aspiration.get('id'), candidate_id))
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
                 
-                if not cursor.fetchone():
-                    continue
+                for aspiration in aspirations:
+                    # Verify the aspiration belongs to the current user
+                    cursor.execute('''
+                        SELECT id FROM aspirations 
+                        WHERE id = ? AND candidate_id = ?
+                    ''', (aspiration.get('id'), candidate_id))
+                    
+                    if not cursor.fetchone():
+                        continue
+                    
+                    cursor.execute('''
+                        UPDATE aspirations 
+                        SET priority_order = ?
+                        WHERE id = ?
+                    ''', (aspiration.get('priority'), aspiration.get('id')))
                 
-                cursor.execute('''
-                    UPDATE aspirations 
-                    SET priority_order = ?
-                    WHERE id = ?
-                ''', (aspiration.get('priority'), aspiration.get('id')))
-            
-            conn.commit()
-            conn.close()
+                conn.commit()
             
             self.send_json_response({'success': True, 'message': 'Aspirations reordered successfully'})
             
         except Exception as e:
             self.send_json_response({'success': False, 'error': str(e)})
     
-    def send_json_response(self, data, status_code=200):
+    def send_json_response(self, data, status_code=200, headers=None):
+        self.send_json_bytes(json_bytes(data), status_code, headers)
+    
+    def send_json_bytes(self, response, status_code=200, headers=None):
+        """Gửi body JSON đã serialize sẵn, nén gzip/deflate nếu client chấp nhận"""
+        headers = dict(headers or {})
+        encoding = 'identity'
+        if len(response) >= config.get('json_compress_min_size'):
+            headers['Vary'] = 'Accept-Encoding'
+            encoding = choose_encoding(self.headers.get('Accept-Encoding'), JSON_ENCODINGS)
+        
+        if status_code == 200 and self.route is not None and self.route.cache_control:
+            etag = content_etag(response, encoding)
+            headers.update({'ETag': etag, 'Cache-Control': self.route.cache_control})
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_not_modified(headers)
+                return
+        
+        # Chunked chỉ có trong HTTP/1.1
+        stream = (encoding != 'identity' and self.request_version == 'HTTP/1.1'
+                  and len(response) >= config.get('json_compress_stream_threshold'))
+        if encoding != 'identity' and not stream:
+            compressor = json_compressor(encoding)
+            response = compressor.compress(response) + compressor.flush()
+        
         self.send_response(status_code)
         self.send_header('Content-type', 'application/json; charset=utf-8')
+        if stream:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(len(response)))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, Last-Event-ID')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        
+        if stream:
+            self.write_compressed_chunks(response, encoding)
+        else:
+            self.wfile.write(response)
+    
+    def write_compressed_chunks(self, body, encoding):
+        """Nén và gửi từng đoạn: byte đầu tiên đi ngay, không giữ cả bản nén trong bộ nhớ"""
+        compressor = json_compressor(encoding)
+        chunk_size = config.get('json_compress_chunk_size')
+        view = memoryview(body)
+        for offset in range(0, len(view), chunk_size):
+            self.write_chunk(compressor.compress(view[offset:offset + chunk_size]))
+        self.write_chunk(compressor.flush())
+        self.wfile.write(b'0\r\n\r\n')
+    
+    def write_chunk(self, data):
+        if data:
+            self.wfile.write(b'%x\r\n%b\r\n' % (len(data), data))
+    
+    def send_asset(self, asset):
+        """Gửi nội dung nén sẵn theo Accept-Encoding, trả 304 nếu ETag khớp"""
+        encoding, body, etag = asset.select(self.headers.get('Accept-Encoding'))
+        headers = {'ETag': etag, 'Cache-Control': asset.cache_control, 'Vary': 'Accept-Encoding'}
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_not_modified(headers)
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in headers.items():
+            self.send_header(name, value)
         self.end_headers()
+        self.wfile.write(body)
+    
+    def serve_static(self, name):
+        """Gửi file tĩnh bằng sendfile, hỗ trợ bản nén sẵn và Range"""
+        asset = load_frontend_assets()[0].by_url.get(name)
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
+        
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'), asset.variants)
+        path, size, etag = asset.variants[encoding]
+        headers = {'ETag': etag, 'Cache-Control': config.get('static_cache_control'),
+                   'Vary': 'Accept-Encoding', 'Accept-Ranges': 'bytes'}
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_not_modified(headers)
+            return
+        
+        status, start, end = 200, 0, size - 1
+        byte_range = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if byte_range and (if_range is None or if_range == etag):
+            parsed = parse_byte_range(byte_range, size)
+            if parsed is None:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if parsed:
+                start, end = parsed
+                status = 206
+                headers['Content-Range'] = f'bytes {start}-{end}/{size}'
         
-        response = json.dumps(data, ensure_ascii=False).encode('utf-8')
-        self.wfile.write(response)
+        with open(path, 'rb') as f:
+            self.send_response(status)
+            self.send_header('Content-type', asset.content_type)
+            self.send_header('Content-Length', str(end - start + 1))
+            if encoding != 'identity':
+                self.send_header('Content-Encoding', encoding)
+            for header_name, value in headers.items():
+                self.send_header(header_name, value)
+            self.end_headers()
+            self.write_file(f, start, end - start + 1)
+    
+    def write_file(self, f, offset, count):
+        # socket.sendfile dùng os.sendfile (zero-copy) và tôn trọng timeout của socket
+        if count > 0:
+            self.connection.sendfile(f, offset, count)
+    
+    def send_not_modified(self, headers):
+        # 304 không có body; chỉ gửi lại các header cache
+        self.send_response(304)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
     
     def do_OPTIONS(self):
         self.send_response(200)
+        self.send_header('Content-Length', '0')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, Last-Event-ID')
+        self.send_header('Access-Control-Max-Age', '86400')
         self.end_headers()
 
+# ==================== LOGIN BENCHMARK ====================
+
+def run_login_benchmark(total_requests, concurrency, username='candidate', password='candidate123'):
+    """Đo throughput và độ trễ của /api/auth/login qua HTTP trên server chạy trong process"""
+    import http.client
+    
+    # Benchmark đo chi phí băm mật khẩu, không đo giới hạn tần suất
+    login_ip_limiter.rate = login_account_limiter.rate = float('inf')
+    login_ip_limiter.burst = login_account_limiter.burst = float('inf')
+    
+    httpd = ThreadPoolHTTPServer(('127.0.0.1', 0), AdmissionRequestHandler,
+                                 max_workers=config.get('server_threads'),
+                                 queue_size=config.get('server_queue_size'))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    body = json.dumps({'username': username, 'password': password})
+    
+    def login(conn):
+        started = time.perf_counter()
+        conn.request('POST', '/api/auth/login', body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - started
+    
+    # Lượt đầu khởi động process pool và chuyển hash cũ sang scrypt nếu cần
+    warmup = http.client.HTTPConnection('127.0.0.1', port)
+    login(warmup)
+    warmup.close()
+    
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    
+    def client(count):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        for _ in range(count):
+            status, elapsed = login(conn)
+            with lock:
+                latencies.append(elapsed)
+                if status != 200:
+                    errors.append(status)
+        conn.close()
+    
+    per_client = [total_requests // concurrency + (i < total_requests % concurrency) for i in range(concurrency)]
+    threads = [threading.Thread(target=client, args=(count,)) for count in per_client if count]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    httpd.shutdown()
+    httpd.server_close()
+    password_hasher.shutdown()
+    
+    latencies.sort()
+    percentile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"🔐 {len(latencies)} lượt đăng nhập, {concurrency} client, {password_hasher.workers} process băm")
+    print(f"   Throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"   Độ trễ (ms): p50 {percentile(0.5):.1f}, p95 {percentile(0.95):.1f}, "
+          f"p99 {percentile(0.99):.1f}, max {latencies[-1] * 1000:.1f}")
+    if errors:
+        print(f"   ⚠️  {len(errors)} lượt lỗi: {sorted(set(errors))}")
+    return not errors
+
+# ==================== QUERY PLAN CHECK ====================
+
+# Các hàm chỉ chạy lúc khởi động hoặc đọc bảng vài dòng nên được phép quét toàn bảng
+QUERY_PLAN_EXEMPT_FUNCTIONS = {'insert_default_data', 'sync_indexes', 'check_query_plans',
+                               'read_stats_counters', 'read_major_stats'}
+# Quét toàn bảng có chủ ý (hàm, dòng plan): tổng hợp trên bảng danh mục (một dòng mỗi
+# trường/ngành) và lượt đối chiếu định kỳ major_stats vốn phải đọc hết aspirations
+QUERY_PLAN_ALLOWED_SCANS = {
+    ('get_stats_breakdown', 'SCAN m'),
+    ('get_stats_breakdown', 'SCAN u'),
+    ('refresh_major_stats', 'SCAN aspirations'),
+}
+
+def collect_module_queries():
+    """Lấy mọi câu SQL tĩnh được execute() trong module, kèm tên hàm chứa nó"""
+    with open(os.path.abspath(__file__), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    
+    queries = {}
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for node in ast.walk(func):
+            if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr in ('execute', 'executemany') and node.args
+                    and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                queries.setdefault(node.args[0].value, func.name)
+    return [(function_name, sql) for sql, function_name in queries.items()]
+
+def dynamic_module_queries():
+    """Câu SQL dựng động, sinh từ các hàm dựng với tham số đại diện cho mọi nhánh"""
+    # Chỉ việc có hay không có bộ lọc làm đổi SQL; giá trị thật được bind lúc chạy
+    filter_sets = [{}, {'university_id': 1}, {'major_id': 1}, {'payment_status': 'paid'},
+                   {'registered_from': '', 'registered_to': ''},
+                   {'university_id': 1, 'major_id': 1, 'payment_status': 'paid'}]
+    for filters in filter_sets:
+        yield 'get_pending_aspirations', pending_aspirations_query(1, **filters)[0]
+        yield 'get_pending_aspirations', pending_aspirations_query(1, ('', 0), **filters)[0]
+        yield 'decide_aspirations', pending_ids_query(1, **filters)[0]
+    yield 'apply_decision_chunk', aspiration_status_query(config.get('bulk_decision_chunk_size'))
+    for group_by in STATS_BREAKDOWN_GROUPS:
+        for kwargs in ({}, {'university_id': 1}, {'subject_group': ''}):
+            yield 'get_stats_breakdown', stats_breakdown_query(group_by, **kwargs)[0]
+    for name in STATS_COUNTERS:
+        yield 'refresh_stats_counters', stats_counter_query(name)
+    yield 'refresh_major_stats', major_stats_aggregate_query()
+
+def check_query_plans():
+    """Chạy EXPLAIN QUERY PLAN cho mọi truy vấn, trả về các truy vấn quét toàn bảng"""
+    # Lập kế hoạch trên database đang cấu hình: planner dùng đúng index và sqlite_stat1 thật
+    full_scans = []
+    with db_pool.connection() as conn:
+        for function_name, sql in collect_module_queries() + list(dynamic_module_queries()):
+            keyword = sql.split(None, 1)[0].upper()
+            if keyword not in ('SELECT', 'UPDATE', 'DELETE') or function_name in QUERY_PLAN_EXEMPT_FUNCTIONS:
+                continue
+            
+            plan = conn.execute('EXPLAIN QUERY PLAN ' + sql, (None,) * sql.count('?')).fetchall()
+            # Quét covering index (vd. COUNT(*)) không phải đọc bảng nên được chấp nhận
+            scans = [row[3] for row in plan
+                     if row[3].startswith('SCAN ') and 'COVERING INDEX' not in row[3]
+                     and row[3] != 'SCAN CONSTANT ROW'
+                     and (function_name, row[3]) not in QUERY_PLAN_ALLOWED_SCANS]
+            if scans:
+                full_scans.append((function_name, ' '.join(sql.split()), scans))
+    return full_scans
+
+# ==================== CONCURRENT SERVER ====================
+
+class ThreadPoolHTTPServer(http.server.HTTPServer):
+    """HTTP server xử lý request trên pool luồng có giới hạn"""
+    
+    def __init__(self, server_address, RequestHandlerClass, max_workers=None,
+                 queue_size=None, request_timeout=None, bind_and_activate=True):
+        self.max_workers = max_workers or config.get('server_threads')
+        self.queue_size = queue_size or config.get('server_queue_size')
+        self.request_timeout = request_timeout or config.get('request_timeout')
+        self.keepalive_timeout = config.get('keepalive_timeout')
+        self._requests = queue.Queue(maxsize=self.queue_size)
+        self._workers = []
+        self._closing = False
+        # Kết nối keep-alive rảnh chờ trong selector thay vì chặn worker ở recv
+        self._served = {}
+        self._parking = []
+        self._parking_lock = threading.Lock()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f'admission-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self._idle_thread = threading.Thread(target=self._idle_loop, name='admission-idle', daemon=True)
+        self._idle_thread.start()
+    
+    def process_request(self, request, client_address):
+        """Đưa kết nối vào hàng đợi; trả 503 khi hàng đợi đã đầy"""
+        # Client chậm không được giữ luồng worker quá request_timeout
+        request.settimeout(self.request_timeout)
+        try:
+            self._requests.put_nowait((request, client_address))
+        except queue.Full:
+            self._reject_overloaded(request)
+    
+    def keep_alive_allowed(self):
+        """Kết nối rảnh nằm trong selector, không chiếm worker nên luôn được giữ"""
+        return not self._closing
+    
+    def requests_served_on(self, request):
+        """Số request đã phục vụ trên kết nối trước khi nó rảnh và được đưa lại vào hàng đợi"""
+        return self._served.pop(request, 0)
+    
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+    
+    def _reject_overloaded(self, request):
+        try:
+            request.sendall(b'HTTP/1.1 503 Service Unavailable\r\n'
+                            b'Content-Length: 0\r\n'
+                            b'Retry-After: 1\r\n'
+                            b'Connection: close\r\n\r\n')
+        except OSError:
+            pass
+        self.shutdown_request(request)
+    
+    def _worker_loop(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                break
+            request, client_address = item
+            handler = None
+            try:
+                handler = self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            if handler is not None and handler.keep_open and not self._closing:
+                self._park(request, client_address, handler.requests_served)
+            else:
+                self.shutdown_request(request)
+    
+    def _park(self, request, client_address, requests_served):
+        """Giao kết nối rảnh cho luồng selector, worker quay lại phục vụ hàng đợi"""
+        with self._parking_lock:
+            self._parking.append((request, client_address, requests_served))
+        self._wake_idle_loop()
+    
+    def _wake_idle_loop(self):
+        try:
+            self._wakeup_send.send(b'\0')
+        except OSError:
+            # Bộ đệm đầy nghĩa là luồng selector đã có tín hiệu chưa xử lý
+            pass
+    
+    def _idle_loop(self):
+        """Theo dõi kết nối rảnh: có dữ liệu thì đưa lại vào hàng đợi, quá keepalive_timeout thì đóng"""
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        # socket -> (client_address, số request đã phục vụ, hạn chờ); thứ tự thêm vào cũng là thứ tự hạn
+        idle = collections.OrderedDict()
+        
+        while not self._closing:
+            with self._parking_lock:
+                parking, self._parking = self._parking, []
+            deadline = time.monotonic() + self.keepalive_timeout
+            for request, client_address, requests_served in parking:
+                selector.register(request, selectors.EVENT_READ)
+                idle[request] = (client_address, requests_served, deadline)
+            
+            now = time.monotonic()
+            while idle:
+                request, (_, _, expires_at) = next(iter(idle.items()))
+                if expires_at > now:
+                    break
+                del idle[request]
+                selector.unregister(request)
+                self.shutdown_request(request)
+            
+            timeout = next(iter(idle.values()))[2] - now if idle else None
+            for key, _ in selector.select(timeout):
+                if key.fileobj is self._wakeup_recv:
+                    try:
+                        while self._wakeup_recv.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                request = key.fileobj
+                selector.unregister(request)
+                client_address, requests_served, _ = idle.pop(request)
+                self._resume(request, client_address, requests_served)
+        
+        for request in idle:
+            self.shutdown_request(request)
+        selector.close()
+    
+    def _resume(self, request, client_address, requests_served):
+        self._served[request] = requests_served
+        try:
+            self._requests.put_nowait((request, client_address))
+        except queue.Full:
+            self._served.pop(request, None)
+            self._reject_overloaded(request)
+    
+    def server_close(self):
+        self._closing = True
+        super().server_close()
+        self._wake_idle_loop()
+        self._idle_thread.join()
+        for _ in self._workers:
+            self._requests.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        # Kết nối worker vừa trả về sau khi luồng selector đã dừng
+        for request, _, _ in self._parking:
+            self.shutdown_request(request)
+        self._parking = []
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+
+# ==================== ASYNCIO FRONT END ====================
+
+class BufferedRequestHandler(AdmissionRequestHandler):
+    """Chạy AdmissionRequestHandler trên request đã đọc sẵn vào bộ nhớ"""
+    protocol_version = 'HTTP/1.1'
+    event_stream = None
+    
+    def __init__(self, raw_request, client_address, server):
+        self.rfile = io.BytesIO(raw_request)
+        self.wfile = io.BytesIO()
+        self.client_address = client_address
+        self.server = server
+        self.close_connection = True
+        self.handle_one_request()
+    
+    def parse_request(self):
+        # Event loop đã tách body theo Content-Length: body chưa đọc không lẫn sang request sau
+        parsed = super().parse_request()
+        self.body_pending = False
+        return parsed
+    
+    def write_file(self, f, offset, count):
+        # Phản hồi được gom vào bộ nhớ rồi event loop mới gửi, không có socket để sendfile
+        f.seek(offset)
+        self.wfile.write(f.read(count))
+    
+    def detach_event_stream(self, user_id, last_id):
+        # Event loop gửi phần đầu phản hồi rồi mới giao kết nối cho event_hub
+        self.event_stream = (user_id, last_id)
+
+def frame_response(raw_response, keep_alive):
+    """Bổ sung Content-Length/Connection để client giữ được kết nối"""
+    head, sep, body = raw_response.partition(b'\r\n\r\n')
+    lines = head.split(b'\r\n')
+    names = {line.split(b':', 1)[0].strip().lower() for line in lines[1:]}
+    status = lines[0].split(b' ', 2)[1] if len(lines[0].split(b' ')) > 1 else b''
+    
+    if (b'content-length' not in names and b'transfer-encoding' not in names
+            and status not in (b'204', b'304')):
+        lines.append(b'Content-Length: ' + str(len(body)).encode())
+    if not keep_alive and b'connection' not in names:
+        lines.append(b'Connection: close')
+    return b'\r\n'.join(lines) + b'\r\n\r\n' + body
+
+def run_buffered_request(raw_request, client_address, server, allow_keep_alive):
+    """Chạy trên executor: xử lý một request, trả về (bytes phản hồi, giữ kết nối?, kênh SSE)"""
+    handler = BufferedRequestHandler(raw_request, client_address, server)
+    raw_response = handler.wfile.getvalue()
+    if handler.event_stream is not None:
+        # Luồng SSE không có độ dài, kết thúc khi đóng kết nối
+        return raw_response, False, handler.event_stream
+    if not raw_response:
+        return b'', False, None
+    keep_alive = allow_keep_alive and not handler.close_connection
+    return frame_response(raw_response, keep_alive), keep_alive, None
+
+def parse_content_length(head):
+    """Trả về độ dài body, -1 nếu header không hợp lệ hoặc dùng chunked"""
+    content_length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        if name == b'transfer-encoding':
+            return -1
+        if name == b'content-length':
+            try:
+                content_length = int(value.strip())
+            except ValueError:
+                return -1
+    return content_length if content_length >= 0 else -1
+
+class AsyncAdmissionServer:
+    """Front end asyncio: giữ nhiều kết nối keep-alive, xử lý API trên executor"""
+    
+    def __init__(self, executor_workers=None, request_timeout=None):
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=executor_workers or config.get('server_threads'),
+            thread_name_prefix='admission-async')
+        self.request_timeout = request_timeout or config.get('request_timeout')
+        self.keepalive_timeout = config.get('keepalive_timeout')
+        self.max_keepalive_requests = config.get('keepalive_max_requests')
+        self.max_request_body = config.get('max_request_body')
+        # writer -> đang xử lý request hay không
+        self.connections = {}
+        self.stopping = False
+        self.server = None
+    
+    async def start(self, port=None, sock=None):
+        backlog = config.get('server_queue_size')
+        if sock is not None:
+            self.server = await asyncio.start_server(self.handle_connection, sock=sock, backlog=backlog)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, port=port,
+                                                     reuse_address=True, backlog=backlog)
+    
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info('peername') or ('', 0)
+        self.connections[writer] = False
+        served = 0
+        event_stream = None
+        
+        try:
+            while not self.stopping:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keepalive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError,
+                        asyncio.LimitOverrunError, ConnectionError):
+                    break
+                
+                self.connections[writer] = True
+                content_length = parse_content_length(head)
+                if content_length < 0 or content_length > self.max_request_body:
+                    writer.write(b'HTTP/1.1 400 Bad Request\r\n'
+                                 b'Content-Length: 0\r\n'
+                                 b'Connection: close\r\n\r\n')
+                    await writer.drain()
+                    break
+                
+                body = b''
+                if content_length:
+                    try:
+                        body = await asyncio.wait_for(reader.readexactly(content_length), self.request_timeout)
+                    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                        break
+                
+                served += 1
+                allow_keep_alive = served < self.max_keepalive_requests and not self.stopping
+                # Request pipeline được đọc lần lượt từ buffer nên phản hồi luôn đúng thứ tự
+                response, keep_alive, event_stream = await loop.run_in_executor(
+                    self.executor, run_buffered_request, head + body, peer, self, allow_keep_alive)
+                if response:
+                    writer.write(response)
+                    await writer.drain()
+                self.connections[writer] = False
+                
+                if event_stream is not None:
+                    event_hub.attach_stream(writer, *event_stream)
+                    break
+                
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            if event_stream is None:
+                writer.close()
+    
+    def keep_alive_allowed(self):
+        return not self.stopping
+    
+    async def shutdown(self, timeout=None):
+        """Ngừng nhận kết nối, đóng kết nối rảnh, chờ request đang xử lý"""
+        self.stopping = True
+        self.server.close()
+        event_hub.close()
+        for writer, busy in list(self.connections.items()):
+            if not busy:
+                writer.close()
+        
+        deadline = time.monotonic() + (timeout or config.get('worker_shutdown_timeout'))
+        while self.connections and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+async def serve_async(args, sock=None):
+    """Chạy front end asyncio tới khi nhận SIGTERM/SIGINT"""
+    server = AsyncAdmissionServer(executor_workers=args.threads, request_timeout=args.request_timeout)
+    await server.start(port=args.port, sock=sock)
+    event_hub.start(asyncio.get_running_loop())
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(signal.SIGINT, stop.set)
+    
+    await stop.wait()
+    await server.shutdown()
+    password_hasher.shutdown()
+
+# ==================== PRE-FORK WORKERS ====================
+
+def create_listening_socket(port, reuse_port=False):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("", port))
+    sock.listen(config.get('server_queue_size'))
+    return sock
+
+def run_worker(args, listen_sock=None, slot=0):
+    """Chạy trong process con: phục vụ trên socket chung tới khi nhận SIGTERM"""
+    if slot == 0:
+        # Một worker là đủ để checkpoint, optimize, dọn phiên và đối chiếu bộ đếm cho cả database
+        start_wal_checkpointer()
+        start_db_optimizer()
+        start_session_sweeper()
+        start_stats_reconciler()
+    
+    if listen_sock is None:
+        # SO_REUSEPORT: mỗi worker tự bind, kernel tự chia kết nối
+        listen_sock = create_listening_socket(args.port, reuse_port=True)
+    
+    if args.async_mode:
+        asyncio.run(serve_async(args, sock=listen_sock))
+        return
+    
+    httpd = ThreadPoolHTTPServer(listen_sock.getsockname(), AdmissionRequestHandler,
+                                 max_workers=args.threads,
+                                 queue_size=args.queue_size,
+                                 request_timeout=args.request_timeout,
+                                 bind_and_activate=False)
+    httpd.socket.close()
+    httpd.socket = listen_sock
+    event_hub.start()
+    
+    def drain(signum, frame):
+        # shutdown() chờ serve_forever thoát nên phải gọi từ luồng khác
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+    
+    signal.signal(signal.SIGTERM, drain)
+    signal.signal(signal.SIGINT, drain)
+    
+    try:
+        httpd.serve_forever()
+    finally:
+        # server_close() chờ các request đang xử lý/trong hàng đợi hoàn tất
+        httpd.server_close()
+        password_hasher.shutdown()
+
+class WorkerSupervisor:
+    """Pre-fork N process con dùng chung cổng, khởi động lại worker bị crash"""
+    
+    def __init__(self, args):
+        self.args = args
+        self.workers = {}
+        self.stopping = False
+        self.listen_sock = None if args.reuse_port else create_listening_socket(args.port)
+    
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                run_worker(self.args, self.listen_sock, slot)
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = (slot, time.monotonic())
+    
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+        
+        deadline = None
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            
+            if pid == 0:
+                if self.stopping:
+                    if deadline is None:
+                        deadline = time.monotonic() + config.get('worker_shutdown_timeout')
+                    elif time.monotonic() > deadline:
+                        for worker_pid in list(self.workers):
+                            try:
+                                os.kill(worker_pid, signal.SIGKILL)
+                            except ProcessLookupError:
+                                pass
+                time.sleep(0.2)
+                continue
+            
+            slot, started_at = self.workers.pop(pid)
+            if self.stopping:
+                continue
+            
+            print(f"⚠️  Worker {pid} thoát (mã {os.waitstatus_to_exitcode(status)}), đang khởi động lại...")
+            # Tránh vòng lặp fork liên tục khi worker crash ngay lúc khởi động
+            if time.monotonic() - started_at < 1:
+                time.sleep(1)
+            if not self.stopping:
+                self.spawn(slot)
+        
+        if self.listen_sock:
+            self.listen_sock.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Hệ thống quản lý tuyển sinh đại học')
+    parser.add_argument('--port', type=int, default=config.get('port'))
+    parser.add_argument('--threads', type=int, default=config.get('server_threads'),
+                        help='Số luồng xử lý request (0 = chạy đơn luồng)')
+    parser.add_argument('--queue-size', type=int, default=config.get('server_queue_size'),
+                        help='Số kết nối tối đa chờ trong hàng đợi')
+    parser.add_argument('--request-timeout', type=float, default=config.get('request_timeout'),
+                        help='Timeout (giây) cho mỗi kết nối')
+    parser.add_argument('--workers', type=int, default=config.get('server_workers'),
+                        help='Số process worker pre-fork dùng chung cổng')
+    parser.add_argument('--reuse-port', action='store_true',
+                        help='Mỗi worker tự bind cổng với SO_REUSEPORT thay vì dùng socket kế thừa')
+    parser.add_argument('--check-query-plans', action='store_true',
+                        help='Kiểm tra EXPLAIN QUERY PLAN của mọi truy vấn rồi thoát')
+    parser.add_argument('--async', dest='async_mode', action='store_true',
+                        help='Dùng front end asyncio (keep-alive, nhiều kết nối rảnh)')
+    parser.add_argument('--vendor-assets', action='store_true',
+                        help='Tải Chart.js và Font Awesome về static_dir rồi thoát')
+    parser.add_argument('--benchmark-login', type=int, metavar='N',
+                        help='Đo throughput/độ trễ của N lượt đăng nhập rồi thoát')
+    parser.add_argument('--benchmark-concurrency', type=int, default=8,
+                        help='Số client đồng thời khi chạy --benchmark-login')
+    parser.add_argument('--session-backend', choices=tuple(SESSION_BACKENDS), default=config.get('session_backend'),
+                        help='Nơi lưu phiên đăng nhập cho token opaque')
+    parser.add_argument('--token-format', choices=('opaque', 'signed'), default=config.get('token_format'),
+                        help='signed: token ký HMAC, không cần tra phiên phía server')
+    parser.add_argument('--rotate-token-key', action='store_true',
+                        help='Tạo khóa ký token mới (khóa cũ vẫn kiểm tra được) rồi thoát')
+    args = parser.parse_args(argv)
+    
+    if args.workers > 1:
+        if not hasattr(os, 'fork'):
+            parser.error('--workers yêu cầu hệ điều hành hỗ trợ fork()')
+        if args.threads <= 0:
+            parser.error('--workers yêu cầu --threads lớn hơn 0')
+    if args.async_mode and args.threads <= 0:
+        parser.error('--async yêu cầu --threads lớn hơn 0')
+    if args.reuse_port and not hasattr(socket, 'SO_REUSEPORT'):
+        parser.error('Hệ điều hành không hỗ trợ SO_REUSEPORT')
+    return args
+
+def create_server(args):
+    if args.threads <= 0:
+        return http.server.HTTPServer(("", args.port), AdmissionRequestHandler)
+    return ThreadPoolHTTPServer(("", args.port), AdmissionRequestHandler,
+                                max_workers=args.threads,
+                                queue_size=args.queue_size,
+                                request_timeout=args.request_timeout)
+
+def print_banner(args):
+    PORT = args.port
+    print(f"🚀 Hệ thống tuyển sinh ĐẦY ĐỦ TÍNH NĂNG đã khởi động!")
+    print(f"📚 Truy cập: http://localhost:{PORT}")
+    print(f"👤 Tài khoản demo:")
+    print(f"   - Quản trị: admin / admin123")
+    print(f"   - Cán bộ: manager / manager123") 
+    print(f"   - Thí sinh: candidate / candidate123")
+    print(f"\n✨ TÍNH NĂNG HOÀN THIỆN:")
+    print(f"   ✅ Giao diện hiện đại với thiết kế mới")
+    print(f"   ✅ Quản lý hồ sơ thí sinh đầy đủ")
+    print(f"   ✅ Đăng ký nguyện vọng linh hoạt")
+    print(f"   ✅ Hệ thống thanh toán an toàn")
+    print(f"   ✅ Quản lý và duyệt nguyện vọng")
+    print(f"   ✅ In ấn và xuất dữ liệu đa dạng")
+    print(f"   ✅ Phân quyền người dùng chi tiết")
+    if args.async_mode:
+        print(f"\n⚙️  Chế độ asyncio: {max(args.workers, 1)} process, executor {args.threads} luồng")
+    elif args.workers > 1:
+        print(f"\n⚙️  Chế độ đa process: {args.workers} worker x {args.threads} luồng")
+    elif args.threads > 0:
+        print(f"\n⚙️  Chế độ đa luồng: {args.threads} luồng, hàng đợi {args.queue_size}")
+    print(f"\n⏹️  Nhấn Ctrl+C để dừng server")
+
 def main():
+    args = parse_args()
+    config.set('token_format', args.token_format)
+    
+    if args.vendor_assets:
+        print(f"📦 Đang tải thư viện vào {config.get('static_dir')}...")
+        vendor_assets(config.get('static_dir'))
+        return
+    
+    if args.rotate_token_key:
+        print(f"🔑 Khóa ký token mới: {token_keyring.rotate()}")
+        return
+    
+    if args.token_format == 'signed':
+        # Tạo khóa trước khi fork để mọi worker dùng cùng một khóa
+        token_keyring.ensure()
+    
+    session_backend_name = args.session_backend
+    if args.workers > 1 and session_backend_name == 'memory':
+        # Phiên phải dùng chung giữa các process
+        session_backend_name = 'sqlite'
+    use_session_backend(session_backend_name)
+    
     print("🔄 Đang khởi tạo cơ sở dữ liệu...")
     init_database()
     
-    PORT = 8000
-    
-    with socketserver.TCPServer(("", PORT), AdmissionRequestHandler) as httpd:
-        print(f"🚀 Hệ thống tuyển sinh ĐẦY ĐỦ TÍNH NĂNG đã khởi động!")
-        print(f"📚 Truy cập: http://localhost:{PORT}")
-        print(f"👤 Tài khoản demo:")
-        print(f"   - Quản trị: admin / admin123")
-        print(f"   - Cán bộ: manager / manager123") 
-        print(f"   - Thí sinh: candidate / candidate123")
-        print(f"\n✨ TÍNH NĂNG HOÀN THIỆN:")
-        print(f"   ✅ Giao diện hiện đại với thiết kế mới")
-        print(f"   ✅ Quản lý hồ sơ thí sinh đầy đủ")
-        print(f"   ✅ Đăng ký nguyện vọng linh hoạt")
-        print(f"   ✅ Hệ thống thanh toán an toàn")
-        print(f"   ✅ Quản lý và duyệt nguyện vọng")
-        print(f"   ✅ In ấn và xuất dữ liệu đa dạng")
-        print(f"   ✅ Phân quyền người dùng chi tiết")
-        print(f"\n⏹️  Nhấn Ctrl+C để dừng server")
+    if args.check_query_plans:
+        full_scans = check_query_plans()
+        for function_name, sql, scans in full_scans:
+            print(f"❌ {function_name}: {'; '.join(scans)}\n   {sql}")
+        if full_scans:
+            sys.exit(1)
+        print("✅ Không có truy vấn nào quét toàn bảng")
+        return
+    
+    if args.benchmark_login:
+        if not run_login_benchmark(args.benchmark_login, args.benchmark_concurrency):
+            sys.exit(1)
+        return
+    
+    # Nén sẵn asset trước khi fork để mọi worker dùng chung, không chờ request đầu tiên
+    load_frontend_assets()
+    
+    if args.workers > 1:
+        # Không để kết nối SQLite của process cha bị kế thừa qua fork
+        db_pool.close_all()
+        supervisor = WorkerSupervisor(args)
+        print_banner(args)
+        supervisor.run()
+        print(f"\n🛑 Đã dừng tất cả worker")
+        return
+    
+    start_wal_checkpointer()
+    start_db_optimizer()
+    start_session_sweeper()
+    start_stats_reconciler()
+    
+    if args.async_mode:
+        print_banner(args)
+        asyncio.run(serve_async(args))
+        print(f"\n🛑 Đã dừng server")
+        return
+    
+    with create_server(args) as httpd:
+        event_hub.start()
+        print_banner(args)
         
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print(f"\n🛑 Đang dừng server...")
             httpd.shutdown()
+        finally:
+            password_hasher.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file